@@ -0,0 +1,129 @@
+"""
+Backfill Category/Price Index - Adds the GSI used by query-mode catalog access and fills its keys
+"""
+import argparse
+import time
+import boto3
+from decimal import Decimal
+from catalog_query import CATEGORY_ATTRIBUTE, CATEGORY_PRICE_INDEX, PRICE_ATTRIBUTE
+from catalog_snapshot import TABLE_NAME, VERSION_MARKER_ID
+from dynamodb_scan import parallel_scan
+from product import parse_price
+from product_classifier import classify_product
+
+BACKFILL_FIELDS = [
+    'product_id', 'price', 'product_type', 'product_name',
+    CATEGORY_ATTRIBUTE, PRICE_ATTRIBUTE
+]
+
+
+def index_definition():
+    return {
+        'IndexName': CATEGORY_PRICE_INDEX,
+        'KeySchema': [
+            {'AttributeName': CATEGORY_ATTRIBUTE, 'KeyType': 'HASH'},
+            {'AttributeName': PRICE_ATTRIBUTE, 'KeyType': 'RANGE'}
+        ],
+        'Projection': {'ProjectionType': 'ALL'}
+    }
+
+
+def index_attribute_definitions():
+    return [
+        {'AttributeName': CATEGORY_ATTRIBUTE, 'AttributeType': 'S'},
+        {'AttributeName': PRICE_ATTRIBUTE, 'AttributeType': 'N'}
+    ]
+
+
+def ensure_index(table):
+    """Create the category/price GSI if the table does not have it yet"""
+    table.reload()
+    existing = [index['IndexName'] for index in table.global_secondary_indexes or []]
+    if CATEGORY_PRICE_INDEX in existing:
+        print(f"Index {CATEGORY_PRICE_INDEX} already exists")
+        return
+
+    create = index_definition()
+    billing = (table.billing_mode_summary or {}).get('BillingMode', 'PROVISIONED')
+    if billing == 'PROVISIONED':
+        throughput = table.provisioned_throughput
+        create['ProvisionedThroughput'] = {
+            'ReadCapacityUnits': throughput['ReadCapacityUnits'],
+            'WriteCapacityUnits': throughput['WriteCapacityUnits']
+        }
+
+    print(f"Creating index {CATEGORY_PRICE_INDEX} on {table.name}...")
+    table.meta.client.update_table(
+        TableName=table.name,
+        AttributeDefinitions=index_attribute_definitions(),
+        GlobalSecondaryIndexUpdates=[{'Create': create}]
+    )
+
+    while True:
+        table.reload()
+        status = {index['IndexName']: index['IndexStatus'] for index in table.global_secondary_indexes or []}
+        if status.get(CATEGORY_PRICE_INDEX) == 'ACTIVE':
+            break
+        print(f"  Index status: {status.get(CATEGORY_PRICE_INDEX)}")
+        time.sleep(10)
+    print("  Index is ACTIVE")
+
+
+def backfill(table, dry_run=False):
+    """Write category and numeric price onto every product whose keys are missing or stale"""
+    scanned = updated = cleared = 0
+    for item in parallel_scan(table, fields=BACKFILL_FIELDS):
+        if item.get('product_id') == VERSION_MARKER_ID:
+            continue
+        scanned += 1
+
+        category = classify_product(item)
+        price = Decimal(str(round(parse_price(item.get('price')), 2)))
+        if item.get(CATEGORY_ATTRIBUTE) == category and item.get(PRICE_ATTRIBUTE) == price:
+            continue
+
+        if dry_run:
+            updated += 1
+            continue
+
+        if category is None:
+            # Uncategorized products stay out of the sparse index
+            table.update_item(
+                Key={'product_id': item['product_id']},
+                UpdateExpression='SET #p = :p REMOVE #c',
+                ExpressionAttributeNames={'#c': CATEGORY_ATTRIBUTE, '#p': PRICE_ATTRIBUTE},
+                ExpressionAttributeValues={':p': price}
+            )
+            cleared += 1
+        else:
+            table.update_item(
+                Key={'product_id': item['product_id']},
+                UpdateExpression='SET #c = :c, #p = :p',
+                ExpressionAttributeNames={'#c': CATEGORY_ATTRIBUTE, '#p': PRICE_ATTRIBUTE},
+                ExpressionAttributeValues={':c': category, ':p': price}
+            )
+            updated += 1
+
+    action = 'would update' if dry_run else 'updated'
+    print(f"Scanned {scanned} products: {action} {updated}, left {cleared} uncategorized out of the index")
+    return scanned, updated, cleared
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill the category/price GSI')
+    parser.add_argument('--table', default=TABLE_NAME, help=f'Table name (default: {TABLE_NAME})')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    parser.add_argument('--create-index', action='store_true', help='Create the GSI first if it is missing')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many items would change')
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-1', endpoint_url=args.endpoint_url)
+    table = dynamodb.Table(args.table)
+
+    if args.create_index:
+        ensure_index(table)
+    backfill(table, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
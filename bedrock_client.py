@@ -0,0 +1,188 @@
+"""
+Bedrock Client - Shared bedrock-runtime client with rate limiting, concurrency caps and throttling backoff
+"""
+import boto3
+import os
+import random
+import threading
+import time
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectTimeoutError, EndpointConnectionError, ReadTimeoutError
+
+# Size these to the account's on-demand quota for the models we call
+REQUESTS_PER_MINUTE = float(os.environ.get('BEDROCK_REQUESTS_PER_MINUTE', '50'))
+BURST = int(os.environ.get('BEDROCK_BURST', '5'))
+MAX_IN_FLIGHT = int(os.environ.get('BEDROCK_MAX_IN_FLIGHT', '8'))
+MAX_ATTEMPTS = int(os.environ.get('BEDROCK_MAX_ATTEMPTS', '5'))
+CONNECT_TIMEOUT_SECONDS = int(os.environ.get('BEDROCK_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT_SECONDS = int(os.environ.get('BEDROCK_READ_TIMEOUT', '90'))
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 20.0
+
+THROTTLE_CODES = {'ThrottlingException', 'TooManyRequestsException', 'ServiceQuotaExceededException'}
+RETRYABLE_CODES = {'ServiceUnavailableException', 'InternalServerException',
+                   'ModelNotReadyException', 'ModelTimeoutException'}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second up to `capacity`.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token; returns the seconds spent waiting for it"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
+
+
+class BedrockGovernor:
+    """
+    Drop-in for the bedrock-runtime client's invoke calls. Every call takes a
+    token from the shared bucket, holds an in-flight slot while the request is
+    open, and is retried with full-jitter exponential backoff on throttles and
+    transient errors. Throttles also halve the request rate until calls succeed
+    again (additive recovery), so a burst of 429s backs the whole process off.
+    last_service_seconds() gives the time the calling thread's last successful
+    attempt spent in the client, without any of the governor's own waiting.
+    """
+
+    def __init__(self, client=None, requests_per_minute=REQUESTS_PER_MINUTE, burst=BURST,
+                 max_in_flight=MAX_IN_FLIGHT, max_attempts=MAX_ATTEMPTS,
+                 sleep=time.sleep, rng=random, clock=time.monotonic):
+        if client is None:
+            # Retries are ours; botocore only enforces the per-call timeouts
+            client = boto3.client('bedrock-runtime', region_name='us-east-1', config=Config(
+                connect_timeout=CONNECT_TIMEOUT_SECONDS,
+                read_timeout=READ_TIMEOUT_SECONDS,
+                retries={'max_attempts': 1, 'mode': 'standard'}
+            ))
+        self.client = client
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = self.max_rate / 8
+        self.bucket = TokenBucket(self.max_rate, burst)
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+        self.rng = rng
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.calls = 0
+        self.throttles = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+
+    def invoke_model(self, max_attempts=None, **kwargs):
+        return self._call(self.client.invoke_model, kwargs, max_attempts)
+
+    def invoke_model_with_response_stream(self, max_attempts=None, **kwargs):
+        # The slot is held until the stream opens, not while it is consumed
+        return self._call(self.client.invoke_model_with_response_stream, kwargs, max_attempts)
+
+    def _call(self, method, kwargs, max_attempts=None):
+        """`max_attempts` overrides the governor's for one call, e.g. when a fallback model is waiting"""
+        max_attempts = max_attempts or self.max_attempts
+        attempt = 0
+        while True:
+            attempt += 1
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.calls += 1
+                self.wait_seconds += waited
+            try:
+                with self.in_flight:
+                    start = self.clock()
+                    response = method(**kwargs)
+                    self._local.service_seconds = self.clock() - start
+                self._recover_rate()
+                return response
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code', '')
+                throttled = code in THROTTLE_CODES
+                if not throttled and code not in RETRYABLE_CODES:
+                    self._count_failure()
+                    raise
+                error = e
+            except (ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError) as e:
+                throttled = False
+                error = e
+
+            if throttled:
+                self._slow_down()
+            if attempt >= max_attempts:
+                self._count_failure()
+                raise error
+            with self._lock:
+                self.retries += 1
+            self.sleep(self.rng.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))))
+
+    def last_service_seconds(self):
+        """Seconds this thread's last successful call took in the client, or None before its first"""
+        return getattr(self._local, 'service_seconds', None)
+
+    def _slow_down(self):
+        with self._lock:
+            self.throttles += 1
+            self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+
+    def _recover_rate(self):
+        if self.bucket.rate < self.max_rate:
+            with self._lock:
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + self.max_rate / 10)
+
+    def _count_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'throttles': self.throttles,
+                'retries': self.retries,
+                'failures': self.failures,
+                'rate_wait_seconds': round(self.wait_seconds, 2),
+                'requests_per_minute': round(self.bucket.rate * 60, 1)
+            }
+
+
+# One governor per process, so every agent shares the same quota and in-flight cap
+_bedrock_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_bedrock():
+    """The shared governed bedrock-runtime client, created on first use"""
+    global _bedrock_governor
+    with _governor_lock:
+        if _bedrock_governor is None:
+            _bedrock_governor = BedrockGovernor()
+        return _bedrock_governor
+
+
+def bedrock_stats():
+    return _bedrock_governor.stats() if _bedrock_governor is not None else None
@@ -0,0 +1,94 @@
+"""
+Benchmark - Word-lookup product classifier vs. the original keyword if/elif chain
+"""
+import random
+import sys
+import time
+from product_classifier import ProductClassifier
+
+PRODUCT_TYPES = ['FOOTWEAR', 'BAG', 'HANDBAGS', 'JEWELRY', 'CLOTHING', 'DRESS',
+                 'ACCESSORIES', 'ACCESSORY', '', 'OTHER']
+NAME_WORDS = ['Spring', 'Stella', 'Ring', 'Earrings', 'Tote', 'Crossbody', 'Chain',
+              'Belt', 'Bag', 'Scarf', 'Sunglasses', 'Hat', 'Chatelaine', 'Bracelet',
+              'Wallet', 'Sandal', 'Heel', 'Bootie', 'Clutch', 'Purse', 'Necklace',
+              'Shoulderbag', 'Boring', 'Leather', 'Suede', 'Gold', 'Silver', 'Mini']
+
+
+def legacy_categorize(item):
+    """The original categorization chain from OutfitBundleAgent.get_products_from_dynamodb"""
+    product_type = item.get('product_type', '').upper()
+    product_name = item.get('product_name', '').lower()
+    description = item.get('description', '').lower()
+
+    if product_type == 'FOOTWEAR':
+        return 'shoes'
+    elif (product_type in ['BAG', 'HANDBAG', 'HANDBAGS'] or
+          'bag' in product_name or 'handbag' in product_name or
+          'tote' in product_name or 'purse' in product_name or
+          'clutch' in product_name or 'crossbody' in product_name):
+        return 'handbags'
+    elif (product_type in ['JEWELRY', 'JEWELLERY'] or
+          'necklace' in product_name or 'earring' in product_name or
+          'bracelet' in product_name or 'ring' in product_name or
+          'jewelry' in product_name or 'jewellery' in product_name):
+        return 'jewelry'
+    elif product_type in ['CLOTHING', 'APPAREL', 'TOP', 'BOTTOM', 'DRESS']:
+        return 'clothing'
+    elif (product_type in ['ACCESSORIES', 'ACCESSORY'] or
+          'scarf' in product_name or 'hat' in product_name or
+          'belt' in product_name or 'sunglasses' in product_name or
+          'wallet' in product_name):
+        return 'other_accessories'
+    return None
+
+
+def synthetic_catalog(size, seed=7):
+    """Random products with realistic-looking multi-word names"""
+    rng = random.Random(seed)
+    return [
+        {
+            'product_id': f"synthetic_{i}",
+            'product_type': rng.choice(PRODUCT_TYPES),
+            'product_name': ' '.join(rng.sample(NAME_WORDS, rng.randint(1, 3))),
+            'description': 'Synthetic product description ' * rng.randint(2, 12)
+        }
+        for i in range(size)
+    ]
+
+
+def time_classifiers(classifiers, items, rounds=5):
+    """Best time per classifier, with rounds interleaved so load changes hit both alike"""
+    best = {name: float('inf') for name, _ in classifiers}
+    for _ in range(rounds):
+        for name, classify in classifiers:
+            start = time.perf_counter()
+            for item in items:
+                classify(item)
+            best[name] = min(best[name], time.perf_counter() - start)
+    for name, _ in classifiers:
+        print(f"  {name:<10} {best[name] * 1000:8.1f} ms  ({best[name] / len(items) * 1e6:.2f} us/item)")
+    return best
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = synthetic_catalog(size)
+    classifier = ProductClassifier()
+
+    print(f"Classifying {size:,} synthetic products (best of 5)")
+    best = time_classifiers([('legacy', legacy_categorize), ('lookup', classifier.classify)], items)
+    print(f"  speedup    {best['legacy'] / best['lookup']:8.2f}x")
+
+    disagreements = [
+        (item['product_type'], item['product_name'], legacy_categorize(item), classifier.classify(item))
+        for item in items
+        if legacy_categorize(item) != classifier.classify(item)
+    ]
+    # Precedence matches the chain, so these are all substring hits that are not whole words
+    print(f"\nDisagreements: {len(disagreements):,} ({len(disagreements) / size:.1%})")
+    for product_type, name, old, new in disagreements[:10]:
+        print(f"  [{product_type or '-'}] {name!r}: {old} -> {new}")
+
+
+if __name__ == "__main__":
+    main()
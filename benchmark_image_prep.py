@@ -0,0 +1,89 @@
+"""
+Benchmark - Image preparation time vs. Bedrock payload savings across max-edge and quality settings
+"""
+import argparse
+import base64
+import os
+import random
+import statistics
+import tempfile
+import time
+from image_prep import Image, prepare_image, sniff_media_type
+
+EDGES = [1092, 1568, 2048]
+QUALITIES = [75, 85, 92]
+
+
+def synthetic_photos(directory, count=4, seed=11):
+    """Phone-sized JPEGs (12 MP, high quality) standing in for real outfit photos"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        image = Image.new('RGB', (4032, 3024))
+        # Gradients plus noise compress roughly like a photo; flat colors would flatter the encoder
+        base = Image.linear_gradient('L').resize(image.size).convert('RGB')
+        noise = Image.effect_noise(image.size, 40).convert('RGB')
+        image = Image.blend(base, noise, 0.35)
+        path = os.path.join(directory, f"synthetic_outfit_{i + 1}.jpg")
+        image.save(path, format='JPEG', quality=95 - rng.randint(0, 5))
+        paths.append(path)
+    return paths
+
+
+def load_images(folder):
+    images = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        if sniff_media_type(data):
+            images.append((name, data))
+    return images
+
+
+def run(images, max_edge, quality):
+    times = []
+    original = prepared_total = 0
+    for _, data in images:
+        start = time.perf_counter()
+        prepared = prepare_image(data, max_edge=max_edge, quality=quality)
+        times.append((time.perf_counter() - start) * 1000)
+        original += len(data)
+        prepared_total += len(prepared.data)
+
+    # The request carries base64, a third larger than the raw bytes
+    payload = len(base64.b64encode(b'\0' * prepared_total))
+    print(f"  edge {max_edge:>4}  q{quality}  {statistics.mean(times):8.1f} ms/image  "
+          f"{original / 1024 / 1024:7.2f} MB -> {prepared_total / 1024 / 1024:6.2f} MB  "
+          f"({1 - prepared_total / original:6.1%} smaller, {payload / 1024:8.0f} KB base64)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark outfit image preparation')
+    parser.add_argument('folder', nargs='?', help='Folder of sample outfit photos (default: synthetic 12 MP JPEGs)')
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow is not installed; image preparation is a passthrough")
+        return
+
+    folder = args.folder
+    if folder is None:
+        folder = tempfile.mkdtemp()
+        synthetic_photos(folder)
+
+    images = load_images(folder)
+    if not images:
+        print(f"No images found in {folder}")
+        return
+
+    print(f"{len(images)} images from {folder}")
+    for max_edge in EDGES:
+        for quality in QUALITIES:
+            run(images, max_edge, quality)
+
+
+if __name__ == "__main__":
+    main()
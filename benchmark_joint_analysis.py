@@ -0,0 +1,94 @@
+"""
+Benchmark - Per-image vs. joint outfit analysis: latency, Bedrock calls and tokens for 1-5 outfit images
+
+    python benchmark_joint_analysis.py img/a.jpg img/b.jpg ...   # real Bedrock calls
+    python benchmark_joint_analysis.py --stub                     # modeled latency and tokens, no AWS
+
+Without image paths, synthetic 12 MP photos are used (needs Pillow).
+"""
+import argparse
+import base64
+import io
+import json
+import tempfile
+import time
+import outfit_bundle_agent
+import result_cache
+from image_prep import Image
+from outfit_bundle_agent import OutfitBundleAgent
+from prompt_budget import estimate_tokens
+from result_cache import TwoTierCache
+
+
+class StubBedrock:
+    """
+    Latency and usage modeled on Claude vision calls: a fixed overhead, a
+    per-image cost, per-output-token generation time, and about
+    width * height / 750 input tokens per image
+    """
+
+    def __init__(self, overhead=1.5, per_image=0.4, per_output_token=0.02):
+        self.overhead = overhead
+        self.per_image = per_image
+        self.per_output_token = per_output_token
+
+    def invoke_model(self, modelId, body):
+        content = json.loads(body)['messages'][0]['content']
+        images = [block for block in content if block['type'] == 'image']
+        input_tokens = sum(estimate_tokens(block['text']) for block in content if block['type'] == 'text')
+        for block in images:
+            width, height = Image.open(io.BytesIO(base64.b64decode(block['source']['data']))).size
+            input_tokens += width * height // 750
+
+        if len(images) == 1:
+            text = 'A tailored black blazer over a cream silk blouse; pointed pumps and gold jewelry would suit it.'
+            output_tokens = 300
+        else:
+            text = json.dumps({
+                'outfits': [{'outfit': i + 1, 'colors': ['black', 'cream'], 'style': 'tailored', 'formality': 'smart',
+                             'key_pieces': ['blazer'], 'shoes': 'pointed pumps', 'accessories': 'gold jewelry'}
+                            for i in range(len(images))],
+                'summary': 'Polished neutrals throughout.'
+            })
+            output_tokens = 150 * len(images) + 100
+
+        time.sleep(self.overhead + self.per_image * len(images) + self.per_output_token * output_tokens)
+        response = {'content': [{'text': text}], 'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens}}
+        return {'body': io.BytesIO(json.dumps(response).encode())}
+
+
+def measure(paths, mode, bedrock):
+    # A fresh, memory-only analysis cache per run, so every run pays for its calls
+    result_cache.analysis_cache = TwoTierCache('benchmark-analysis', persistent=False)
+    agent = OutfitBundleAgent(analysis_mode=mode)
+    if bedrock is not None:
+        agent.bedrock = bedrock
+    start = time.perf_counter()
+    descriptions, combined = agent.describe_outfits(paths)
+    elapsed = time.perf_counter() - start
+    return elapsed, agent.analysis_usage, sum(desc is not None for desc in descriptions), estimate_tokens(combined)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-image vs. joint outfit analysis')
+    parser.add_argument('images', nargs='*', help='Outfit image paths (default: synthetic photos)')
+    parser.add_argument('--max-images', type=int, default=5)
+    parser.add_argument('--stub', action='store_true', help='Use a modeled Bedrock stub instead of real calls')
+    args = parser.parse_args()
+
+    paths = args.images
+    if not paths:
+        from benchmark_image_prep import synthetic_photos
+        paths = synthetic_photos(tempfile.mkdtemp(), count=args.max_images)
+    bedrock = StubBedrock() if args.stub else None
+
+    print(f"{'images':>6} | {'mode':<9} | {'seconds':>7} | {'calls':>5} | {'in tok':>7} | {'out tok':>7} | {'ok':>2} | {'prompt tok':>10}")
+    for count in range(1, min(args.max_images, len(paths)) + 1):
+        for mode in outfit_bundle_agent.ANALYSIS_MODES:
+            elapsed, usage, ok, prompt_tokens = measure(paths[:count], mode, bedrock)
+            print(f"{count:>6} | {mode:<9} | {elapsed:7.2f} | {usage['calls']:>5} | {usage['input_tokens']:>7} | "
+                  f"{usage['output_tokens']:>7} | {ok:>2} | {prompt_tokens:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark - Vectorized outfit x product scoring vs. a per-pair Python loop
+"""
+import argparse
+import random
+import time
+import numpy as np
+from outfit_scorer import COLOR_FAMILIES, FORMALITY_TERMS, MATERIAL_GROUPS, SEASON_TERMS, OutfitScorer
+from product import Product
+
+COLORS = [color for colors in COLOR_FAMILIES.values() for color in colors]
+MATERIALS = [material for materials in MATERIAL_GROUPS.values() for material in materials]
+STYLE_TERMS = [term for terms in list(FORMALITY_TERMS.values()) + list(SEASON_TERMS.values()) for term in terms]
+FILLER = ['with', 'a', 'cushioned', 'footbed', 'and', 'classic', 'silhouette', 'for', 'the', 'season']
+
+
+def phrase(rng, words):
+    parts = rng.sample(COLORS, 2) + rng.sample(MATERIALS, 2) + rng.sample(STYLE_TERMS, 3) + rng.choices(FILLER, k=words)
+    rng.shuffle(parts)
+    return ' '.join(parts)
+
+
+def loop_scores(outfit_features, product_features, compatibility):
+    """The same scores one (outfit, product) pair at a time, over the non-zero features only"""
+    outfit_terms = [[(i, row[i]) for i in np.flatnonzero(row)] for row in outfit_features]
+    product_terms = [[(j, row[j]) for j in np.flatnonzero(row)] for row in product_features]
+    w = compatibility.tolist()
+    scores = []
+    for outfit in outfit_terms:
+        row = []
+        for product in product_terms:
+            total = 0.0
+            for i, a in outfit:
+                wi = w[i]
+                for j, b in product:
+                    total += a * wi[j] * b
+            row.append(total)
+        scores.append(row)
+    return np.array(scores, dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark outfit x product scoring')
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--outfits', type=int, default=100)
+    parser.add_argument('--loop-outfits', type=int, default=5, help='Outfits scored by the Python loop (extrapolated)')
+    args = parser.parse_args()
+
+    rng = random.Random(17)
+    products = [Product(f"p{i}", phrase(rng, 2).title(), phrase(rng, 8), rng.uniform(30, 250), 'shoes')
+                for i in range(args.products)]
+    outfits = [phrase(rng, 30) for _ in range(args.outfits)]
+    scorer = OutfitScorer()
+
+    start = time.perf_counter()
+    product_features = scorer.product_features(products)
+    product_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    outfit_features = scorer.features(outfits)
+    outfit_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    scores = scorer.score_matrix(outfit_features, product_features)
+    matrix_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    top = np.argpartition(-scores, 39, axis=1)[:, :40]
+    topk_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    loop = loop_scores(outfit_features[:args.loop_outfits], product_features, scorer.compatibility)
+    loop_ms = (time.perf_counter() - start) * 1000 * args.outfits / args.loop_outfits
+
+    assert np.allclose(loop, scores[:args.loop_outfits], atol=1e-4)
+    assert top.shape == (args.outfits, 40)
+
+    print(f"{args.outfits} outfits x {args.products} products, {len(scorer.dimensions)} features")
+    print(f"  product features (once per catalog) {product_ms:9.1f} ms")
+    print(f"  outfit features                     {outfit_ms:9.1f} ms")
+    print(f"  score matrix (one matmul)           {matrix_ms:9.1f} ms")
+    print(f"  top-40 per outfit                   {topk_ms:9.1f} ms")
+    print(f"  per-pair Python loop (extrapolated) {loop_ms:9.1f} ms  ({loop_ms / matrix_ms:,.0f}x the matmul)")
+
+
+if __name__ == "__main__":
+    main()
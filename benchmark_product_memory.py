@@ -0,0 +1,74 @@
+"""
+Benchmark - Memory of a full-catalog load as boto3 dicts, Product records and a mapped artifact
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+from catalog_artifact import CatalogArtifact, write_artifact
+from catalog_index import CatalogIndex
+from product import product_from_item
+
+PRODUCT_TYPES = ['FOOTWEAR', 'FOOTWEAR', 'HANDBAGS', 'JEWELRY', 'CLOTHING', 'ACCESSORIES']
+
+
+def boto3_items(count, seed=5):
+    """Items shaped like a full DynamoDB scan, extra attributes included"""
+    rng = random.Random(seed)
+    return [
+        {
+            'product_id': f"aldo_{10021228282155 + i}",
+            'product_name': f"Product {i}",
+            'product_type': rng.choice(PRODUCT_TYPES),
+            'price': f"${rng.uniform(20, 300):.2f}",
+            'description': 'Soft leather upper with a cushioned footbed and stacked heel. ' * rng.randint(1, 4),
+            'product_url': f"https://www.aldoshoes.com/us/en_US/p/{i}",
+            'original_image_url': f"https://media.aldoshoes.com/v3/product/{i}/main.jpg",
+            's3_image_key': f"products/{i}.jpg",
+            'colors': ['Black', 'Tan', 'White'][:rng.randint(1, 3)],
+            'sizes': [Decimal(s) / 2 for s in range(10, 22)],
+            'rating': Decimal(str(round(rng.uniform(3, 5), 1))),
+            'review_count': Decimal(rng.randint(0, 400)),
+            'scraped_at': '2025-01-06T12:00:00Z'
+        }
+        for i in range(count)
+    ]
+
+
+def measure(name, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = (time.perf_counter() - start) * 1000
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {name:<26} {current / 1024 / 1024:8.2f} MB  {elapsed:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark catalog memory')
+    parser.add_argument('--products', type=int, default=20000)
+    args = parser.parse_args()
+
+    # Each load starts from freshly scanned dicts and keeps only what it retains,
+    # so strings shared with the dicts are counted once, in the structure that keeps them
+    print(f"Full-catalog load of {args.products} products (retained heap, load time)")
+    measure('boto3 dicts', lambda: boto3_items(args.products))
+    measure('Product records', lambda: [product_from_item(item) for item in boto3_items(args.products)])
+    index = measure('CatalogIndex of Products', lambda: CatalogIndex(boto3_items(args.products)))
+
+    path = os.path.join(tempfile.mkdtemp(), 'catalog.bin')
+    write_artifact(index, 'benchmark', path)
+    measure('mapped artifact index', lambda: CatalogArtifact(path).to_index())
+    print(f"  (artifact file: {os.path.getsize(path) / 1024 / 1024:.2f} MB, paged in by the OS on demand)")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
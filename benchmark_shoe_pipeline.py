@@ -0,0 +1,92 @@
+"""
+Benchmark - Serial vs. pipelined shoe image matching against stub S3 and Bedrock clients with fixed latency
+"""
+import argparse
+import io
+import json
+import random
+import time
+from shoe_image_pipeline import ShoeImagePipeline, list_image_keys
+
+PAGE_SIZE = 1000  # list_objects_v2 page size
+IMAGE_BYTES = b'stub image ' * 200  # Unrecognized format, so image prep passes it through untouched
+
+
+class StubS3:
+    def __init__(self, keys, latency):
+        self.keys = keys
+        self.latency = latency
+
+    def list_objects_v2(self, Bucket, Prefix='', ContinuationToken=None):
+        time.sleep(self.latency)
+        start = int(ContinuationToken or 0)
+        page = self.keys[start:start + PAGE_SIZE]
+        response = {'Contents': [{'Key': key} for key in page], 'IsTruncated': start + PAGE_SIZE < len(self.keys)}
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + PAGE_SIZE)
+        return response
+
+    def get_object(self, Bucket, Key):
+        time.sleep(self.latency)
+        return {'Body': io.BytesIO(IMAGE_BYTES)}
+
+
+class StubBedrock:
+    def __init__(self, latency):
+        self.latency = latency
+        self.rng = random.Random(7)
+
+    def invoke_model(self, modelId, body):
+        time.sleep(self.latency)
+        json.loads(body)
+        text = json.dumps({'score': self.rng.randint(1, 10), 'reason': 'stub'})
+        return {'body': io.BytesIO(json.dumps({'content': [{'text': text}]}).encode())}
+
+
+def serial(s3, bedrock, description):
+    """The old loop: download, then score, one image at a time"""
+    pipeline = ShoeImagePipeline(s3, bedrock, 'bench')
+    scores = []
+    for key in list_image_keys(s3, 'bench'):
+        body = s3.get_object(Bucket='bench', Key=key)['Body'].read()
+        value, reason = pipeline.score_image(description, body)
+        scores.append({'image': key, 'score': value, 'reason': reason})
+    scores.sort(key=lambda x: x['score'], reverse=True)
+    return scores[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shoe image matching pipeline')
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--s3-latency', type=float, default=0.03, help='Seconds per S3 call')
+    parser.add_argument('--bedrock-latency', type=float, default=0.5, help='Seconds per scoring call')
+    parser.add_argument('--download-workers', type=int, default=8)
+    parser.add_argument('--scoring-workers', type=int, default=8)
+    parser.add_argument('--deadline', type=float, default=0, help='Pipeline deadline in seconds (0 = none)')
+    parser.add_argument('--skip-serial', action='store_true')
+    args = parser.parse_args()
+
+    keys = [f"shoes/{i:05d}.jpg" for i in range(args.images)]
+    s3 = StubS3(keys, args.s3_latency)
+    bedrock = StubBedrock(args.bedrock_latency)
+    description = 'Black tailored trousers with a cream silk blouse'
+
+    print(f"{args.images} images, S3 {args.s3_latency * 1000:.0f} ms/call, Bedrock {args.bedrock_latency * 1000:.0f} ms/call")
+    if not args.skip_serial:
+        start = time.perf_counter()
+        serial(s3, bedrock, description)
+        print(f"  serial                          {time.perf_counter() - start:7.2f} s")
+
+    pipeline = ShoeImagePipeline(s3, bedrock, 'bench', download_workers=args.download_workers,
+                                 scoring_workers=args.scoring_workers, deadline=args.deadline)
+    start = time.perf_counter()
+    top = pipeline.run(description)
+    elapsed = time.perf_counter() - start
+    print(f"  pipeline ({args.download_workers} download / {args.scoring_workers} scoring) {elapsed:7.2f} s  "
+          f"scored {pipeline.stats['scored']}/{pipeline.stats['listed']}"
+          f"{', deadline reached' if pipeline.stats['timed_out'] else ''}")
+    print(f"  best: {[shoe['image'] for shoe in top]}")
+
+
+if __name__ == "__main__":
+    main()
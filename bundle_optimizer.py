@@ -0,0 +1,162 @@
+"""
+Bundle Optimizer - Deterministic budget, mid-range and premium bundles from per-item relevance scores
+
+Each bundle is exactly one pair of shoes plus 0-2 add-ons from different
+add-on categories, chosen to maximize total relevance under the tier's price
+cap. Candidate lists are small (tens per category), so the multi-category
+knapsack is solved exactly by enumerating add-on combinations once and
+pairing them with every shoe.
+"""
+from itertools import combinations
+from outfit_scorer import get_outfit_scorer
+
+ADDON_CATEGORIES = ['handbags', 'jewelry', 'clothing', 'other_accessories']
+# Category labels as they appear in bundle items (matches what the model used to return)
+ITEM_LABELS = {
+    'shoes': 'shoes',
+    'handbags': 'handbag',
+    'jewelry': 'jewelry',
+    'clothing': 'clothing',
+    'other_accessories': 'accessory'
+}
+# Bundle 3 may go this far over the budget; the catalog fetch and prompts use it too
+PREMIUM_MARGIN = 75
+# The budget-friendly bundle stays within this share of the budget when it can
+BUDGET_SHARE = 0.6
+# An add-on must beat this relevance to be worth its price in a bundle
+ADDON_MIN_SCORE = 0.05
+MAX_ADDONS = 2
+
+TIERS = [
+    # bundle_type, bundle_name
+    ('budget', 'Budget-Friendly Pick'),
+    ('mid-range', 'Mid-Range Match'),
+    ('premium', 'Premium Upgrade')
+]
+
+
+def relevance_scores(outfit_description, products_by_category):
+    """
+    {product_id: relevance} from the outfit scorer. Without NumPy, candidates
+    are scored by their position in each (already ranked) list.
+    """
+    scorer = get_outfit_scorer()
+    if scorer is None:
+        return {
+            product.product_id: 1.0 - i / max(len(products), 1)
+            for products in products_by_category.values()
+            for i, product in enumerate(products)
+        }
+
+    products = [product for products in products_by_category.values() for product in products]
+    if not products:
+        return {}
+    scores = scorer.score_matrix(scorer.features([outfit_description]), scorer.product_features(products))[0]
+    return {product.product_id: float(score) for product, score in zip(products, scores)}
+
+
+def addon_combinations(products_by_category, scores, max_addons=MAX_ADDONS):
+    """Every `(cost, gain, [(category, product)])` choice of 0..max_addons add-ons from distinct categories"""
+    addons = [
+        (category, product)
+        for category in ADDON_CATEGORIES
+        for product in products_by_category.get(category, [])
+        if scores.get(product.product_id, 0) > ADDON_MIN_SCORE
+    ]
+    options = [(0.0, 0.0, [])]
+    for size in range(1, max_addons + 1):
+        for combo in combinations(addons, size):
+            if len({category for category, _ in combo}) < size:
+                continue
+            options.append((
+                sum(product.price for _, product in combo),
+                sum(scores[product.product_id] - ADDON_MIN_SCORE for _, product in combo),
+                list(combo)
+            ))
+    return options
+
+
+def best_bundle(shoes, options, scores, max_cost, min_cost=None, exclude=()):
+    """Highest-relevance (shoe, add-ons) with min_cost < total <= max_cost; cheaper wins ties"""
+    best = None
+    for shoe in shoes:
+        if shoe.product_id in exclude or shoe.price > max_cost:
+            continue
+        shoe_score = scores.get(shoe.product_id, 0.0)
+        for cost, gain, addons in options:
+            total = shoe.price + cost
+            if total > max_cost or (min_cost is not None and total <= min_cost):
+                continue
+            key = (shoe_score + gain, -total)
+            if best is None or key > best[0]:
+                best = (key, shoe, addons, total)
+    return best
+
+
+def match_score(items, scores, top_score):
+    """1-10 from the items' mean relevance relative to the best candidate"""
+    if top_score <= 0:
+        return 5
+    mean = sum(scores.get(product.product_id, 0.0) for _, product in items) / len(items)
+    return max(1, min(10, round(1 + 9 * mean / top_score)))
+
+
+def optimize_bundles(products_by_category, scores, budget, reason=None):
+    """
+    Budget-friendly (<= BUDGET_SHARE * budget), mid-range (above that, up
+    to the budget) and premium (budget < total <= budget + PREMIUM_MARGIN)
+    bundles, each with a different pair of shoes. A tier whose price band
+    has no bundle falls back to anything under its cap. Returns enriched
+    bundles in the agent's schema; `reason(category, product)` fills each
+    item's reason. Styling notes are left empty for the caller.
+    """
+    shoes = products_by_category.get('shoes', [])
+    options = addon_combinations(products_by_category, scores)
+    top_score = max(scores.values(), default=0.0)
+
+    caps = {
+        'budget': [(budget * BUDGET_SHARE, None), (budget, None)],
+        'mid-range': [(budget, budget * BUDGET_SHARE), (budget, None)],
+        'premium': [(budget + PREMIUM_MARGIN, budget), (budget + PREMIUM_MARGIN, None)]
+    }
+
+    bundles = []
+    used_shoes = set()
+    for bundle_type, bundle_name in TIERS:
+        found = None
+        for max_cost, min_cost in caps[bundle_type]:
+            found = best_bundle(shoes, options, scores, max_cost, min_cost, exclude=used_shoes)
+            if found:
+                break
+        if not found:
+            continue
+
+        _, shoe, addons, total = found
+        used_shoes.add(shoe.product_id)
+        items = [('shoes', shoe)] + addons
+        bundles.append({
+            'bundle_name': bundle_name,
+            'bundle_type': bundle_type,
+            'match_score': match_score(items, scores, top_score),
+            'total_cost': round(total, 2),
+            'items': [
+                {
+                    'product': product,
+                    'category': ITEM_LABELS[category],
+                    'reason': reason(category, product) if reason else ''
+                }
+                for category, product in items
+            ],
+            'styling_note': ''
+        })
+    return bundles
+
+
+def template_styling_note(bundle):
+    """Styling note without a model call, for the fast mode"""
+    shoe = bundle['items'][0]['product']
+    addons = [item['product'].name for item in bundle['items'][1:]]
+    note = f"Anchor the outfit with the {shoe.name}"
+    if addons:
+        note += f", finished with the {' and the '.join(addons)}"
+    return note + f" (${bundle['total_cost']:.2f} all in)."
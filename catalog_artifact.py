@@ -0,0 +1,298 @@
+"""
+Catalog Artifact - Compact columnar export of the product table for fast cold starts
+
+Layout (little-endian):
+    magic (8 bytes) | metadata length (uint32) | metadata JSON | padding | columns
+
+Columns are 8-byte aligned and described in the metadata as
+[offset, nbytes, typecode] relative to the start of the column section:
+    price           float64 per product
+    category        uint8 per product (index into metadata "categories")
+    <field>_offsets uint32 per product + 1, into the shared "strings" table
+    strings         UTF-8 bytes of every string field, field by field
+
+Products are stored grouped by category and sorted by price inside each group,
+so a loaded artifact becomes a CatalogIndex without parsing or sorting anything.
+"""
+import argparse
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from catalog_index import CatalogIndex
+from product import Product
+
+MAGIC = b'ALDOCAT1'
+HEADER = struct.Struct('<8sI')
+FORMAT_VERSION = 2
+
+ARTIFACT_FILENAME = 'catalog.bin'
+ARTIFACT_MAX_AGE_SECONDS = int(os.environ.get('CATALOG_ARTIFACT_MAX_AGE', str(24 * 3600)))
+
+# Product attributes stored in the string table
+STRING_FIELDS = ['product_id', 'name', 'description', 'product_url', 'image_url', 'image_key']
+NO_CATEGORY = 255
+
+
+def artifact_paths():
+    """Candidate artifact locations, most specific first"""
+    paths = []
+    if os.environ.get('CATALOG_ARTIFACT_PATH'):
+        paths.append(os.environ['CATALOG_ARTIFACT_PATH'])
+    paths.append(os.path.join('/tmp', ARTIFACT_FILENAME))
+    paths.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ARTIFACT_FILENAME))
+    return paths
+
+
+def _align(n, boundary=8):
+    return (n + boundary - 1) // boundary * boundary
+
+
+def write_artifact(index, version, path):
+    """Write a CatalogIndex to `path` as a columnar artifact"""
+    categories = []
+    ranges = []
+    rows = []
+    for category, prices, items in index.groups():
+        start = len(rows)
+        rows.extend(zip(prices, items))
+        if category is not None:
+            categories.append(category)
+        ranges.append([category, start, len(rows)])
+
+    category_codes = {category: code for code, category in enumerate(categories)}
+    columns = {
+        'price': array.array('d', (price for price, _ in rows)),
+        'category': array.array('B', (
+            category_codes.get(category, NO_CATEGORY)
+            for category, start, end in ranges
+            for _ in range(end - start)
+        ))
+    }
+
+    strings = bytearray()
+    for field in STRING_FIELDS:
+        offsets = array.array('I', [len(strings)])
+        for _, product in rows:
+            value = getattr(product, field)
+            strings += str(value).encode('utf-8') if value is not None else b''
+            offsets.append(len(strings))
+        columns[f"{field}_offsets"] = offsets
+
+    layout = {}
+    position = 0
+    for name, column in columns.items():
+        layout[name] = [position, len(column) * column.itemsize, column.typecode]
+        position = _align(position + len(column) * column.itemsize)
+    layout['strings'] = [position, len(strings), 'B']
+
+    metadata = json.dumps({
+        'format_version': FORMAT_VERSION,
+        'count': len(rows),
+        'created_at': time.time(),
+        'catalog_version': version,
+        'categories': categories,
+        'ranges': ranges,
+        'columns': layout
+    }).encode('utf-8')
+
+    # Write next to the target and rename so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(metadata)))
+        f.write(metadata)
+        data_start = _align(HEADER.size + len(metadata))
+        f.write(b'\0' * (data_start - HEADER.size - len(metadata)))
+        for name, column in list(columns.items()) + [('strings', strings)]:
+            offset = layout[name][0]
+            f.seek(data_start + offset)
+            f.write(column if isinstance(column, bytearray) else column.tobytes())
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+def _string_property(field):
+    def getter(self):
+        return self._artifact.string(field, self._row) or None
+    return property(getter)
+
+
+class ArtifactProduct:
+    """Read-only Product view that decodes its fields from the artifact on access"""
+    __slots__ = ('_artifact', '_row')
+
+    def __init__(self, artifact, row):
+        self._artifact = artifact
+        self._row = row
+
+    product_id = _string_property('product_id')
+    name = _string_property('name')
+    description = _string_property('description')
+    product_url = _string_property('product_url')
+    image_url = _string_property('image_url')
+    image_key = _string_property('image_key')
+
+    @property
+    def price(self):
+        return self._artifact.price[self._row]
+
+    @property
+    def category(self):
+        return self._artifact.category_name(self._row)
+
+    def to_product(self):
+        """Materialize a standalone Product"""
+        return Product(self.product_id, self.name, self.description, self.price, self.category,
+                       self.product_url, self.image_url, self.image_key)
+
+    def to_dict(self):
+        return self.to_product().to_dict()
+
+    def __eq__(self, other):
+        # Equal to a Product or another row with the same id, from either side of ==
+        if not isinstance(other, (Product, ArtifactProduct)):
+            return NotImplemented
+        return self.product_id == other.product_id
+
+    def __hash__(self):
+        return hash(self.product_id)
+
+
+class ArtifactRows:
+    """Lazy sequence of ArtifactProduct rows for one category range"""
+    __slots__ = ('_artifact', '_start', '_end')
+
+    def __init__(self, artifact, start, end):
+        self._artifact = artifact
+        self._start = start
+        self._end = end
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [ArtifactProduct(self._artifact, self._start + i)
+                    for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return ArtifactProduct(self._artifact, self._start + key)
+
+
+class CatalogArtifact:
+    """A memory-mapped catalog artifact; nothing is decoded until it is read"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, metadata_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog artifact")
+        self.metadata = json.loads(self._mmap[HEADER.size:HEADER.size + metadata_length])
+        if self.metadata['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported format version {self.metadata['format_version']}")
+
+        view = memoryview(self._mmap)
+        data_start = _align(HEADER.size + metadata_length)
+        self.columns = {}
+        for name, (offset, nbytes, typecode) in self.metadata['columns'].items():
+            self.columns[name] = view[data_start + offset:data_start + offset + nbytes].cast(typecode)
+
+        self.price = self.columns['price']
+        self.category_codes = self.columns['category']
+        self.strings = self.columns['strings']
+        self.string_fields = {
+            field: self.columns[f"{field}_offsets"] for field in STRING_FIELDS
+        }
+
+    @property
+    def version(self):
+        return self.metadata['catalog_version']
+
+    def age(self):
+        return time.time() - self.metadata['created_at']
+
+    def string(self, field, row):
+        offsets = self.string_fields[field]
+        return str(self.strings[offsets[row]:offsets[row + 1]], 'utf-8')
+
+    def category_name(self, row):
+        code = self.category_codes[row]
+        return self.metadata['categories'][code] if code != NO_CATEGORY else None
+
+    def to_index(self):
+        """CatalogIndex backed directly by the mapped columns"""
+        return CatalogIndex.from_groups(
+            (category, self.price[start:end], ArtifactRows(self, start, end))
+            for category, start, end in self.metadata['ranges']
+        )
+
+    def __len__(self):
+        return self.metadata['count']
+
+
+def find_artifact(paths=None, max_age=ARTIFACT_MAX_AGE_SECONDS):
+    """Return the newest readable artifact younger than `max_age`, or None"""
+    best = None
+    for path in paths or artifact_paths():
+        if not os.path.exists(path):
+            continue
+        try:
+            artifact = CatalogArtifact(path)
+        except Exception as e:
+            print(f"Ignoring unreadable catalog artifact {path}: {e}")
+            continue
+        if artifact.age() > max_age:
+            continue
+        if best is None or artifact.age() < best.age():
+            best = artifact
+    return best
+
+
+def export_catalog(output):
+    """Scan DynamoDB and write the catalog artifact"""
+    from catalog_snapshot import CatalogCache
+
+    start = time.time()
+    snapshot = CatalogCache()._load_snapshot()
+    count = write_artifact(snapshot.index, snapshot.version, output)
+    print(f"Exported {count} products (version {snapshot.version}) to {output} "
+          f"in {time.time() - start:.1f}s ({os.path.getsize(output) / 1024:.0f} KB)")
+
+
+def show_info(path):
+    """Print artifact metadata and how long it takes to map"""
+    start = time.perf_counter()
+    artifact = CatalogArtifact(path)
+    index = artifact.to_index()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{path}: {len(artifact)} products, version {artifact.version}, "
+          f"{artifact.age() / 3600:.1f}h old, mapped in {elapsed:.2f} ms")
+    for category, count in index.category_counts().items():
+        print(f"  {category}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catalog artifact tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Export DynamoDB products to an artifact')
+    export_parser.add_argument('--output', default=ARTIFACT_FILENAME, help=f'Output path (default: {ARTIFACT_FILENAME})')
+    info_parser = subparsers.add_parser('info', help='Describe an artifact')
+    info_parser.add_argument('path', nargs='?', default=ARTIFACT_FILENAME)
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_catalog(args.output)
+    else:
+        show_info(args.path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
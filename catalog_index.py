@@ -0,0 +1,116 @@
+"""
+Catalog Index - Products normalized once and kept price-sorted per category
+"""
+import random
+from bisect import bisect_left, bisect_right
+from product import product_from_item
+
+CATEGORIES = ['shoes', 'handbags', 'jewelry', 'clothing', 'other_accessories']
+
+
+class CatalogIndex:
+    """Per-category Product arrays sorted by price, so budget queries are a bisect and a slice"""
+
+    def __init__(self, items):
+        grouped = {}
+        for item in items:
+            product = product_from_item(item)
+            grouped.setdefault(product.category, []).append(product)
+
+        self._prices = {}
+        self._items = {}
+        for category, products in grouped.items():
+            products.sort(key=lambda product: product.price)
+            self._prices[category] = [product.price for product in products]
+            self._items[category] = products
+        self._positions = None
+
+    @classmethod
+    def from_groups(cls, groups):
+        """
+        Build from already price-sorted `(category, prices, items)` groups without
+        re-parsing or re-sorting, e.g. columns read from a catalog artifact.
+        Any sequences supporting len/index/slice work.
+        """
+        index = cls.__new__(cls)
+        index._prices = {}
+        index._items = {}
+        for category, prices, items in groups:
+            index._prices[category] = prices
+            index._items[category] = items
+        index._positions = None
+        return index
+
+    def groups(self):
+        """Yield `(category, prices, items)` per category, cheapest first"""
+        for category, items in self._items.items():
+            yield category, self._prices[category], items
+
+    def query(self, category, max_price, min_price=None, limit=None):
+        """
+        Items in `category` priced between `min_price` and `max_price`, cheapest first.
+        With `limit`, picks are spread evenly across the matching price range
+        rather than taking only the cheapest ones.
+        """
+        prices = self._prices.get(category, [])
+        hi = bisect_right(prices, max_price)
+        lo = bisect_left(prices, min_price) if min_price is not None else 0
+        matches = self._items.get(category, [])[lo:hi]
+
+        if limit is not None and len(matches) > limit:
+            step = len(matches) / limit
+            matches = [matches[int(i * step)] for i in range(limit)]
+        return matches
+
+    def sample(self, category, max_price, k, min_price=None, rng=random):
+        """
+        Random sample of up to `k` items in `category` within the price range.
+        The matching slice is cut into `k` equal price-ordered strata and one item
+        is drawn from each, so every request sees a different mix that still
+        spans the whole budget range. Costs O(k), not O(matches).
+        """
+        prices = self._prices.get(category, [])
+        hi = bisect_right(prices, max_price)
+        lo = bisect_left(prices, min_price) if min_price is not None else 0
+        items = self._items.get(category, [])
+        size = hi - lo
+
+        if size <= k:
+            return items[lo:hi] if size > 0 else []
+
+        step = size / k
+        picks = []
+        for i in range(k):
+            start = lo + int(i * step)
+            end = lo + int((i + 1) * step)
+            picks.append(items[rng.randrange(start, max(end, start + 1))])
+        return picks
+
+    def get(self, product_id):
+        """
+        The current item with `product_id`, or None if it left the catalog.
+        The id map is built on first use and holds positions, not copies.
+        """
+        if self._positions is None:
+            positions = {}
+            for category, items in self._items.items():
+                for i, item in enumerate(items):
+                    positions[item.product_id] = (category, i)
+            self._positions = positions
+        position = self._positions.get(product_id)
+        if position is None:
+            return None
+        category, i = position
+        return self._items[category][i]
+
+    def count(self, category, max_price, min_price=None):
+        """Number of items in `category` within the price range"""
+        prices = self._prices.get(category, [])
+        lo = bisect_left(prices, min_price) if min_price is not None else 0
+        return max(0, bisect_right(prices, max_price) - lo)
+
+    def category_counts(self):
+        return {category: len(items) for category, items in self._items.items()}
+
+    def __len__(self):
+        return sum(len(items) for items in self._items.values())
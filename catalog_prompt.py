@@ -0,0 +1,185 @@
+"""
+Catalog Prompt - The product half of the bundle prompt, pre-rendered for Bedrock prompt caching
+
+The bundle prompt is split into a stable prefix (instructions, product
+listings, response format) and a per-request suffix (outfits, shopper
+context, price limits). With prompt caching on, the prefix is kept in memory
+and marked with `cache_control`, so Bedrock reuses it across requests and
+only the suffix is billed as fresh input. BUNDLE_PROMPT_CACHE_SOURCE picks
+what the prefix lists:
+
+    candidates  the request's shortlisted candidates, fitted to
+                BUNDLE_PROMPT_TOKENS; cached per set of listed product ids,
+                so it only pays off when the same shortlist comes back
+    catalog     an outfit-independent selection per (catalog version, budget
+                band), shared by every request in the band; it ignores the
+                retrieval shortlist and BUNDLE_PROMPT_TOKENS
+"""
+import os
+import threading
+from bundle_optimizer import PREMIUM_MARGIN
+from catalog_index import CATEGORIES
+from prompt_budget import MAX_CANDIDATES, estimate_tokens, fit_candidates
+from result_cache import BUNDLE_BUDGET_BAND, budget_band
+
+# Needs a model with Bedrock prompt caching; otherwise Bedrock rejects the cache_control block
+PROMPT_CACHING = os.environ.get('BUNDLE_PROMPT_CACHING', '0') == '1'
+PROMPT_CACHE_SOURCES = ('candidates', 'catalog')
+PROMPT_CACHE_SOURCE = os.environ.get('BUNDLE_PROMPT_CACHE_SOURCE', 'candidates')
+if PROMPT_CACHE_SOURCE not in PROMPT_CACHE_SOURCES:
+    raise ValueError(f"BUNDLE_PROMPT_CACHE_SOURCE must be one of {', '.join(PROMPT_CACHE_SOURCES)}")
+# The cached prefix can be much larger than the per-request prompt: cache reads cost a tenth
+CATALOG_PROMPT_TOKENS = int(os.environ.get('BUNDLE_CATALOG_PROMPT_TOKENS', '6000'))
+CATALOG_PROMPT_CANDIDATES = int(os.environ.get('BUNDLE_CATALOG_PROMPT_CANDIDATES', '60'))
+# Prefixes kept in memory; Bedrock's prompt cache only holds each one for minutes anyway
+MAX_CANDIDATE_FRAGMENTS = 64
+
+# (prompt id prefix, heading, text when empty), in CATEGORIES order
+SECTIONS = [
+    ('S', 'SHOES', ''),
+    ('H', 'HANDBAGS', ''),
+    ('J', 'JEWELRY', 'No jewelry available'),
+    ('C', 'CLOTHING', 'No clothing available'),
+    ('A', 'OTHER ACCESSORIES', 'No other accessories available')
+]
+# Prompt lines per round for each section when fitting the token budget; shoes get twice as many
+SECTION_WEIGHTS = {'S': 2, 'H': 1, 'J': 1, 'C': 1, 'A': 1}
+
+
+def catalog_prefix(lines):
+    """Instructions, product listings and response format; the same for every outfit"""
+    listings = "\n\n".join(
+        f"{heading}:\n{chr(10).join(lines.get(prefix, [])) or empty}"
+        for prefix, heading, empty in SECTIONS
+    )
+    return f"""You put together bundles of shoes and accessories that match shoppers' outfits.
+
+AVAILABLE PRODUCTS:
+
+{listings}
+
+Each bundle MUST have:
+- 1 pair of shoes (REQUIRED - always include)
+- 0-2 additional items from: handbags, jewelry, clothing, or other accessories (OPTIONAL)
+- Match score (1-10) for how well the bundle complements ALL the outfits and context
+- Brief styling note explaining how it works with all outfits and the occasion/season
+
+Only add additional items if they truly enhance the outfit and fit within budget.
+A bundle with just shoes is perfectly acceptable if it maximizes value.
+
+Submit the bundles with the submit_bundles tool. Each bundle looks like:
+{{
+  "bundle_name": "Bundle name",
+  "bundle_type": "budget/mid-range/premium",
+  "match_score": 9,
+  "total_cost": 150.50,
+  "items": [
+    {{"id": "S1", "category": "shoes", "reason": "why it works"}},
+    {{"id": "H1", "category": "handbag", "reason": "why it works"}}
+  ],
+  "styling_note": "How to wear this bundle"
+}}"""
+
+
+def fit_sections(products_by_prefix, token_budget, max_candidates=MAX_CANDIDATES):
+    """fit_candidates over the five sections in prompt order"""
+    return fit_candidates([
+        (prefix, products_by_prefix[prefix], SECTION_WEIGHTS[prefix])
+        for prefix, _, _ in SECTIONS
+    ], token_budget, max_candidates)
+
+
+class CatalogFragment:
+    """A rendered prefix and the products its prompt ids point to"""
+    __slots__ = ('version', 'band', 'text', 'products', 'tokens')
+
+    def __init__(self, version, band, text, products, tokens):
+        self.version = version
+        self.band = band  # None for a candidates prefix
+        self.text = text
+        # Per category, in CATEGORIES order; `products[k][i]` is prompt id `{prefix}{i+1}`
+        self.products = products
+        self.tokens = tokens
+
+
+def render_catalog_fragment(index, version, budget):
+    """
+    Render the prefix for every budget in `budget`'s band: products up to the
+    band's highest premium price, spread evenly over each category's price range
+    """
+    band = budget_band(budget)
+    max_price = (band + 1) * BUNDLE_BUDGET_BAND + PREMIUM_MARGIN
+    candidates = {
+        prefix: index.query(category, max_price, limit=CATALOG_PROMPT_CANDIDATES)
+        for (prefix, _, _), category in zip(SECTIONS, CATEGORIES)
+    }
+    lines, _ = fit_sections(candidates, CATALOG_PROMPT_TOKENS - estimate_tokens(catalog_prefix({})),
+                            CATALOG_PROMPT_CANDIDATES)
+    text = catalog_prefix(lines)
+    products = tuple(candidates[prefix][:len(lines[prefix])] for prefix, _, _ in SECTIONS)
+    return CatalogFragment(str(version), band, text, products, estimate_tokens(text))
+
+
+def fit_candidates_fragment(version, products, token_budget):
+    """
+    The prefix listing the request's candidates (per category, in CATEGORIES
+    order) that fit `token_budget`, exactly as the inline prompt would. Returns
+    `(key, render)`: the ids it lists and a function that renders it.
+    """
+    candidates = {prefix: category_products for (prefix, _, _), category_products in zip(SECTIONS, products)}
+    lines, _ = fit_sections(candidates, token_budget)
+    listed = tuple(tuple(candidates[prefix][:len(lines[prefix])]) for prefix, _, _ in SECTIONS)
+    key = tuple(tuple(product.product_id for product in category_products) for category_products in listed)
+
+    def render():
+        text = catalog_prefix(lines)
+        return CatalogFragment(str(version), None, text, listed, estimate_tokens(text))
+    return key, render
+
+
+# Fragments for the current catalog version, shared by warm invocations
+_fragments = {}
+_fragments_lock = threading.Lock()
+
+
+def cached_fragment(version, key, render):
+    """The fragment stored under (`version`, `key`), rendered on first use"""
+    key = (str(version), key)
+    with _fragments_lock:
+        fragment = _fragments.get(key)
+        if fragment is None:
+            if any(cached_version != key[0] for cached_version, _ in _fragments):
+                _fragments.clear()  # A new catalog version retires every older fragment
+            if len(_fragments) >= MAX_CANDIDATE_FRAGMENTS:
+                del _fragments[next(iter(_fragments))]  # Oldest first
+            fragment = _fragments[key] = render()
+            print(f"Rendered catalog prompt for version {version}"
+                  + (f", band {fragment.band}" if fragment.band is not None else "")
+                  + f": ~{fragment.tokens} tokens, "
+                  + ", ".join(f"{prefix}={len(products)}" for (prefix, _, _), products in zip(SECTIONS, fragment.products)))
+        return fragment
+
+
+def get_catalog_fragment(index, version, budget):
+    """The prefix for (`version`, budget band of `budget`), rendered on first use"""
+    return cached_fragment(version, budget_band(budget), lambda: render_catalog_fragment(index, version, budget))
+
+
+def get_candidates_fragment(version, products, token_budget):
+    """The prefix for the candidates of `products` that fit `token_budget`, rendered once per set of ids"""
+    key, render = fit_candidates_fragment(version, products, token_budget)
+    return cached_fragment(version, key, render)
+
+
+def prompt_cache_usage(usage):
+    """Input tokens by source for one call, and the share read from the prompt cache"""
+    fresh = usage.get('input_tokens', 0)
+    read = usage.get('cache_read_input_tokens', 0)
+    written = usage.get('cache_creation_input_tokens', 0)
+    total = fresh + read + written
+    return {
+        'input_tokens': fresh,
+        'cache_read_input_tokens': read,
+        'cache_creation_input_tokens': written,
+        'cached_ratio': round(read / total, 3) if total else None
+    }
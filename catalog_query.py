@@ -0,0 +1,89 @@
+"""
+Catalog Query - Reads in-budget products per category from the category/price index
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from catalog_index import CATEGORIES
+from product import product_from_item
+
+# Sparse GSI maintained by backfill_category_price_index.py: only categorized
+# products carry the `category` attribute
+CATEGORY_PRICE_INDEX = 'category-price-index'
+CATEGORY_ATTRIBUTE = 'category'
+PRICE_ATTRIBUTE = 'price_value'
+
+# Each category is read as a few price bands so a limited query still covers
+# cheap and premium items instead of only the cheapest ones
+PRICE_BANDS = 5
+
+
+def price_bands(max_price, bands=PRICE_BANDS):
+    """Split [0, max_price] into non-overlapping (low, high) bands in whole cents"""
+    max_cents = int(round(max_price * 100))
+    edges = [round(max_cents * i / bands) for i in range(bands + 1)]
+    result = []
+    for i in range(bands):
+        low = edges[i] + (1 if i else 0)
+        high = edges[i + 1]
+        if low <= high:
+            result.append((Decimal(low) / 100, Decimal(high) / 100))
+    return result
+
+
+def query_band(table, category, low, high, limit=None):
+    """Query one category/price band; returns (items, consumed read capacity)"""
+    kwargs = {
+        'IndexName': CATEGORY_PRICE_INDEX,
+        'KeyConditionExpression': Key(CATEGORY_ATTRIBUTE).eq(category) & Key(PRICE_ATTRIBUTE).between(low, high),
+        'ReturnConsumedCapacity': 'TOTAL'
+    }
+    if limit:
+        kwargs['Limit'] = limit
+
+    items = []
+    consumed = 0.0
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        consumed += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+        if limit or 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return [product_from_item(item, category) for item in items], consumed
+
+
+def query_catalog(table, max_price, categories=CATEGORIES, limit=None, bands=PRICE_BANDS, max_workers=None):
+    """
+    Query every category for items priced up to `max_price`, all bands concurrently.
+    With `limit`, at most `limit` items are read per category, spread across the bands.
+    Returns ({category: items cheapest first}, total consumed read capacity).
+    """
+    band_ranges = price_bands(max_price, bands)
+    per_band = math.ceil(limit / len(band_ranges)) if limit and band_ranges else None
+    jobs = [(category, low, high) for category in categories for low, high in band_ranges]
+
+    results = {category: [] for category in categories}
+    consumed = 0.0
+    if not jobs:
+        return results, consumed
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as executor:
+        futures = [
+            (category, executor.submit(query_band, table, category, low, high, per_band))
+            for category, low, high in jobs
+        ]
+        # Bands were submitted cheapest first, so each category stays price-sorted
+        for category, future in futures:
+            items, capacity = future.result()
+            results[category].extend(items)
+            consumed += capacity
+
+    if limit:
+        for category, items in results.items():
+            if len(items) > limit:
+                step = len(items) / limit
+                results[category] = [items[int(i * step)] for i in range(limit)]
+    return results, consumed
@@ -0,0 +1,221 @@
+"""
+Catalog Snapshot - Warm, versioned copy of the product catalog shared across Lambda invocations
+"""
+import boto3
+import hashlib
+import os
+import threading
+import time
+from catalog_artifact import ARTIFACT_MAX_AGE_SECONDS, find_artifact
+from catalog_index import CatalogIndex
+from dynamodb_scan import parallel_scan
+
+TABLE_NAME = 'aldo-product-metadata'
+
+# A single item in the product table carries the catalog version. Writers bump
+# its `catalog_version` attribute whenever they change products.
+VERSION_MARKER_ID = '__catalog_version__'
+
+# Attributes the bundle pipeline reads; everything else is left in DynamoDB
+CATALOG_FIELDS = [
+    'product_id', 'product_name', 'description', 'price', 'product_type',
+    'product_url', 'original_image_url', 's3_image_key', 'catalog_version'
+]
+
+SNAPSHOT_TTL_SECONDS = int(os.environ.get('CATALOG_SNAPSHOT_TTL', '900'))
+VERSION_CHECK_SECONDS = int(os.environ.get('CATALOG_VERSION_CHECK_INTERVAL', '60'))
+
+
+class CatalogSnapshot:
+    """Immutable, pre-parsed view of the product table"""
+
+    def __init__(self, index, version, loaded_at=None, source='dynamodb'):
+        self.index = index
+        self.version = version
+        self.loaded_at = loaded_at or time.time()
+        self.source = source
+
+    @classmethod
+    def from_items(cls, items, version=None):
+        """Convert and index raw DynamoDB items"""
+        index = CatalogIndex(items)
+        return cls(index, version or cls._content_version(index))
+
+    @staticmethod
+    def _content_version(index):
+        """Fallback version derived from ids and prices when no marker exists"""
+        products = [product for _, _, group in index.groups() for product in group]
+        digest = hashlib.sha256()
+        for product in sorted(products, key=lambda p: str(p.product_id)):
+            digest.update(f"{product.product_id}:{product.price};".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def age(self):
+        return time.time() - self.loaded_at
+
+    def __len__(self):
+        return len(self.index)
+
+
+class CatalogCache:
+    """Keeps a catalog snapshot warm and refreshes it off the request path"""
+
+    def __init__(self, table_name=TABLE_NAME, ttl=SNAPSHOT_TTL_SECONDS,
+                 version_check_interval=VERSION_CHECK_SECONDS):
+        self.table_name = table_name
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self._table = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refresh_thread = None
+        self._last_version_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    @property
+    def table(self):
+        if self._table is None:
+            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+            self._table = dynamodb.Table(self.table_name)
+        return self._table
+
+    def get(self):
+        """Return the current snapshot, scanning only if none has been loaded yet"""
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                self.hits += 1
+
+        if snapshot is None:
+            with self._load_lock:
+                # Another request may have finished the load while we waited
+                with self._lock:
+                    snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self._load_snapshot()
+                    with self._lock:
+                        self._snapshot = snapshot
+                        self._last_version_check = time.time()
+                        self.misses += 1
+                else:
+                    with self._lock:
+                        self.hits += 1
+            return snapshot
+
+        if self._needs_refresh(snapshot):
+            self._refresh_async()
+        return snapshot
+
+    def set_snapshot(self, snapshot):
+        """Install a snapshot loaded elsewhere"""
+        with self._lock:
+            self._snapshot = snapshot
+            self._last_version_check = time.time()
+
+    def _needs_refresh(self, snapshot):
+        now = time.time()
+        return (now - snapshot.loaded_at > self.ttl or
+                now - self._last_version_check > self.version_check_interval)
+
+    def _refresh_async(self):
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._last_version_check = time.time()
+            self._refresh_thread = threading.Thread(target=self._refresh, daemon=True)
+            self._refresh_thread.start()
+
+    def _refresh(self):
+        """Rescan when the TTL expired or the version marker moved"""
+        try:
+            snapshot = self._snapshot
+            expired = snapshot.age() > self.ttl
+            marker_version = self._read_version_marker()
+            changed = marker_version is not None and marker_version != snapshot.version
+
+            if not (expired or changed):
+                return
+
+            new_snapshot = self._load_snapshot(marker_version)
+            with self._lock:
+                self._snapshot = new_snapshot
+                self.refreshes += 1
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            print(f"Catalog refresh failed: {e}")
+
+    def _read_version_marker(self):
+        response = self.table.get_item(Key={'product_id': VERSION_MARKER_ID})
+        marker = response.get('Item')
+        if not marker:
+            return None
+        return str(marker.get('catalog_version'))
+
+    def _load_snapshot(self, version=None):
+        """Scan the full product table into a new snapshot"""
+        if version is None:
+            version = self._read_version_marker()
+
+        items = [
+            item for item in parallel_scan(self.table, fields=CATALOG_FIELDS)
+            if item.get('product_id') != VERSION_MARKER_ID
+        ]
+        return CatalogSnapshot.from_items(items, version)
+
+    def load_artifact(self, paths=None, max_age=ARTIFACT_MAX_AGE_SECONDS):
+        """
+        Install the newest fresh catalog artifact found on disk, if any.
+        Returns True when one was loaded; otherwise the first request scans DynamoDB.
+        """
+        artifact = find_artifact(paths, max_age)
+        if artifact is None:
+            return False
+
+        # Treat the artifact like a fresh scan: the version check still picks up
+        # catalog changes made after it was exported
+        self.set_snapshot(CatalogSnapshot(artifact.to_index(), artifact.version, source='artifact'))
+        print(f"Loaded catalog artifact {artifact.path} ({len(artifact)} products, "
+              f"{artifact.age() / 3600:.1f}h old)")
+        return True
+
+    def stats(self):
+        """Hit/miss/age counters for the warm snapshot"""
+        with self._lock:
+            snapshot = self._snapshot
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'age_seconds': round(snapshot.age(), 1) if snapshot else None,
+                'version': snapshot.version if snapshot else None,
+                'products': len(snapshot) if snapshot else 0,
+                'source': snapshot.source if snapshot else None
+            }
+
+
+# Module-level cache: lives as long as the warm Lambda container / CLI process
+_catalog_cache = CatalogCache()
+
+# Cold start: prefer a packaged or /tmp artifact over scanning DynamoDB
+try:
+    _catalog_cache.load_artifact()
+except Exception as e:
+    print(f"Could not load catalog artifact: {e}")
+
+
+def get_catalog_snapshot():
+    """Return the shared warm catalog snapshot"""
+    return _catalog_cache.get()
+
+
+def catalog_stats():
+    """Return the shared cache counters"""
+    return _catalog_cache.stats()
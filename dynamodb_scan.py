@@ -0,0 +1,87 @@
+"""
+DynamoDB Scan - Parallel segmented scan that streams items as pages arrive
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SEGMENTS = int(os.environ.get('DYNAMODB_SCAN_SEGMENTS', '8'))
+
+_SEGMENT_DONE = object()
+
+
+def projection_args(fields):
+    """Build ProjectionExpression arguments, aliasing names so reserved words are safe"""
+    names = {f"#f{i}": field for i, field in enumerate(fields)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def parallel_scan(table, segments=DEFAULT_SEGMENTS, fields=None, page_size=None):
+    """
+    Yield every item in `table`, splitting the scan into `segments` segments
+    that are read concurrently. Items are yielded as soon as their page arrives,
+    so callers can filter and count without holding the whole table.
+    `fields` limits the attributes returned to the ones the caller needs.
+    """
+    scan_args = {}
+    if fields:
+        scan_args.update(projection_args(fields))
+    if page_size:
+        scan_args['Limit'] = page_size
+
+    if segments <= 1:
+        response = table.scan(**scan_args)
+        yield from response.get('Items', [])
+        while 'LastEvaluatedKey' in response:
+            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **scan_args)
+            yield from response.get('Items', [])
+        return
+
+    # Bounded so a slow consumer applies back-pressure instead of buffering the table
+    pages = queue.Queue(maxsize=segments * 2)
+    stop = threading.Event()
+
+    def put(page):
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def scan_segment(segment):
+        try:
+            kwargs = dict(scan_args, Segment=segment, TotalSegments=segments)
+            while not stop.is_set():
+                response = table.scan(**kwargs)
+                put(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except Exception as e:
+            put(e)
+        finally:
+            put(_SEGMENT_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=segments, thread_name_prefix='scan')
+    for segment in range(segments):
+        executor.submit(scan_segment, segment)
+
+    try:
+        remaining = segments
+        while remaining:
+            page = pages.get()
+            if page is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        # Also runs when the caller stops iterating early
+        stop.set()
+        executor.shutdown(wait=False)
@@ -0,0 +1,117 @@
+"""
+Image Prep - Normalize outfit photos (orientation, size, encoding) before they are sent to Bedrock
+"""
+import io
+import os
+import time
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it images are sent as received
+    Image = None
+
+# Claude downsamples anything larger, so extra pixels only cost bytes and latency
+MAX_EDGE = int(os.environ.get('IMAGE_MAX_EDGE', '1568'))
+JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', '85'))
+# Re-encode images this far above a typical JPEG size even if they need no resize
+MAX_BYTES_PER_PIXEL = 0.75
+
+BEDROCK_MEDIA_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp'}
+
+
+def sniff_media_type(data):
+    """The real image format from its magic bytes, or None if unrecognized"""
+    if data[:3] == b'\xff\xd8\xff':
+        return 'image/jpeg'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    if data[4:12] in (b'ftypheic', b'ftypheix', b'ftypmif1'):
+        return 'image/heic'
+    return None
+
+
+def prep_signature():
+    """Identifies the settings, so cached analyses of differently prepared images never mix"""
+    return f"{MAX_EDGE}:{JPEG_QUALITY}:{'pil' if Image is not None else 'raw'}"
+
+
+class PreparedImage:
+    """Bytes ready for a Bedrock image block, plus what preparing them saved"""
+    __slots__ = ('data', 'media_type', 'original_bytes', 'width', 'height', 'changed', 'elapsed_ms')
+
+    def __init__(self, data, media_type, original_bytes, width=None, height=None, changed=False, elapsed_ms=0.0):
+        self.data = data
+        self.media_type = media_type
+        self.original_bytes = original_bytes
+        self.width = width
+        self.height = height
+        self.changed = changed
+        self.elapsed_ms = elapsed_ms
+
+    def stats(self):
+        return {
+            'media_type': self.media_type,
+            'original_bytes': self.original_bytes,
+            'prepared_bytes': len(self.data),
+            'width': self.width,
+            'height': self.height,
+            'reencoded': self.changed,
+            'prep_ms': round(self.elapsed_ms, 1)
+        }
+
+
+def prepare_image(data, max_edge=MAX_EDGE, quality=JPEG_QUALITY):
+    """
+    Sniff the format, apply EXIF orientation, downscale so the longest edge is
+    at most `max_edge`, and re-encode (JPEG, or PNG when there is transparency).
+    Images that are already upright, small enough, compact and in a format
+    Bedrock accepts are passed through untouched.
+    """
+    start = time.perf_counter()
+    media_type = sniff_media_type(data)
+
+    def passthrough(width=None, height=None):
+        return PreparedImage(data, media_type or 'image/jpeg', len(data), width, height,
+                             elapsed_ms=(time.perf_counter() - start) * 1000)
+
+    if Image is None or media_type is None:
+        return passthrough()
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        rotated = image.getexif().get(0x0112, 1) not in (1, None)  # EXIF Orientation
+        oversized = max(width, height) > max_edge
+        bloated = len(data) > width * height * MAX_BYTES_PER_PIXEL
+        if not (rotated or oversized or bloated or media_type not in BEDROCK_MEDIA_TYPES):
+            return passthrough(width, height)
+
+        if oversized and media_type == 'image/jpeg':
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale instead of the full 12 MP
+            image.draft('RGB', (max_edge, max_edge))
+        image = ImageOps.exif_transpose(image)
+        if oversized:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image.save(output, format='PNG', optimize=True)
+            prepared_type = 'image/png'
+        else:
+            image.convert('RGB').save(output, format='JPEG', quality=quality, optimize=True)
+            prepared_type = 'image/jpeg'
+        prepared = output.getvalue()
+    except Exception as e:
+        print(f"Image preparation failed, sending original: {e}")
+        return passthrough()
+
+    # Only a rotation or resize justifies sending more bytes than we received
+    if len(prepared) >= len(data) and not (rotated or oversized) and media_type in BEDROCK_MEDIA_TYPES:
+        return passthrough(width, height)
+
+    return PreparedImage(prepared, prepared_type, len(data), image.size[0], image.size[1], changed=True,
+                         elapsed_ms=(time.perf_counter() - start) * 1000)
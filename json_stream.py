@@ -0,0 +1,76 @@
+"""
+JSON Stream - Incremental parser that yields top-level JSON array elements as soon as they close
+"""
+import json
+
+
+class JsonArrayStream:
+    """
+    Feed text chunks as they arrive; get back each complete element of the
+    first top-level JSON array. Text before the array (model preamble) and
+    after it is ignored, like slicing between the first '[' and the last ']'.
+    Elements that close but do not parse are kept in `broken` instead of
+    raising, and `partial` holds an element cut off by the end of the stream.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.broken = []
+
+    def feed(self, text):
+        """Consume a chunk and return the list of elements completed by it"""
+        elements = []
+        for char in text:
+            if self._finished:
+                break
+            if not self._started:
+                if char == '[':
+                    self._started = True
+                continue
+
+            if self._depth > 0:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    # The closing ']' of the top-level array
+                    self._finished = True
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    fragment = ''.join(self._buffer)
+                    try:
+                        elements.append(json.loads(fragment))
+                    except ValueError:
+                        self.broken.append(fragment)
+                    self._buffer = []
+        return elements
+
+    @property
+    def finished(self):
+        return self._finished
+
+    @property
+    def partial(self):
+        """Text of the element still open when the input stopped, or None"""
+        if self._depth > 0:
+            return ''.join(self._buffer)
+        return None
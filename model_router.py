@@ -0,0 +1,236 @@
+"""
+Model Router - Picks the Bedrock model for each pipeline stage from configurable tiers by observed latency
+
+Every stage (outfit analysis, shoe rating, bundle assembly, styling notes)
+has a route: a primary tier followed by faster fallback tiers. The router
+keeps the latest call latencies per stage and tier. A tier moves aside for
+FALLBACK_COOLDOWN seconds when its p90 goes over the stage's latency SLO, or
+when a call to it is throttled or times out; the call then goes to the next
+tier. After the cooldown the primary is tried again.
+
+    MODEL_TIER_STANDARD, MODEL_TIER_FAST    model id behind each tier
+    MODEL_ROUTE_<STAGE>                     tiers to try in order, e.g. "standard,fast" or "fast"
+    MODEL_SLO_<STAGE>                       latency SLO in seconds
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from botocore.exceptions import ClientError, ReadTimeoutError
+from bedrock_client import THROTTLE_CODES, BedrockGovernor
+
+TIERS = {
+    'standard': os.environ.get('MODEL_TIER_STANDARD', 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'),
+    # Claude 3 Haiku rather than 3.5: outfit analysis and image scoring need vision
+    'fast': os.environ.get('MODEL_TIER_FAST', 'us.anthropic.claude-3-haiku-20240307-v1:0')
+}
+
+# Stage: (default route, default latency SLO in seconds)
+STAGE_DEFAULTS = {
+    'analysis': ('standard,fast', 12.0),
+    'rating': ('standard,fast', 15.0),
+    'bundle': ('standard,fast', 30.0),
+    'styling': ('standard,fast', 10.0)
+}
+
+# Latencies kept per stage and tier; the SLO is checked against their p90
+LATENCY_WINDOW = int(os.environ.get('MODEL_LATENCY_WINDOW', '20'))
+MIN_SAMPLES = 3
+FALLBACK_COOLDOWN_SECONDS = float(os.environ.get('MODEL_FALLBACK_COOLDOWN', '60'))
+# Attempts on a throttled tier that has a fallback behind it; the last tier gets the governor's full retries
+ROUTED_MAX_ATTEMPTS = 2
+
+
+def stage_routes():
+    """{stage: (tiers, slo_seconds)} from the environment"""
+    routes = {}
+    for stage, (default_route, default_slo) in STAGE_DEFAULTS.items():
+        route = os.environ.get(f'MODEL_ROUTE_{stage.upper()}', default_route)
+        tiers = [tier.strip() for tier in route.split(',') if tier.strip()]
+        unknown = [tier for tier in tiers if tier not in TIERS]
+        if not tiers or unknown:
+            raise ValueError(f"MODEL_ROUTE_{stage.upper()}={route!r}: expected tiers from {sorted(TIERS)}")
+        routes[stage] = (tiers, float(os.environ.get(f'MODEL_SLO_{stage.upper()}', default_slo)))
+    return routes
+
+
+def fallback_reason(error):
+    """'throttle' or 'timeout' if `error` should send the call to the next tier; None otherwise"""
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code', '')
+        if code in THROTTLE_CODES:
+            return 'throttle'
+        if code == 'ModelTimeoutException':
+            return 'timeout'
+    if isinstance(error, ReadTimeoutError):
+        return 'timeout'
+    return None
+
+
+def without_cache_control(request_body):
+    """
+    A copy of the request without prompt caching markers. The catalog prefix is
+    cached for the primary model only: a fallback tier may not support prompt
+    caching, and it serves too few calls to earn back the cache write.
+    """
+    body = json.loads(json.dumps(request_body))
+    for message in body.get('messages', []):
+        if isinstance(message.get('content'), list):
+            for block in message['content']:
+                block.pop('cache_control', None)
+    return body
+
+
+def p90(samples):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.9 * len(ordered)) - 1)]
+
+
+class ModelRouter:
+    """Chooses and calls the model for each stage; shared by every agent in the process"""
+
+    def __init__(self, routes=None, tiers=None, window=LATENCY_WINDOW, cooldown=FALLBACK_COOLDOWN_SECONDS,
+                 clock=time.monotonic):
+        self.routes = routes if routes is not None else stage_routes()
+        self.tiers = tiers if tiers is not None else dict(TIERS)
+        self.window = window
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._latencies = {}  # (stage, tier) -> recent call seconds
+        self._demoted = {}  # (stage, tier) -> (until, reason)
+        self._counts = {stage: {'calls': 0, 'fallbacks': 0, 'throttles': 0, 'timeouts': 0, 'slo_breaches': 0}
+                        for stage in self.routes}
+
+    def primary_model(self, stage):
+        """The model `stage` uses when nothing is wrong; cache keys use it"""
+        return self.tiers[self.routes[stage][0][0]]
+
+    def candidates(self, stage):
+        """`(tiers, reason)`: tiers to try now, in order, and why the primary is not first (None if it is)"""
+        tiers, _ = self.routes[stage]
+        now = self.clock()
+        available = []
+        reason = None
+        with self._lock:
+            for tier in tiers:
+                until, why = self._demoted.get((stage, tier), (0, None))
+                if until > now:
+                    reason = reason or why
+                else:
+                    available.append(tier)
+        # Everything is demoted: the last tier is still the fastest there is
+        return available or tiers[-1:], reason
+
+    def demote(self, stage, tier, reason):
+        """Skip `tier` for `stage` until the cooldown ends"""
+        with self._lock:
+            self._demoted[(stage, tier)] = (self.clock() + self.cooldown, reason)
+            self._latencies.pop((stage, tier), None)  # After the cooldown it is judged on fresh calls
+            key = {'throttle': 'throttles', 'timeout': 'timeouts', 'slo': 'slo_breaches'}[reason]
+            self._counts[stage][key] += 1
+        print(f"Model router: {stage} moves off {tier} for {self.cooldown:.0f}s ({reason})")
+
+    def record_latency(self, stage, tier, seconds):
+        """Add one call's latency; demotes `tier` if its p90 is over the SLO and a faster tier follows it"""
+        tiers, slo = self.routes[stage]
+        with self._lock:
+            samples = self._latencies.setdefault((stage, tier), deque(maxlen=self.window))
+            samples.append(seconds)
+            breached = len(samples) >= MIN_SAMPLES and p90(samples) > slo
+        if breached and tier != tiers[-1]:
+            self.demote(stage, tier, 'slo')
+
+    def invoke(self, bedrock, stage, request_body, stream=False):
+        """
+        Call `stage`'s current model with `request_body`. Returns `(response,
+        route)`; route records the tier and model used and why. A throttled or
+        timed-out call moves on to the next tier. Through a BedrockGovernor only
+        the successful attempt's service time counts, not rate limiting, queueing
+        for an in-flight slot or backoff. Stream latency is not recorded: only
+        opening the stream is timed.
+        """
+        tiers, reason = self.candidates(stage)
+        primary = self.routes[stage][0][0]
+        for position, tier in enumerate(tiers):
+            last = position == len(tiers) - 1
+            kwargs = {
+                'modelId': self.tiers[tier],
+                'body': json.dumps(request_body if tier == primary else without_cache_control(request_body))
+            }
+            if not last and isinstance(bedrock, BedrockGovernor):
+                kwargs['max_attempts'] = ROUTED_MAX_ATTEMPTS
+            method = bedrock.invoke_model_with_response_stream if stream else bedrock.invoke_model
+            start = self.clock()
+            try:
+                response = method(**kwargs)
+            except Exception as e:
+                failure = fallback_reason(e)
+                if failure is None or last:
+                    raise
+                self.demote(stage, tier, failure)
+                reason = failure
+                continue
+            seconds = self.clock() - start
+            if isinstance(bedrock, BedrockGovernor):
+                seconds = bedrock.last_service_seconds()
+            if not stream:
+                self.record_latency(stage, tier, seconds)
+            with self._lock:
+                self._counts[stage]['calls'] += 1
+                self._counts[stage]['fallbacks'] += tier != primary
+            return response, {
+                'stage': stage,
+                'tier': tier,
+                'model': self.tiers[tier],
+                'fallback': tier != primary,
+                'reason': reason if tier != primary else 'primary',
+                'seconds': round(seconds, 2)
+            }
+
+    def stats(self):
+        now = self.clock()
+        stats = {}
+        with self._lock:
+            for stage, (tiers, slo) in self.routes.items():
+                models = {}
+                for tier in tiers:
+                    samples = self._latencies.get((stage, tier), ())
+                    until, _ = self._demoted.get((stage, tier), (0, None))
+                    models[tier] = {
+                        'model': self.tiers[tier],
+                        'samples': len(samples),
+                        'p90_seconds': round(p90(samples), 2) if samples else None,
+                        'demoted_seconds': round(max(0, until - now), 1)
+                    }
+                stats[stage] = dict(self._counts[stage], route=tiers, slo_seconds=slo, tiers=models)
+        return stats
+
+
+def merge_route(routes, route):
+    """Fold one call's route into a per-request summary `{stage: {...}}` for the response metadata"""
+    summary = routes.setdefault(route['stage'], {'calls': 0, 'fallback_calls': 0})
+    summary['calls'] += 1
+    summary['fallback_calls'] += route['fallback']
+    summary.update(tier=route['tier'], model=route['model'], reason=route['reason'])
+    return routes
+
+
+# One router per process, so every agent learns from the same latencies
+_model_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """The shared model router, created on first use"""
+    global _model_router
+    with _router_lock:
+        if _model_router is None:
+            _model_router = ModelRouter()
+        return _model_router
+
+
+def model_router_stats():
+    return _model_router.stats() if _model_router is not None else None
@@ -1,409 +1,848 @@
-"""
-Outfit Bundle Agent - Suggests complete bundles of shoes and accessories for outfits
-"""
-import boto3
-import json
-import base64
-import sys
-import os
-
-class OutfitBundleAgent:
-    def __init__(self, budget=200, age=None, gender=None, occasion=None, season=None):
-        self.s3 = boto3.client('s3', region_name='us-east-1')
-        self.bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.table = self.dynamodb.Table('aldo-product-metadata')
-        self.bucket_name = 'aldo-images'
-        self.budget = budget
-        self.age = age
-        self.gender = gender
-        self.occasion = occasion
-        self.season = season
-        
-    def analyze_outfit(self, image_path):
-        """Analyze the outfit image and get description"""
-        
-        with open(image_path, 'rb') as f:
-            image_bytes = base64.b64encode(f.read()).decode('utf-8')
-        
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_bytes
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": "Describe this outfit in detail, focusing on colors, style, and formality. What type of shoes and accessories would complement this outfit best?"
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        response = self.bedrock.invoke_model(
-            modelId='us.anthropic.claude-3-5-sonnet-20241022-v2:0',
-            body=json.dumps(request_body)
-        )
-        
-        response_body = json.loads(response['body'].read())
-        outfit_description = response_body['content'][0]['text']
-        
-        return outfit_description
-    
-    def get_products_from_dynamodb(self, limit=30):
-        """Get products from DynamoDB within budget + premium range, separated by type (optimized)"""
-        premium_budget = self.budget + 75  # Increased from 50 to 75
-        
-        try:
-            # Limit scan to reduce time - only get what we need
-            response = self.table.scan(Limit=300)  # Increased to get more variety
-            items = response.get('Items', [])
-            
-            # Separate products by type and filter by premium budget
-            shoes = []
-            handbags = []
-            jewelry = []
-            clothing = []
-            other_accessories = []
-            
-            for item in items:
-                price_str = str(item.get('price', '0'))
-                price = float(price_str.replace('$', '').replace(',', ''))
-                item['price_float'] = price
-                
-                # Include items up to premium budget
-                if price > premium_budget:
-                    continue
-                
-                product_type = item.get('product_type', '').upper()
-                product_name = item.get('product_name', '').lower()
-                description = item.get('description', '').lower()
-                
-                # Categorize products
-                if product_type == 'FOOTWEAR' and len(shoes) < limit:
-                    shoes.append(item)
-                    
-                elif len(handbags) < limit and (product_type in ['BAG', 'HANDBAG', 'HANDBAGS'] or
-                      'bag' in product_name or 'handbag' in product_name or 
-                      'tote' in product_name or 'purse' in product_name or
-                      'clutch' in product_name or 'crossbody' in product_name):
-                    handbags.append(item)
-                    
-                elif len(jewelry) < limit and (product_type in ['JEWELRY', 'JEWELLERY'] or
-                      'necklace' in product_name or 'earring' in product_name or
-                      'bracelet' in product_name or 'ring' in product_name or
-                      'jewelry' in product_name or 'jewellery' in product_name):
-                    jewelry.append(item)
-                    
-                elif len(clothing) < limit and product_type in ['CLOTHING', 'APPAREL', 'TOP', 'BOTTOM', 'DRESS']:
-                    clothing.append(item)
-                    
-                elif len(other_accessories) < limit and (product_type in ['ACCESSORIES', 'ACCESSORY'] or
-                      'scarf' in product_name or 'hat' in product_name or
-                      'belt' in product_name or 'sunglasses' in product_name or
-                      'wallet' in product_name):
-                    other_accessories.append(item)
-                
-                # Stop early if we have enough of each
-                if (len(shoes) >= limit and len(handbags) >= limit and 
-                    len(jewelry) >= limit and len(clothing) >= limit and 
-                    len(other_accessories) >= limit):
-                    break
-            
-            return shoes, handbags, jewelry, clothing, other_accessories
-            
-        except Exception as e:
-            print(f"Error fetching from DynamoDB: {e}")
-            return [], [], [], [], []
-    
-    def create_bundles(self, outfit_description, shoes, handbags, jewelry, clothing, other_accessories):
-        """Create outfit bundles using Claude"""
-        
-        # Prepare product descriptions - limit to 15 each for faster processing
-        shoes_text = "\n".join([
-            f"S{i+1}. {s.get('product_name')} (${s.get('price_float', 0):.2f}) - {s.get('description', 'No description')}"
-            for i, s in enumerate(shoes[:15])
-        ])
-        
-        handbags_text = "\n".join([
-            f"H{i+1}. {h.get('product_name')} (${h.get('price_float', 0):.2f}) - {h.get('description', 'No description')}"
-            for i, h in enumerate(handbags[:15])
-        ])
-        
-        jewelry_text = "\n".join([
-            f"J{i+1}. {j.get('product_name')} (${j.get('price_float', 0):.2f}) - {j.get('description', 'No description')}"
-            for i, j in enumerate(jewelry[:15])
-        ]) if jewelry else "No jewelry available"
-        
-        clothing_text = "\n".join([
-            f"C{i+1}. {c.get('product_name')} (${c.get('price_float', 0):.2f}) - {c.get('description', 'No description')}"
-            for i, c in enumerate(clothing[:15])
-        ]) if clothing else "No clothing available"
-        
-        accessories_text = "\n".join([
-            f"A{i+1}. {a.get('product_name')} (${a.get('price_float', 0):.2f}) - {a.get('description', 'No description')}"
-            for i, a in enumerate(other_accessories[:15])
-        ]) if other_accessories else "No other accessories available"
-        
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2000,  # Reduced from 4000 for faster response
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"""I need to match shoes and handbags with these outfits:
-
-{outfit_description}
-
-CONTEXT:
-Age: {self.age if self.age else 'Not specified'}
-Gender: {self.gender if self.gender else 'Not specified'}
-Occasion: {self.occasion if self.occasion else 'Not specified'}
-Season: {self.season if self.season else 'Not specified'}
-
-AVAILABLE PRODUCTS:
-
-SHOES:
-{shoes_text}
-
-HANDBAGS:
-{handbags_text}
-
-JEWELRY:
-{jewelry_text}
-
-CLOTHING:
-{clothing_text}
-
-OTHER ACCESSORIES:
-{accessories_text}
-
-Create 3 bundles that work well with ALL the outfits described above, considering the age, gender, occasion, and season:
-- Bundle 1: Budget-friendly (under ${self.budget}) - can have 1-3 items
-- Bundle 2: Mid-range (under ${self.budget}) - can have 1-3 items
-- Bundle 3: Premium upgrade (${self.budget} to ${self.budget + 75}) - can have 1-3 items
-
-Each bundle MUST have:
-- 1 pair of shoes (REQUIRED - always include)
-- 0-2 additional items from: handbags, jewelry, clothing, or other accessories (OPTIONAL)
-- Match score (1-10) for how well the bundle complements ALL the outfits and context
-- Brief styling note explaining how it works with all outfits and the occasion/season
-
-IMPORTANT: 
-- Bundles 1 and 2 MUST stay under ${self.budget}
-- Bundle 3 can go up to ${self.budget + 75}
-- Only add additional items if they truly enhance the outfit and fit within budget
-- A bundle with just shoes is perfectly acceptable if it maximizes value
-
-Respond with a JSON array:
-[{{
-  "bundle_name": "Bundle name",
-  "bundle_type": "budget/mid-range/premium",
-  "match_score": 9,
-  "total_cost": 150.50,
-  "items": [
-    {{"id": "S1", "category": "shoes", "reason": "why it works"}},
-    {{"id": "H1", "category": "handbag", "reason": "why it works"}}
-  ],
-  "styling_note": "How to wear this bundle"
-}}]"""
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        try:
-            bedrock_response = self.bedrock.invoke_model(
-                modelId='us.anthropic.claude-3-5-sonnet-20241022-v2:0',
-                body=json.dumps(request_body)
-            )
-            
-            response_body = json.loads(bedrock_response['body'].read())
-            analysis_text = response_body['content'][0]['text']
-            
-            # Extract JSON from response
-            start = analysis_text.find('[')
-            end = analysis_text.rfind(']') + 1
-            json_str = analysis_text[start:end]
-            bundles = json.loads(json_str)
-            
-            # Map IDs back to actual products
-            product_maps = {
-                'S': {f"S{i+1}": s for i, s in enumerate(shoes[:20])},
-                'H': {f"H{i+1}": h for i, h in enumerate(handbags[:20])},
-                'J': {f"J{i+1}": j for i, j in enumerate(jewelry[:20])},
-                'C': {f"C{i+1}": c for i, c in enumerate(clothing[:20])},
-                'A': {f"A{i+1}": a for i, a in enumerate(other_accessories[:20])}
-            }
-            
-            enriched_bundles = []
-            for bundle in bundles:
-                items_list = bundle.get('items', [])
-                
-                if not items_list or len(items_list) < 2:
-                    continue
-                
-                enriched_items = []
-                for item in items_list:
-                    item_id = item.get('id', '')
-                    if not item_id:
-                        continue
-                    
-                    # Get the product from the appropriate map
-                    prefix = item_id[0]
-                    product = product_maps.get(prefix, {}).get(item_id, {})
-                    
-                    if product:
-                        enriched_items.append({
-                            'product': product,
-                            'category': item.get('category', 'unknown'),
-                            'reason': item.get('reason', '')
-                        })
-                
-                if len(enriched_items) >= 1:  # At least shoes (changed from 2)
-                    enriched_bundles.append({
-                        'bundle_name': bundle.get('bundle_name', 'Unnamed Bundle'),
-                        'bundle_type': bundle.get('bundle_type', 'standard'),
-                        'match_score': bundle.get('match_score', 0),
-                        'total_cost': bundle.get('total_cost', 0),
-                        'items': enriched_items,
-                        'styling_note': bundle.get('styling_note', '')
-                    })
-            
-            return enriched_bundles
-            
-        except Exception as e:
-            print(f"Error creating bundles: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
-    
-    def display_bundles(self, bundles, outfit_names):
-        """Display the bundles in JSON format"""
-        output = {
-            "outfits": outfit_names if isinstance(outfit_names, list) else [outfit_names],
-            "context": {
-                "age": self.age,
-                "gender": self.gender,
-                "occasion": self.occasion,
-                "season": self.season,
-                "budget": self.budget
-            },
-            "bundles": []
-        }
-        
-        for i, bundle in enumerate(bundles, 1):
-            items_data = []
-            
-            for item in bundle['items']:
-                product = item['product']
-                items_data.append({
-                    "category": item['category'],
-                    "product_name": product.get('product_name'),
-                    "price": product.get('price_float', 0),
-                    "product_id": product.get('product_id'),
-                    "product_url": product.get('product_url'),
-                    "image_url": product.get('original_image_url'),
-                    "reason": item['reason']
-                })
-            
-            bundle_data = {
-                "bundle_number": i,
-                "bundle_name": bundle['bundle_name'],
-                "bundle_type": bundle.get('bundle_type', 'standard'),
-                "match_score": bundle['match_score'],
-                "total_cost": bundle['total_cost'],
-                "items": items_data,
-                "styling_note": bundle['styling_note']
-            }
-            
-            output["bundles"].append(bundle_data)
-        
-        print(json.dumps(output, indent=2))
-        
-
-    
-    def run(self, outfit_images):
-        """Main agent execution for multiple outfit images"""
-        try:
-            # Get products once
-            shoes, handbags, jewelry, clothing, other_accessories = self.get_products_from_dynamodb()
-            
-            if not shoes:
-                return {}
-            
-            # Step 1: Analyze all outfits
-            outfit_descriptions = []
-            valid_images = []
-            for outfit_image in outfit_images:
-                if not os.path.exists(outfit_image):
-                    continue
-                outfit_description = self.analyze_outfit(outfit_image)
-                outfit_descriptions.append(outfit_description)
-                valid_images.append(os.path.basename(outfit_image))
-            
-            if not outfit_descriptions:
-                return {}
-            
-            # Step 2: Combine all outfit descriptions
-            combined_description = "\n\n".join([
-                f"OUTFIT {i+1} ({valid_images[i]}):\n{desc}"
-                for i, desc in enumerate(outfit_descriptions)
-            ])
-            
-            # Step 3: Create bundles that work for all outfits
-            bundles = self.create_bundles(combined_description, shoes, handbags, jewelry, clothing, other_accessories)
-            
-            # Step 4: Display results
-            self.display_bundles(bundles, valid_images)
-            
-            return bundles
-            
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return {}
-
-
-def main():
-    if len(sys.argv) < 2:
-        sys.exit(1)
-    
-    # Parse command line arguments
-    import argparse
-    parser = argparse.ArgumentParser(description='Outfit Bundle Agent')
-    parser.add_argument('images', nargs='+', help='Outfit image paths')
-    parser.add_argument('--budget', type=int, default=200, help='Budget in dollars (default: 200)')
-    parser.add_argument('--age', type=str, help='Age or age range (e.g., "25" or "20-30")')
-    parser.add_argument('--gender', type=str, help='Gender (e.g., "female", "male", "unisex")')
-    parser.add_argument('--occasion', type=str, help='Occasion (e.g., "wedding", "birthday", "casual")')
-    parser.add_argument('--season', type=str, help='Season (e.g., "summer", "winter", "spring", "fall")')
-    
-    args = parser.parse_args()
-    
-    agent = OutfitBundleAgent(
-        budget=args.budget,
-        age=args.age,
-        gender=args.gender,
-        occasion=args.occasion,
-        season=args.season
-    )
-    agent.run(args.images)
-
-
-if __name__ == "__main__":
-    main()
+"""
+Outfit Bundle Agent - Suggests complete bundles of shoes and accessories for outfits
+"""
+import boto3
+import json
+import base64
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bedrock_client import get_bedrock
+from bundle_optimizer import PREMIUM_MARGIN, optimize_bundles, relevance_scores, template_styling_note
+from catalog_index import CATEGORIES
+from catalog_prompt import PROMPT_CACHE_SOURCE, PROMPT_CACHING, catalog_prefix, fit_sections, get_candidates_fragment, get_catalog_fragment, prompt_cache_usage
+from catalog_query import query_catalog
+from catalog_snapshot import get_catalog_snapshot
+from json_stream import JsonArrayStream
+from model_router import get_model_router, merge_route
+from outfit_scorer import get_outfit_scorer
+from product_retrieval import get_retrieval_index
+from prompt_budget import MAX_CANDIDATES, PROMPT_TOKEN_BUDGET, estimate_tokens
+from image_prep import prep_signature, prepare_image
+from result_cache import bundle_cache, bundle_cache_key, cached_analysis, sha256_hex
+from structured_output import BUNDLE_TOOL, coerce_element, leftover_fragments, parse_elements, record_parse, repair_fragments, response_text, tool_fields
+
+ANALYSIS_PROMPT = "Describe this outfit in detail, focusing on colors, style, and formality. What type of shoes and accessories would complement this outfit best?"
+
+JOINT_ANALYSIS_PROMPT = """Each image above is a separate outfit. For every outfit, describe its colors, style and formality and say what type of shoes and accessories would complement it best. Then summarize what the outfits have in common, so one set of shoes and accessories can work across all of them.
+
+Respond ONLY with a JSON object in this exact format:
+{"outfits": [{"outfit": 1, "colors": ["..."], "style": "...", "formality": "...", "key_pieces": ["..."], "shoes": "...", "accessories": "..."}],
+ "summary": "..."}"""
+
+# Upper bound on concurrent vision calls per request
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', '4'))
+
+# 'snapshot': the warm in-memory index; 'query': the category/price GSI
+CATALOG_MODES = ('snapshot', 'query')
+CATALOG_MODE = os.environ.get('CATALOG_ACCESS_MODE', 'snapshot')
+
+# 'per-image': one vision call per outfit, run concurrently; 'joint': every outfit
+# image in a single call that also returns a joint summary
+ANALYSIS_MODES = ('per-image', 'joint')
+ANALYSIS_MODE = os.environ.get('ANALYSIS_MODE', 'per-image')
+
+# 'llm': Claude assembles the bundles; 'optimize': a local optimizer assembles them and
+# Claude writes only the styling notes; 'fast': no Claude call at all
+BUNDLE_MODES = ('llm', 'optimize', 'fast')
+BUNDLE_MODE = os.environ.get('BUNDLE_MODE', 'llm')
+
+# Rank in-budget products by similarity to the outfit instead of sending a random sample
+PRODUCT_RETRIEVAL = os.environ.get('PRODUCT_RETRIEVAL', '1') == '1'
+
+
+def format_bundles(bundles, start=1):
+    """Convert enriched bundles into the response schema shared by the CLI and the API"""
+    formatted = []
+    for i, bundle in enumerate(bundles, start):
+        items_data = []
+        
+        for item in bundle['items']:
+            items_data.append({
+                "category": item['category'],
+                **item['product'].to_dict(),
+                "reason": item['reason']
+            })
+        
+        formatted.append({
+            "bundle_number": i,
+            "bundle_name": bundle['bundle_name'],
+            "bundle_type": bundle.get('bundle_type', 'standard'),
+            "match_score": bundle['match_score'],
+            "total_cost": bundle['total_cost'],
+            "items": items_data,
+            "styling_note": bundle['styling_note']
+        })
+    
+    return formatted
+
+
+def combine_descriptions(descriptions, names=None, summary=None):
+    """One prompt section per analyzed outfit (None entries are skipped), plus the joint summary"""
+    sections = [
+        f"OUTFIT {i+1} ({names[i]}):\n{desc}" if names else f"OUTFIT {i+1}:\n{desc}"
+        for i, desc in enumerate(descriptions)
+        if desc is not None
+    ]
+    if summary:
+        sections.append(f"ACROSS ALL OUTFITS:\n{summary}")
+    return "\n\n".join(sections)
+
+
+def joint_outfit_description(outfit):
+    """Prompt-ready text for one outfit of a joint analysis"""
+    def joined(value):
+        return ', '.join(str(v) for v in value) if isinstance(value, list) else str(value or '')
+
+    lines = [
+        ('Colors', joined(outfit.get('colors'))),
+        ('Style', joined(outfit.get('style'))),
+        ('Formality', joined(outfit.get('formality'))),
+        ('Key pieces', joined(outfit.get('key_pieces'))),
+        ('Complementary shoes', joined(outfit.get('shoes'))),
+        ('Complementary accessories', joined(outfit.get('accessories')))
+    ]
+    return "\n".join(f"{label}: {value}" for label, value in lines if value)
+
+
+def bundle_cache_entry(bundles):
+    """Enriched bundles reduced to product ids, so cached entries never carry stale prices"""
+    return [
+        {
+            'bundle_name': bundle['bundle_name'],
+            'bundle_type': bundle['bundle_type'],
+            'match_score': bundle['match_score'],
+            'styling_note': bundle['styling_note'],
+            'items': [
+                {
+                    'product_id': item['product'].product_id,
+                    'category': item['category'],
+                    'reason': item['reason']
+                }
+                for item in bundle['items']
+            ]
+        }
+        for bundle in bundles
+    ]
+
+
+def bundle_product_maps(shoes, handbags, jewelry, clothing, other_accessories):
+    """Prompt ids (S1, H1, ...) back to the products they stand for"""
+    return {
+        'S': {f"S{i+1}": s for i, s in enumerate(shoes)},
+        'H': {f"H{i+1}": h for i, h in enumerate(handbags)},
+        'J': {f"J{i+1}": j for i, j in enumerate(jewelry)},
+        'C': {f"C{i+1}": c for i, c in enumerate(clothing)},
+        'A': {f"A{i+1}": a for i, a in enumerate(other_accessories)}
+    }
+
+
+def enrich_bundle(bundle, product_maps):
+    """Resolve one model bundle's item ids to products; None if it has nothing usable"""
+    items_list = bundle.get('items', [])
+    
+    if not items_list or len(items_list) < 2:
+        return None
+    
+    enriched_items = []
+    for item in items_list:
+        item_id = item.get('id', '')
+        if not item_id:
+            continue
+        
+        # Get the product from the appropriate map
+        prefix = item_id[0]
+        product = product_maps.get(prefix, {}).get(item_id, {})
+        
+        if product:
+            enriched_items.append({
+                'product': product,
+                'category': item.get('category', 'unknown'),
+                'reason': item.get('reason', '')
+            })
+    
+    if len(enriched_items) < 1:  # At least shoes (changed from 2)
+        return None
+    
+    return {
+        'bundle_name': bundle.get('bundle_name', 'Unnamed Bundle'),
+        'bundle_type': bundle.get('bundle_type', 'standard'),
+        'match_score': bundle.get('match_score', 0),
+        'total_cost': bundle.get('total_cost', 0),
+        'items': enriched_items,
+        'styling_note': bundle.get('styling_note', '')
+    }
+
+
+class OutfitBundleAgent:
+    def __init__(self, budget=200, age=None, gender=None, occasion=None, season=None, catalog_mode=None, bundle_mode=None,
+                 analysis_mode=None):
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.bedrock = get_bedrock()
+        self.router = get_model_router()
+        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        self.table = self.dynamodb.Table('aldo-product-metadata')
+        self.bucket_name = 'aldo-images'
+        self.budget = budget
+        self.age = age
+        self.gender = gender
+        self.occasion = occasion
+        self.season = season
+        self.catalog_mode = catalog_mode or CATALOG_MODE
+        if self.catalog_mode not in CATALOG_MODES:
+            raise ValueError(f"catalog_mode must be one of {', '.join(CATALOG_MODES)}")
+        self.bundle_mode = bundle_mode or BUNDLE_MODE
+        if self.bundle_mode not in BUNDLE_MODES:
+            raise ValueError(f"bundle_mode must be one of {', '.join(BUNDLE_MODES)}")
+        self.analysis_mode = analysis_mode or ANALYSIS_MODE
+        if self.analysis_mode not in ANALYSIS_MODES:
+            raise ValueError(f"analysis_mode must be one of {', '.join(ANALYSIS_MODES)}")
+        # Set when products come from the snapshot; cached bundles are only reused against it
+        self.catalog_index = None
+        self.catalog_version = None
+        self.bundles_cached = False
+        # Input tokens of the last bundle call by prompt cache source (None until one is made)
+        self.bundle_usage = None
+        # Per image path: byte counts before/after preparation (absent on analysis cache hits)
+        self.image_stats = {}
+        # Vision calls made by this agent and the tokens they used (cache hits cost nothing)
+        self.analysis_usage = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+        # Per stage: the tier and model the router chose for this agent's calls, and why
+        self.model_routes = {}
+        self._usage_lock = threading.Lock()
+        
+    def invoke_stage(self, stage, request_body, stream=False):
+        """Call the model routed for `stage`; returns `(response, route)` and notes the route"""
+        response, route = self.router.invoke(self.bedrock, stage, request_body, stream=stream)
+        with self._usage_lock:
+            merge_route(self.model_routes, route)
+        return response, route
+        
+    def record_analysis_usage(self, response_body):
+        usage = response_body.get('usage', {})
+        with self._usage_lock:
+            self.analysis_usage['calls'] += 1
+            self.analysis_usage['input_tokens'] += usage.get('input_tokens', 0)
+            self.analysis_usage['output_tokens'] += usage.get('output_tokens', 0)
+        
+    def analyze_outfit(self, image_path):
+        """Analyze the outfit image and get description"""
+        
+        with open(image_path, 'rb') as f:
+            raw_bytes = f.read()
+        
+        outfit_description, _ = cached_analysis(raw_bytes, ANALYSIS_PROMPT, self.router.primary_model('analysis'),
+                                                lambda: self.request_analysis(image_path, raw_bytes), prep_signature())
+        return outfit_description
+    
+    def request_analysis(self, image_path, raw_bytes):
+        """One vision call for one outfit; returns `(description, cacheable)`"""
+        # Upright, downscaled and recompressed: fewer request bytes, image tokens and latency
+        prepared = prepare_image(raw_bytes)
+        self.image_stats[image_path] = prepared.stats()
+        print(f"Prepared {os.path.basename(image_path)}: {prepared.original_bytes} -> {len(prepared.data)} bytes ({prepared.media_type})")
+        image_bytes = base64.b64encode(prepared.data).decode('utf-8')
+        
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 1000,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": prepared.media_type,
+                                "data": image_bytes
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": ANALYSIS_PROMPT
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        response, route = self.invoke_stage('analysis', request_body)
+        
+        response_body = json.loads(response['body'].read())
+        self.record_analysis_usage(response_body)
+        return response_body['content'][0]['text'], not route['fallback']
+    
+    def analyze_outfits(self, image_paths, max_workers=ANALYSIS_WORKERS):
+        """
+        Analyze several outfit images concurrently. Returns descriptions in the
+        same order as `image_paths`, with None for any image whose analysis failed.
+        """
+        if not image_paths:
+            return []
+        
+        descriptions = [None] * len(image_paths)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(image_paths))) as executor:
+            futures = [executor.submit(self.analyze_outfit, path) for path in image_paths]
+            for i, future in enumerate(futures):
+                try:
+                    descriptions[i] = future.result()
+                except Exception as e:
+                    print(f"Error analyzing outfit {i+1} ({image_paths[i]}): {e}")
+        
+        return descriptions
+    
+    def analyze_outfits_jointly(self, image_paths):
+        """
+        Analyze every outfit in one vision call. Returns `(descriptions, summary)`
+        with descriptions in the same order as `image_paths` (None for any outfit
+        the model left out).
+        """
+        raw_images = []
+        for image_path in image_paths:
+            with open(image_path, 'rb') as f:
+                raw_images.append(f.read())
+        
+        # The set of images, in order, is what was analyzed
+        images_digest = '|'.join(sha256_hex(raw) for raw in raw_images).encode('utf-8')
+        analysis, _ = cached_analysis(images_digest, JOINT_ANALYSIS_PROMPT, self.router.primary_model('analysis'),
+                                      lambda: self.request_joint_analysis(image_paths, raw_images), prep_signature())
+        return analysis['descriptions'], analysis['summary']
+    
+    def request_joint_analysis(self, image_paths, raw_images):
+        """One vision call for every outfit; returns `({'descriptions', 'summary'}, cacheable)`"""
+        # Decoding and resizing release the GIL, so prepare the images side by side as per-image mode does
+        with ThreadPoolExecutor(max_workers=min(ANALYSIS_WORKERS, len(raw_images))) as executor:
+            prepared_images = list(executor.map(prepare_image, raw_images))
+        
+        content = []
+        for i, (image_path, prepared) in enumerate(zip(image_paths, prepared_images)):
+            self.image_stats[image_path] = prepared.stats()
+            print(f"Prepared {os.path.basename(image_path)}: {prepared.original_bytes} -> {len(prepared.data)} bytes ({prepared.media_type})")
+            content.append({"type": "text", "text": f"Outfit {i+1}:"})
+            content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": prepared.media_type,
+                    "data": base64.b64encode(prepared.data).decode('utf-8')
+                }
+            })
+        content.append({"type": "text", "text": JOINT_ANALYSIS_PROMPT})
+        
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 400 * len(image_paths) + 300,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ]
+        }
+        
+        response, route = self.invoke_stage('analysis', request_body)
+        
+        response_body = json.loads(response['body'].read())
+        self.record_analysis_usage(response_body)
+        analysis_text = response_body['content'][0]['text']
+        analysis = json.loads(analysis_text[analysis_text.find('{'):analysis_text.rfind('}') + 1])
+        
+        descriptions = [None] * len(image_paths)
+        for position, outfit in enumerate(analysis.get('outfits', [])):
+            number = outfit.get('outfit', position + 1)
+            if isinstance(number, int) and 1 <= number <= len(image_paths):
+                descriptions[number - 1] = joint_outfit_description(outfit) or None
+        summary = analysis.get('summary') or ''
+        
+        # Partial answers are served but not cached
+        return {'descriptions': descriptions, 'summary': summary}, None not in descriptions and not route['fallback']
+    
+    def describe_outfits(self, image_paths, names=None):
+        """
+        Analyze the outfits in this agent's analysis mode. Returns
+        `(descriptions, combined_description)`; descriptions are None for
+        outfits whose analysis failed. A failed joint call falls back to
+        per-image analysis.
+        """
+        if not image_paths:
+            return [], ''
+        
+        summary = None
+        if self.analysis_mode == 'joint' and len(image_paths) > 1:
+            try:
+                descriptions, summary = self.analyze_outfits_jointly(image_paths)
+            except Exception as e:
+                print(f"Joint outfit analysis failed, analyzing images one by one: {e}")
+                descriptions = self.analyze_outfits(image_paths)
+                summary = None
+        else:
+            # A single image gains nothing from the joint prompt
+            descriptions = self.analyze_outfits(image_paths)
+        
+        return descriptions, combine_descriptions(descriptions, names, summary)
+    
+    def get_products_from_dynamodb(self, limit=MAX_CANDIDATES):
+        """Get products from the warm catalog index within budget + premium range, separated by type"""
+        premium_budget = self.budget + PREMIUM_MARGIN
+        
+        try:
+            if self.catalog_mode == 'query':
+                # Read only in-budget items, one concurrent Query per category and price band
+                products, consumed = query_catalog(self.table, premium_budget, limit=limit)
+                print(f"Catalog query consumed {consumed:.1f} read capacity units")
+                return tuple(products[category] for category in CATEGORIES)
+            
+            # Reuse the snapshot kept warm across invocations instead of scanning per request
+            snapshot = get_catalog_snapshot()
+            index = snapshot.index
+            self.catalog_index = index
+            self.catalog_version = snapshot.version
+            
+            # Stratified random sample per category over the whole catalog, so every
+            # in-budget product can reach the prompt, not just one scan page
+            return tuple(
+                index.sample(category, premium_budget, limit)
+                for category in CATEGORIES
+            )
+            
+        except Exception as e:
+            print(f"Error fetching from DynamoDB: {e}")
+            return [], [], [], [], []
+    
+    def shortlist_products(self, outfit_description, products, k=MAX_CANDIDATES):
+        """
+        Replace each category's sampled candidates with the `k` in-budget products
+        most similar to the outfit description, most similar first. Categories
+        with too few matching products are topped up from the sample.
+        """
+        if not PRODUCT_RETRIEVAL or self.catalog_index is None:
+            return products
+        
+        try:
+            retrieval = get_retrieval_index(self.catalog_index, self.catalog_version)
+            if retrieval is None:
+                return products
+            
+            scores = retrieval.scores(outfit_description)
+            shortlisted = []
+            for category, sampled in zip(CATEGORIES, products):
+                ranked = [self.catalog_index.get(product_id)
+                          for product_id in retrieval.top_k(outfit_description, category, self.budget + PREMIUM_MARGIN, k, scores=scores)]
+                ranked = [product for product in ranked if product is not None]
+                seen = {product.product_id for product in ranked}
+                ranked += [product for product in sampled if product.product_id not in seen][:k - len(ranked)]
+                shortlisted.append(ranked)
+            return tuple(shortlisted)
+            
+        except Exception as e:
+            print(f"Error ranking products, keeping the sample: {e}")
+            return products
+    
+    def revalidate_bundles(self, cached):
+        """
+        Rebuild cached bundles from the current catalog and recompute their totals.
+        Returns None if any item is gone or any bundle no longer fits the budget.
+        """
+        bundles = []
+        for bundle in cached:
+            items = []
+            for item in bundle['items']:
+                product = self.catalog_index.get(item['product_id'])
+                if product is None:
+                    return None
+                items.append({'product': product, 'category': item['category'], 'reason': item['reason']})
+            
+            total_cost = round(sum(item['product'].price for item in items), 2)
+            is_premium = 'premium' in str(bundle['bundle_type']).lower()
+            if total_cost > (self.budget + PREMIUM_MARGIN if is_premium else self.budget):
+                return None
+            bundles.append({**bundle, 'items': items, 'total_cost': total_cost})
+        return bundles
+    
+    def cached_bundles(self, outfit_description):
+        """Return `(cache_key, bundles)`; bundles is None on a miss, cache_key None when uncacheable"""
+        # Same outfit, context and budget band against the same catalog version -> reuse bundles
+        self.bundles_cached = False
+        if self.catalog_version is None:
+            return None, None
+        
+        cache_key = bundle_cache_key(outfit_description, self.age, self.gender, self.occasion,
+                                     self.season, self.budget, self.catalog_version)
+        cached = bundle_cache.get(cache_key)
+        if cached is not None:
+            bundles = self.revalidate_bundles(cached)
+            if bundles:
+                self.bundles_cached = True
+                return cache_key, bundles
+            print("Cached bundles no longer fit the catalog or budget; regenerating")
+        return cache_key, None
+    
+    def bundle_prompt(self, outfit_description):
+        """The per-request half of the bundle prompt: outfits, shopper context and price limits"""
+        return f"""I need to match shoes and handbags with these outfits:
+
+{outfit_description}
+
+CONTEXT:
+Age: {self.age if self.age else 'Not specified'}
+Gender: {self.gender if self.gender else 'Not specified'}
+Occasion: {self.occasion if self.occasion else 'Not specified'}
+Season: {self.season if self.season else 'Not specified'}
+
+Create 3 bundles that work well with ALL the outfits described above, considering the age, gender, occasion, and season:
+- Bundle 1: Budget-friendly (under ${self.budget}) - can have 1-3 items
+- Bundle 2: Mid-range (under ${self.budget}) - can have 1-3 items
+- Bundle 3: Premium upgrade (${self.budget} to ${self.budget + PREMIUM_MARGIN}) - can have 1-3 items
+
+IMPORTANT: 
+- Bundles 1 and 2 MUST stay under ${self.budget}
+- Bundle 3 can go up to ${self.budget + PREMIUM_MARGIN}
+- Only use products listed above whose prices fit these limits"""
+    
+    def catalog_fragment(self, outfit_description, products):
+        """
+        The prompt-cached catalog prefix, from the request's candidates or the
+        whole catalog per PROMPT_CACHE_SOURCE; None when prompt caching is off
+        or products came from query mode
+        """
+        if not PROMPT_CACHING or self.catalog_index is None:
+            return None
+        if PROMPT_CACHE_SOURCE == 'catalog':
+            return get_catalog_fragment(self.catalog_index, self.catalog_version, self.budget)
+        # The same token budget as the inline prompt
+        base_tokens = estimate_tokens(catalog_prefix({})) + estimate_tokens(self.bundle_prompt(outfit_description))
+        return get_candidates_fragment(self.catalog_version, products, PROMPT_TOKEN_BUDGET - base_tokens)
+    
+    def bundle_request(self, outfit_description, shoes, handbags, jewelry, clothing, other_accessories, fragment=None):
+        """
+        The Bedrock request body asking for three bundles. With a catalog
+        `fragment`, its prefix is sent as a cached block ahead of the request
+        suffix; otherwise the given candidates are listed inline.
+        """
+        suffix = self.bundle_prompt(outfit_description)
+        
+        if fragment is not None:
+            content = [
+                {"type": "text", "text": fragment.text, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": suffix}
+            ]
+            print(f"Bundle prompt: ~{fragment.tokens} cacheable + ~{estimate_tokens(suffix)} per-request tokens")
+        else:
+            # Fit as many candidates per category as the token budget allows, shoes first
+            # and twice as many of them; descriptions go before candidates do
+            base_tokens = estimate_tokens(catalog_prefix({})) + estimate_tokens(suffix)
+            lines, product_tokens = fit_sections({
+                'S': shoes, 'H': handbags, 'J': jewelry, 'C': clothing, 'A': other_accessories
+            }, PROMPT_TOKEN_BUDGET - base_tokens)
+            prompt = catalog_prefix(lines) + "\n\n" + suffix
+            content = [{"type": "text", "text": prompt}]
+            print(f"Bundle prompt: ~{estimate_tokens(prompt)} tokens (budget {PROMPT_TOKEN_BUDGET}, "
+                  f"products {product_tokens}); candidates "
+                  + ", ".join(f"{prefix}={len(prefix_lines)}" for prefix, prefix_lines in lines.items()))
+        
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 2000,  # Reduced from 4000 for faster response
+            **tool_fields(BUNDLE_TOOL),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ]
+        }
+        
+        return request_body
+    
+    def record_bundle_usage(self, usage):
+        """Keep and log how much of the bundle prompt came from Bedrock's prompt cache"""
+        self.bundle_usage = prompt_cache_usage(usage or {})
+        if self.bundle_usage['cached_ratio'] is not None:
+            print(f"Bundle prompt cache: {self.bundle_usage['cache_read_input_tokens']} read, "
+                  f"{self.bundle_usage['cache_creation_input_tokens']} written, "
+                  f"{self.bundle_usage['input_tokens']} uncached input tokens "
+                  f"(cached ratio {self.bundle_usage['cached_ratio']:.0%})")
+    
+    def item_reason(self, outfit_description, product):
+        """Why the optimizer picked an item, from the features it shares with the outfits"""
+        scorer = get_outfit_scorer()
+        shared = scorer.shared_features(outfit_description, f"{product.name} {product.description or ''}") if scorer else []
+        if not shared:
+            return "Strongest in-budget fit for the outfits"
+        return f"Echoes the outfits' {', '.join(shared[:4])}"
+    
+    def styling_notes(self, outfit_description, bundles):
+        """One short styling note per optimized bundle from Claude, or None if the call fails"""
+        bundles_text = "\n".join(
+            f"{i+1}. {bundle['bundle_name']} (${bundle['total_cost']:.2f}): "
+            + ", ".join(f"{item['product'].name} ({item['category']})" for item in bundle['items'])
+            for i, bundle in enumerate(bundles)
+        )
+        
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 120 * len(bundles),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"""These bundles were picked to go with the outfits below.
+
+{outfit_description}
+
+Occasion: {self.occasion if self.occasion else 'Not specified'}
+Season: {self.season if self.season else 'Not specified'}
+
+BUNDLES:
+{bundles_text}
+
+Write a brief styling note (at most 40 words) for each bundle explaining how to wear it with the outfits, the occasion and the season.
+Respond with a JSON array of {len(bundles)} strings in bundle order."""
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        try:
+            response, _ = self.invoke_stage('styling', request_body)
+            text = json.loads(response['body'].read())['content'][0]['text']
+            notes = json.loads(text[text.find('['):text.rfind(']') + 1])
+            return [note if isinstance(note, str) else '' for note in notes]
+        except Exception as e:
+            print(f"Error writing styling notes: {e}")
+            return None
+    
+    def optimized_bundles(self, outfit_description, shoes, handbags, jewelry, clothing, other_accessories):
+        """
+        Bundles assembled locally from relevance scores, with exact totals that
+        always respect the budget. Claude only writes the styling notes, and
+        not even that in 'fast' mode.
+        """
+        products_by_category = dict(zip(CATEGORIES, (shoes, handbags, jewelry, clothing, other_accessories)))
+        scores = relevance_scores(outfit_description, products_by_category)
+        bundles = optimize_bundles(
+            products_by_category, scores, self.budget,
+            reason=lambda category, product: self.item_reason(outfit_description, product)
+        )
+        
+        notes = self.styling_notes(outfit_description, bundles) if bundles and self.bundle_mode != 'fast' else None
+        for i, bundle in enumerate(bundles):
+            bundle['styling_note'] = (notes[i] if notes and i < len(notes) and notes[i]
+                                      else template_styling_note(bundle))
+        return bundles
+    
+    def create_bundles(self, outfit_description, shoes, handbags, jewelry, clothing, other_accessories):
+        """Create outfit bundles using Claude"""
+        
+        if self.bundle_mode != 'llm':
+            return self.optimized_bundles(outfit_description, shoes, handbags, jewelry, clothing, other_accessories)
+        
+        cache_key, bundles = self.cached_bundles(outfit_description)
+        if bundles is not None:
+            return bundles
+        
+        # With prompt caching, prompt ids point into the products the cached prefix lists
+        fragment = self.catalog_fragment(outfit_description, (shoes, handbags, jewelry, clothing, other_accessories))
+        if fragment is not None:
+            shoes, handbags, jewelry, clothing, other_accessories = fragment.products
+        request_body = self.bundle_request(outfit_description, shoes, handbags, jewelry, clothing, other_accessories, fragment)
+        
+        try:
+            started = time.time()
+            bedrock_response, route = self.invoke_stage('bundle', request_body)
+            
+            response_body = json.loads(bedrock_response['body'].read())
+            self.record_bundle_usage(response_body.get('usage'))
+            
+            # Keep every well-formed bundle; broken ones get a short repair call, not a full re-run
+            bundles, lost = parse_elements(self.bedrock, route['model'], BUNDLE_TOOL, response_text(response_body))
+            
+            # Map IDs back to actual products
+            product_maps = bundle_product_maps(shoes, handbags, jewelry, clothing, other_accessories)
+            enriched_bundles = [
+                enriched for enriched in (enrich_bundle(bundle, product_maps) for bundle in bundles)
+                if enriched is not None
+            ]
+            
+            # Salvaged or fallback sets are served but not cached, so the next request can get the full answer
+            if cache_key and enriched_bundles and not lost and not route['fallback']:
+                bundle_cache.set(cache_key, bundle_cache_entry(enriched_bundles), time.time() - started)
+            
+            return enriched_bundles
+            
+        except Exception as e:
+            print(f"Error creating bundles: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+    
+    def stream_bundles(self, outfit_description, shoes, handbags, jewelry, clothing, other_accessories):
+        """
+        Like create_bundles, but a generator that yields each enriched bundle as
+        soon as the model closes its JSON object, instead of after the whole
+        response. Errors after the first bundle end the stream early.
+        """
+        if self.bundle_mode != 'llm':
+            # Optimized bundles are ready together; only the styling notes call remains
+            yield from self.optimized_bundles(outfit_description, shoes, handbags, jewelry, clothing, other_accessories)
+            return
+        
+        cache_key, bundles = self.cached_bundles(outfit_description)
+        if bundles is not None:
+            yield from bundles
+            return
+        
+        fragment = self.catalog_fragment(outfit_description, (shoes, handbags, jewelry, clothing, other_accessories))
+        if fragment is not None:
+            shoes, handbags, jewelry, clothing, other_accessories = fragment.products
+        request_body = self.bundle_request(outfit_description, shoes, handbags, jewelry, clothing, other_accessories, fragment)
+        product_maps = bundle_product_maps(shoes, handbags, jewelry, clothing, other_accessories)
+        parser = JsonArrayStream()
+        fragments = []
+        parsed = 0
+        enriched_bundles = []
+        
+        try:
+            started = time.time()
+            response, route = self.invoke_stage('bundle', request_body, stream=True)
+            
+            for event in response['body']:
+                chunk = json.loads(event['chunk']['bytes']) if 'chunk' in event else {}
+                if chunk.get('type') == 'message_start':
+                    # Input usage, including prompt cache reads, arrives before any text
+                    self.record_bundle_usage(chunk.get('message', {}).get('usage'))
+                if chunk.get('type') != 'content_block_delta':
+                    continue
+                
+                # Tool input arrives as partial_json; a plain text reply as text
+                delta = chunk['delta']
+                for element in parser.feed(delta.get('partial_json', delta.get('text', ''))):
+                    bundle = coerce_element(element, BUNDLE_TOOL)
+                    if bundle is None:
+                        fragments.append(json.dumps(element))
+                        continue
+                    parsed += 1
+                    enriched = enrich_bundle(bundle, product_maps)
+                    if enriched is None:
+                        continue
+                    if not enriched_bundles:
+                        print(f"First bundle after {time.time() - started:.2f}s")
+                    enriched_bundles.append(enriched)
+                    yield enriched
+            
+            # Broken or cut-off bundles get a short repair call each, after the good ones are out
+            fragments += leftover_fragments(parser)
+            repaired = repair_fragments(self.bedrock, route['model'], BUNDLE_TOOL, fragments) if fragments else []
+            for bundle in repaired:
+                enriched = enrich_bundle(bundle, product_maps)
+                if enriched is not None:
+                    enriched_bundles.append(enriched)
+                    yield enriched
+            record_parse(parsed + len(repaired), len(fragments), len(repaired))
+            
+            print(f"All {len(enriched_bundles)} bundles after {time.time() - started:.2f}s")
+            if (cache_key and enriched_bundles and parser.finished and len(repaired) == len(fragments)
+                    and not route['fallback']):
+                bundle_cache.set(cache_key, bundle_cache_entry(enriched_bundles), time.time() - started)
+            
+        except Exception as e:
+            print(f"Error streaming bundles: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    def display_bundles(self, bundles, outfit_names):
+        """Display the bundles in JSON format"""
+        output = {
+            "outfits": outfit_names if isinstance(outfit_names, list) else [outfit_names],
+            "context": {
+                "age": self.age,
+                "gender": self.gender,
+                "occasion": self.occasion,
+                "season": self.season,
+                "budget": self.budget
+            },
+            "bundles": []
+        }
+        
+        output["bundles"] = format_bundles(bundles)
+        
+        print(json.dumps(output, indent=2))
+        
+
+    
+    def run(self, outfit_images):
+        """Main agent execution for multiple outfit images"""
+        try:
+            # Get products once
+            shoes, handbags, jewelry, clothing, other_accessories = self.get_products_from_dynamodb()
+            
+            if not shoes:
+                return {}
+            
+            # Step 1: Analyze all outfits (concurrently, or in one joint call)
+            existing_images = [image for image in outfit_images if os.path.exists(image)]
+            names = [os.path.basename(image) for image in existing_images]
+            
+            # Step 2: Combine all outfit descriptions
+            outfit_descriptions, combined_description = self.describe_outfits(existing_images, names)
+            valid_images = [name for name, desc in zip(names, outfit_descriptions) if desc is not None]
+            
+            if not valid_images:
+                return {}
+            
+            # Step 3: Keep the products closest to the outfits, then create bundles that work for all of them
+            shoes, handbags, jewelry, clothing, other_accessories = self.shortlist_products(
+                combined_description, (shoes, handbags, jewelry, clothing, other_accessories))
+            bundles = self.create_bundles(combined_description, shoes, handbags, jewelry, clothing, other_accessories)
+            
+            # Step 4: Display results
+            self.display_bundles(bundles, valid_images)
+            
+            return bundles
+            
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {}
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(1)
+    
+    # Parse command line arguments
+    import argparse
+    parser = argparse.ArgumentParser(description='Outfit Bundle Agent')
+    parser.add_argument('images', nargs='+', help='Outfit image paths')
+    parser.add_argument('--budget', type=int, default=200, help='Budget in dollars (default: 200)')
+    parser.add_argument('--age', type=str, help='Age or age range (e.g., "25" or "20-30")')
+    parser.add_argument('--gender', type=str, help='Gender (e.g., "female", "male", "unisex")')
+    parser.add_argument('--occasion', type=str, help='Occasion (e.g., "wedding", "birthday", "casual")')
+    parser.add_argument('--season', type=str, help='Season (e.g., "summer", "winter", "spring", "fall")')
+    parser.add_argument('--bundle-mode', choices=BUNDLE_MODES, help='Bundle assembly: Claude ("llm"), local optimizer with Claude styling notes ("optimize") or no Claude call ("fast") (default: BUNDLE_MODE or "llm")')
+    parser.add_argument('--analysis-mode', choices=ANALYSIS_MODES, help='Outfit analysis: one call per image ("per-image") or all images in one call ("joint") (default: ANALYSIS_MODE or "per-image")')
+    parser.add_argument('--catalog-mode', choices=CATALOG_MODES, help='Catalog access mode (default: CATALOG_ACCESS_MODE or "snapshot")')
+    
+    args = parser.parse_args()
+    
+    agent = OutfitBundleAgent(
+        budget=args.budget,
+        age=args.age,
+        gender=args.gender,
+        occasion=args.occasion,
+        season=args.season,
+        catalog_mode=args.catalog_mode,
+        bundle_mode=args.bundle_mode,
+        analysis_mode=args.analysis_mode
+    )
+    agent.run(args.images)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,204 +1,306 @@
-"""
-Outfit Bundle API - Flask API for AWS Lambda + API Gateway
-"""
-import json
-import base64
-import tempfile
-import os
-from outfit_bundle_agent import OutfitBundleAgent
-
-def lambda_handler(event, context):
-    """
-    AWS Lambda handler for API Gateway
-    
-    Expected POST body:
-    {
-        "images": ["base64_encoded_image1", "base64_encoded_image2"],
-        "age": "25",
-        "gender": "female",
-        "occasion": "garden party",
-        "season": "summer",
-        "budget": 200
-    }
-    """
-    try:
-        # Parse request body
-        if 'body' in event:
-            body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
-        else:
-            body = event
-        
-        # Extract parameters
-        images_base64 = body.get('images', [])
-        age = body.get('age')
-        gender = body.get('gender')
-        occasion = body.get('occasion')
-        season = body.get('season')
-        budget = body.get('budget', 200)
-        
-        if not images_base64:
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'No images provided'})
-            }
-        
-        # Save base64 images to temporary files
-        temp_files = []
-        for i, img_base64 in enumerate(images_base64):
-            # Remove data URL prefix if present
-            if ',' in img_base64:
-                img_base64 = img_base64.split(',')[1]
-            
-            # Decode base64
-            img_data = base64.b64decode(img_base64)
-            
-            # Save to temp file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            temp_file.write(img_data)
-            temp_file.close()
-            temp_files.append(temp_file.name)
-        
-        # Create agent and run
-        agent = OutfitBundleAgent(
-            budget=budget,
-            age=age,
-            gender=gender,
-            occasion=occasion,
-            season=season
-        )
-        
-        # Get products
-        shoes, handbags, jewelry, clothing, other_accessories = agent.get_products_from_dynamodb()
-        
-        if not shoes:
-            return {
-                'statusCode': 500,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'error': 'No products found in database'})
-            }
-        
-        # Analyze all outfits
-        outfit_descriptions = []
-        for temp_file in temp_files:
-            outfit_description = agent.analyze_outfit(temp_file)
-            outfit_descriptions.append(outfit_description)
-        
-        # Combine descriptions
-        combined_description = "\n\n".join([
-            f"OUTFIT {i+1}:\n{desc}"
-            for i, desc in enumerate(outfit_descriptions)
-        ])
-        
-        # Create bundles
-        bundles = agent.create_bundles(combined_description, shoes, handbags, jewelry, clothing, other_accessories)
-        
-        # Build response
-        output = {
-            "outfits_count": len(temp_files),
-            "context": {
-                "age": age,
-                "gender": gender,
-                "occasion": occasion,
-                "season": season,
-                "budget": budget
-            },
-            "bundles": []
-        }
-        
-        for i, bundle in enumerate(bundles, 1):
-            items_data = []
-            
-            for item in bundle['items']:
-                product = item['product']
-                items_data.append({
-                    "category": item['category'],
-                    "product_name": product.get('product_name'),
-                    "price": product.get('price_float', 0),
-                    "product_id": product.get('product_id'),
-                    "product_url": product.get('product_url'),
-                    "image_url": product.get('original_image_url'),
-                    "reason": item['reason']
-                })
-            
-            bundle_data = {
-                "bundle_number": i,
-                "bundle_name": bundle['bundle_name'],
-                "bundle_type": bundle.get('bundle_type', 'standard'),
-                "match_score": bundle['match_score'],
-                "total_cost": bundle['total_cost'],
-                "items": items_data,
-                "styling_note": bundle['styling_note']
-            }
-            
-            output["bundles"].append(bundle_data)
-        
-        # Clean up temp files
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(output)
-        }
-        
-    except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': str(e),
-                'trace': error_trace
-            })
-        }
-
-
-# For local testing with Flask
-if __name__ == '__main__':
-    from flask import Flask, request, jsonify
-    from flask_cors import CORS
-    
-    app = Flask(__name__)
-    CORS(app)
-    
-    @app.route('/outfit-bundles', methods=['POST', 'OPTIONS'])
-    def outfit_bundles():
-        if request.method == 'OPTIONS':
-            return '', 200
-        
-        # Convert Flask request to Lambda event format
-        event = {
-            'body': json.dumps(request.get_json())
-        }
-        
-        # Call Lambda handler
-        response = lambda_handler(event, None)
-        
-        return jsonify(json.loads(response['body'])), response['statusCode']
-    
-    @app.route('/health', methods=['GET'])
-    def health():
-        return jsonify({'status': 'healthy'}), 200
-    
-    print("Starting Outfit Bundle API on http://localhost:5000")
-    print("POST to http://localhost:5000/outfit-bundles")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+"""
+Outfit Bundle API - Flask API for AWS Lambda + API Gateway
+"""
+import json
+import base64
+import tempfile
+import os
+from outfit_bundle_agent import ANALYSIS_MODES, BUNDLE_MODES, CATALOG_MODES, OutfitBundleAgent, format_bundles
+from catalog_snapshot import catalog_stats
+from image_prep import prep_signature, sniff_media_type
+from bedrock_client import bedrock_stats
+from model_router import model_router_stats
+from structured_output import structured_output_stats
+from result_cache import analysis_cache, bundle_cache
+
+def lambda_handler(event, context, on_bundle=None):
+    """
+    AWS Lambda handler for API Gateway
+    
+    With `on_bundle`, bundles are generated with a streaming Bedrock call and each
+    formatted bundle is passed to it as soon as the model finishes it; the
+    returned response still carries all of them.
+    
+    Expected POST body:
+    {
+        "images": ["base64_encoded_image1", "base64_encoded_image2"],
+        "age": "25",
+        "gender": "female",
+        "occasion": "garden party",
+        "season": "summer",
+        "budget": 200,
+        "analysis_mode": "joint"    (optional: "per-image" or "joint")
+    }
+    """
+    # Removed on every return path, including errors
+    temp_files = []
+    try:
+        # Health check (GET /health) reports how warm the catalog snapshot is
+        if event.get('httpMethod') == 'GET':
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'status': 'healthy', 'catalog': catalog_stats()})
+            }
+        
+        # Parse request body
+        if 'body' in event:
+            body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
+        else:
+            body = event
+        
+        # Extract parameters
+        images_base64 = body.get('images', [])
+        age = body.get('age')
+        gender = body.get('gender')
+        occasion = body.get('occasion')
+        season = body.get('season')
+        budget = body.get('budget', 200)
+        catalog_mode = body.get('catalog_mode')
+        bundle_mode = body.get('bundle_mode')
+        analysis_mode = body.get('analysis_mode')
+        
+        if not images_base64:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'No images provided'})
+            }
+        
+        if catalog_mode is not None and catalog_mode not in CATALOG_MODES:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': f"catalog_mode must be one of {', '.join(CATALOG_MODES)}"})
+            }
+        
+        if bundle_mode is not None and bundle_mode not in BUNDLE_MODES:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': f"bundle_mode must be one of {', '.join(BUNDLE_MODES)}"})
+            }
+        
+        if analysis_mode is not None and analysis_mode not in ANALYSIS_MODES:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': f"analysis_mode must be one of {', '.join(ANALYSIS_MODES)}"})
+            }
+        
+        # Save base64 images to temporary files
+        for i, img_base64 in enumerate(images_base64):
+            # Remove data URL prefix if present
+            if ',' in img_base64:
+                img_base64 = img_base64.split(',')[1]
+            
+            # Decode base64
+            img_data = base64.b64decode(img_base64)
+            
+            # Reject anything that is not an image before spending a Bedrock call on it
+            if sniff_media_type(img_data) is None:
+                return {
+                    'statusCode': 400,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'error': f'Image {i+1} is not a recognized image format'})
+                }
+            
+            # Save to temp file
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
+            temp_file.write(img_data)
+            temp_file.close()
+            temp_files.append(temp_file.name)
+        
+        # Create agent and run
+        agent = OutfitBundleAgent(
+            budget=budget,
+            age=age,
+            gender=gender,
+            occasion=occasion,
+            season=season,
+            catalog_mode=catalog_mode,
+            bundle_mode=bundle_mode,
+            analysis_mode=analysis_mode
+        )
+        
+        # Get products
+        shoes, handbags, jewelry, clothing, other_accessories = agent.get_products_from_dynamodb()
+        
+        if not shoes:
+            return {
+                'statusCode': 500,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'No products found in database'})
+            }
+        
+        # Analyze all outfits (concurrently or in one joint call); one failed image does not sink the others
+        outfit_descriptions, combined_description = agent.describe_outfits(temp_files)
+        failed_images = [i + 1 for i, desc in enumerate(outfit_descriptions) if desc is None]
+        
+        if len(failed_images) == len(temp_files):
+            return {
+                'statusCode': 502,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Outfit analysis failed for every image'})
+            }
+        
+        # Send the products closest to the outfits rather than a random sample
+        shoes, handbags, jewelry, clothing, other_accessories = agent.shortlist_products(
+            combined_description, (shoes, handbags, jewelry, clothing, other_accessories))
+        
+        # Create bundles
+        if on_bundle is not None:
+            bundles = []
+            for bundle in agent.stream_bundles(combined_description, shoes, handbags, jewelry, clothing, other_accessories):
+                bundles.append(bundle)
+                on_bundle(format_bundles([bundle], start=len(bundles))[0])
+        else:
+            bundles = agent.create_bundles(combined_description, shoes, handbags, jewelry, clothing, other_accessories)
+        
+        # Build response
+        output = {
+            "outfits_count": len(temp_files),
+            "context": {
+                "age": age,
+                "gender": gender,
+                "occasion": occasion,
+                "season": season,
+                "budget": budget
+            },
+            "bundles": format_bundles(bundles),
+            "metadata": {
+                "failed_images": failed_images,
+                "bundle_mode": agent.bundle_mode,
+                "analysis_mode": agent.analysis_mode,
+                "analysis_usage": agent.analysis_usage,
+                "images": [agent.image_stats.get(temp_file) for temp_file in temp_files],
+                "image_prep": prep_signature(),
+                "catalog": catalog_stats(),
+                "analysis_cache": analysis_cache.stats(),
+                "bundles_cached": agent.bundles_cached,
+                "bundle_cache": bundle_cache.stats(),
+                "bundle_prompt_cache": agent.bundle_usage,
+                "bedrock": bedrock_stats(),
+                "model_routes": agent.model_routes,
+                "model_router": model_router_stats(),
+                "structured_output": structured_output_stats()
+            }
+        }
+        
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps(output)
+        }
+        
+    except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        
+        return {
+            'statusCode': 500,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'error': str(e),
+                'trace': error_trace
+            })
+        }
+    
+    finally:
+        # Clean up temp files
+        for temp_file in temp_files:
+            try:
+                os.unlink(temp_file)
+            except:
+                pass
+
+
+# For local testing with Flask
+if __name__ == '__main__':
+    import queue
+    import threading
+    from flask import Flask, Response, request, jsonify, stream_with_context
+    from flask_cors import CORS
+    
+    app = Flask(__name__)
+    CORS(app)
+    
+    @app.route('/outfit-bundles', methods=['POST', 'OPTIONS'])
+    def outfit_bundles():
+        if request.method == 'OPTIONS':
+            return '', 200
+        
+        # Convert Flask request to Lambda event format
+        event = {
+            'body': json.dumps(request.get_json())
+        }
+        
+        # Call Lambda handler
+        response = lambda_handler(event, None)
+        
+        return jsonify(json.loads(response['body'])), response['statusCode']
+    
+    @app.route('/outfit-bundles/stream', methods=['POST'])
+    def outfit_bundles_stream():
+        """
+        Same request as /outfit-bundles, answered as NDJSON: one
+        {"type": "bundle", ...} line per bundle as it is generated, then a
+        final {"type": "result", ...} line with the full response.
+        """
+        event = {'body': json.dumps(request.get_json())}
+        lines = queue.Queue()
+        
+        def handle():
+            response = lambda_handler(event, None, on_bundle=lambda bundle: lines.put({'type': 'bundle', 'bundle': bundle}))
+            lines.put({'type': 'result', 'status': response['statusCode'], 'body': json.loads(response['body'])})
+            lines.put(None)
+        
+        threading.Thread(target=handle, daemon=True).start()
+        
+        def generate():
+            while True:
+                line = lines.get()
+                if line is None:
+                    return
+                yield json.dumps(line) + "\n"
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
+    @app.route('/health', methods=['GET'])
+    def health():
+        return jsonify({'status': 'healthy', 'catalog': catalog_stats()}), 200
+    
+    print("Starting Outfit Bundle API on http://localhost:5000")
+    print("POST to http://localhost:5000/outfit-bundles")
+    print("POST to http://localhost:5000/outfit-bundles/stream for NDJSON bundles as they are generated")
+    app.run(host='0.0.0.0', port=5000, debug=True)
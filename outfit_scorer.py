@@ -0,0 +1,176 @@
+"""
+Outfit Scorer - Vectorized color/material/formality/season match scores between outfits and products
+
+Texts become small feature vectors (one dimension per color and material,
+plus formality and season axes). A fixed compatibility matrix W says how
+well each outfit feature goes with each product feature, so the whole
+outfit x product score matrix is one product of matrices:
+
+    scores = outfits @ W @ products.T
+"""
+import re
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; callers fall back to unscored candidates
+    np = None
+
+COLOR_FAMILIES = {
+    'neutral': ['black', 'white', 'grey', 'gray', 'beige', 'tan', 'camel', 'brown', 'cream', 'ivory',
+                'nude', 'taupe', 'khaki', 'navy', 'cognac', 'chocolate', 'charcoal', 'bone'],
+    'warm': ['red', 'burgundy', 'wine', 'orange', 'rust', 'yellow', 'mustard', 'coral', 'pink', 'blush', 'fuchsia'],
+    'cool': ['blue', 'green', 'olive', 'teal', 'purple', 'lavender', 'lilac', 'mint', 'emerald', 'turquoise'],
+    'metallic': ['gold', 'silver', 'bronze', 'metallic', 'champagne', 'pewter']
+}
+MATERIAL_GROUPS = {
+    'dressy': ['satin', 'silk', 'velvet', 'patent', 'sequin', 'lace', 'crystal', 'pearl', 'embellished'],
+    'casual': ['canvas', 'denim', 'mesh', 'rubber', 'knit', 'cotton', 'jersey', 'nylon', 'raffia', 'straw'],
+    'versatile': ['leather', 'suede', 'wool', 'linen', 'tweed', 'croc', 'snake', 'faux']
+}
+FORMALITY_TERMS = {
+    'formal': ['formal', 'elegant', 'dressy', 'evening', 'cocktail', 'wedding', 'gala', 'tailored', 'office',
+               'business', 'professional', 'sophisticated', 'polished', 'chic', 'heel', 'heels', 'pump', 'pumps',
+               'stiletto', 'stilettos', 'oxford', 'oxfords', 'loafer', 'loafers', 'blazer', 'suit', 'clutch'],
+    'casual': ['casual', 'relaxed', 'everyday', 'sporty', 'athletic', 'streetwear', 'weekend', 'sneaker',
+               'sneakers', 'trainer', 'trainers', 'slide', 'slides', 'flip', 'jeans', 't-shirt', 'tee',
+               'hoodie', 'comfortable', 'backpack', 'tote']
+}
+SEASON_TERMS = {
+    'summer': ['summer', 'sandal', 'sandals', 'linen', 'breathable', 'open-toe', 'espadrille', 'espadrilles',
+               'lightweight', 'beach', 'sunny', 'straw', 'raffia', 'mule', 'mules'],
+    'winter': ['winter', 'boot', 'boots', 'wool', 'shearling', 'waterproof', 'fur', 'cozy', 'insulated',
+               'lined', 'snow', 'coat', 'knit', 'tweed'],
+    'transitional': ['spring', 'fall', 'autumn', 'layering', 'ankle', 'trench', 'bootie', 'booties']
+}
+
+# Relative weight of each feature block in the final score
+COLOR_WEIGHT = 1.0
+MATERIAL_WEIGHT = 0.8
+FORMALITY_WEIGHT = 1.0
+SEASON_WEIGHT = 0.6
+
+
+class OutfitScorer:
+    """Feature extraction is one tokenizer pass per text; scoring is matrix algebra"""
+
+    def __init__(self):
+        self.dimensions = []
+        self.term_dimensions = {}
+
+        def add_dimension(name):
+            self.dimensions.append(name)
+            return len(self.dimensions) - 1
+
+        color_dims = {}
+        for family, colors in COLOR_FAMILIES.items():
+            for color in colors:
+                color_dims[color] = (add_dimension(f"color:{color}"), family)
+                self.term_dimensions.setdefault(color, []).append(color_dims[color][0])
+        material_dims = {}
+        for group, materials in MATERIAL_GROUPS.items():
+            for material in materials:
+                material_dims[material] = (add_dimension(f"material:{material}"), group)
+                self.term_dimensions.setdefault(material, []).append(material_dims[material][0])
+        axis_dims = {}
+        for axis, terms in list(FORMALITY_TERMS.items()) + list(SEASON_TERMS.items()):
+            axis_dims[axis] = add_dimension(axis)
+            for term in terms:
+                self.term_dimensions.setdefault(term, []).append(axis_dims[axis])
+
+        # Every term is a single (possibly hyphenated) word, so a plain tokenizer plus dict
+        # lookups beats one big alternation regex
+        self.pattern = re.compile(r"[a-z]+(?:-[a-z]+)*")
+        self.compatibility = self._compatibility(color_dims, material_dims, axis_dims)
+
+    def _compatibility(self, color_dims, material_dims, axis_dims):
+        size = len(self.dimensions)
+        w = np.zeros((size, size), dtype=np.float32)
+
+        # Same color best, same family next; neutrals and metallics go with anything
+        for i, family_i in color_dims.values():
+            for j, family_j in color_dims.values():
+                if i == j:
+                    w[i, j] = 1.0
+                elif family_i == family_j:
+                    w[i, j] = 0.5
+                elif 'neutral' in (family_i, family_j) or 'metallic' in (family_i, family_j):
+                    w[i, j] = 0.3
+        w[:len(color_dims), :len(color_dims)] *= COLOR_WEIGHT
+
+        # Same material best; dressy and casual materials clash
+        for i, group_i in material_dims.values():
+            for j, group_j in material_dims.values():
+                if i == j:
+                    w[i, j] = 1.0 * MATERIAL_WEIGHT
+                elif group_i == group_j or 'versatile' in (group_i, group_j):
+                    w[i, j] = 0.4 * MATERIAL_WEIGHT
+                else:
+                    w[i, j] = -0.3 * MATERIAL_WEIGHT
+
+        formal, casual = axis_dims['formal'], axis_dims['casual']
+        w[formal, formal] = w[casual, casual] = FORMALITY_WEIGHT
+        w[formal, casual] = w[casual, formal] = -0.5 * FORMALITY_WEIGHT
+
+        summer, winter, transitional = axis_dims['summer'], axis_dims['winter'], axis_dims['transitional']
+        w[summer, summer] = w[winter, winter] = w[transitional, transitional] = SEASON_WEIGHT
+        w[summer, winter] = w[winter, summer] = -0.5 * SEASON_WEIGHT
+        for axis in (summer, winter):
+            w[axis, transitional] = w[transitional, axis] = 0.3 * SEASON_WEIGHT
+        return w
+
+    def features(self, texts):
+        """(len(texts), dimensions) matrix of log-scaled, L2-normalized term counts"""
+        rows, dims = [], []
+        term_dimensions = self.term_dimensions
+        for row, text in enumerate(texts):
+            for token in self.pattern.findall((text or '').lower()):
+                for dim in term_dimensions.get(token, ()):
+                    rows.append(row)
+                    dims.append(dim)
+        matrix = np.zeros((len(texts), len(self.dimensions)), dtype=np.float32)
+        np.add.at(matrix, (rows, dims), 1)
+        np.log1p(matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    def shared_features(self, text, other):
+        """Feature names present in both texts, e.g. ['black', 'leather', 'formal']"""
+        def dims(value):
+            return {dim for token in self.pattern.findall((value or '').lower())
+                    for dim in self.term_dimensions.get(token, ())}
+        shared = dims(text) & dims(other)
+        return [self.dimensions[dim].split(':')[-1] for dim in sorted(shared)]
+
+    def product_features(self, products):
+        return self.features([f"{product.name or ''} {product.description or ''}" for product in products])
+
+    def score_matrix(self, outfit_features, product_features):
+        """(outfits, products) compatibility scores in one matrix product"""
+        return outfit_features @ (self.compatibility @ product_features.T)
+
+    def shortlist(self, outfit_descriptions, products, k):
+        """
+        The `k` products that best suit all of the outfits (mean score across
+        outfits), best first
+        """
+        if isinstance(outfit_descriptions, str):
+            outfit_descriptions = [outfit_descriptions]
+        if len(products) <= k:
+            return list(products)
+        scores = self.score_matrix(self.features(outfit_descriptions), self.product_features(products)).mean(axis=0)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [products[i] for i in top]
+
+
+_outfit_scorer = None
+
+
+def get_outfit_scorer():
+    """Shared scorer (the regex and compatibility matrix are built once); None without NumPy"""
+    global _outfit_scorer
+    if np is None:
+        return None
+    if _outfit_scorer is None:
+        _outfit_scorer = OutfitScorer()
+    return _outfit_scorer
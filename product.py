@@ -0,0 +1,65 @@
+"""
+Product - Compact product record used throughout the bundle pipeline
+"""
+from product_classifier import classify_product
+
+
+def parse_price(value):
+    """Convert a stored price ("$129.99", Decimal, ...) to a float"""
+    try:
+        return float(str(value if value is not None else '0').replace('$', '').replace(',', ''))
+    except ValueError:
+        return 0.0
+
+
+class Product:
+    """Only the fields the pipeline reads; no Decimal values or extra attributes"""
+    __slots__ = ('product_id', 'name', 'description', 'price', 'category',
+                 'product_url', 'image_url', 'image_key')
+
+    def __init__(self, product_id, name, description, price, category,
+                 product_url=None, image_url=None, image_key=None):
+        self.product_id = product_id
+        self.name = name
+        self.description = description
+        self.price = price
+        self.category = category
+        self.product_url = product_url
+        self.image_url = image_url
+        self.image_key = image_key
+
+    def to_dict(self):
+        """Fields exposed in API and CLI responses"""
+        return {
+            "product_name": self.name,
+            "price": self.price,
+            "product_id": self.product_id,
+            "product_url": self.product_url,
+            "image_url": self.image_url
+        }
+
+    def __eq__(self, other):
+        # Other product types (catalog_artifact.ArtifactProduct) compare themselves by product_id
+        if not isinstance(other, Product):
+            return NotImplemented
+        return self.product_id == other.product_id
+
+    def __hash__(self):
+        return hash(self.product_id)
+
+    def __repr__(self):
+        return f"Product({self.product_id!r}, {self.name!r}, {self.price:.2f}, {self.category!r})"
+
+
+def product_from_item(item, category=None):
+    """The single conversion from a DynamoDB item to a Product"""
+    return Product(
+        product_id=item.get('product_id'),
+        name=item.get('product_name'),
+        description=item.get('description', ''),
+        price=parse_price(item.get('price')),
+        category=category or classify_product(item),
+        product_url=item.get('product_url'),
+        image_url=item.get('original_image_url'),
+        image_key=item.get('s3_image_key', '')
+    )
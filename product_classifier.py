@@ -0,0 +1,68 @@
+"""
+Product Classifier - Assigns bundle categories with one dict lookup per name word
+"""
+# Categories in the original if/elif chain's precedence order:
+# (category, product_type values, whole-word name keywords)
+CATEGORY_RULES = [
+    ('shoes', ['FOOTWEAR'], []),
+    ('handbags', ['BAG', 'HANDBAG', 'HANDBAGS'], ['handbag', 'bag', 'tote', 'purse', 'clutch', 'crossbody']),
+    ('jewelry', ['JEWELRY', 'JEWELLERY'], ['necklace', 'earring', 'bracelet', 'ring', 'jewelry', 'jewellery']),
+    ('clothing', ['CLOTHING', 'APPAREL', 'TOP', 'BOTTOM', 'DRESS'], []),
+    ('other_accessories', ['ACCESSORIES', 'ACCESSORY'], ['scarf', 'scarves', 'hat', 'belt', 'sunglasses', 'wallet'])
+]
+
+# Characters that join words in catalog names, e.g. "Tote-Bag" or "Ring/Earrings"; str.translate is several times slower
+WORD_SEPARATORS = ['-', '/', ',']
+
+
+class ProductClassifier:
+    """
+    Ranks each product_type value and name keyword by its category's place in
+    CATEGORY_RULES; the best rank found wins, exactly as the first matching
+    branch of the original chain did. Names are lowered and split once, and a
+    frozenset check skips the per-word lookups for names with no keyword.
+    Whole words only, so 'spring' stays out of jewelry and 'chat' out of hats.
+    """
+
+    def __init__(self, rules=None):
+        rules = rules or CATEGORY_RULES
+        # Rank len(rules) is "no category"
+        self.categories = [category for category, _, _ in rules] + [None]
+        self.type_ranks = {}
+        self.keyword_ranks = {}
+        for rank, (_, product_types, keywords) in enumerate(rules):
+            for product_type in product_types:
+                self.type_ranks.setdefault(product_type, rank)
+            for keyword in keywords:
+                # The plural forms are words of their own
+                for word in (keyword, keyword + 's', keyword + 'es'):
+                    self.keyword_ranks.setdefault(word, rank)
+        self.keywords = frozenset(self.keyword_ranks)
+        self.no_match = len(rules)
+        # A product_type ranked at or above every keyword settles the category without reading the name
+        self.best_keyword_rank = min(self.keyword_ranks.values(), default=self.no_match)
+
+    def classify(self, item):
+        """Return the bundle category for a product dict, or None"""
+        rank = self.type_ranks.get((item.get('product_type') or '').upper(), self.no_match)
+        if rank > self.best_keyword_rank:
+            name = (item.get('product_name') or '').lower()
+            for separator in WORD_SEPARATORS:
+                if separator in name:
+                    name = name.replace(separator, ' ')
+            words = name.split()
+            if not self.keywords.isdisjoint(words):
+                keyword_ranks = self.keyword_ranks
+                for word in words:
+                    word_rank = keyword_ranks.get(word, rank)
+                    if word_rank < rank:
+                        rank = word_rank
+        return self.categories[rank]
+
+
+_default_classifier = ProductClassifier()
+
+
+def classify_product(item):
+    """Classify with the shared default classifier"""
+    return _default_classifier.classify(item)
@@ -0,0 +1,278 @@
+"""
+Product Retrieval - Local TF-IDF index over product names and descriptions for shortlisting candidates
+
+Products are tokenized into words and word bigrams, hashed into a fixed
+number of buckets and weighted with sublinear TF-IDF. Vectors are stored as
+an inverted index of NumPy arrays (postings sorted by bucket), so a query
+touches only the postings of its own terms.
+
+    python product_retrieval.py build [--output catalog_retrieval.npz]
+    python product_retrieval.py query "black leather ankle boots" --category shoes --max-price 150
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it candidates stay sampled
+    np = None
+
+RETRIEVAL_FILENAME = 'catalog_retrieval.npz'
+HASH_BUCKETS = 1 << 18
+FORMAT_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z'-]+")
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have in into is it its of on or so that the their
+    this to was were which while will with would your you this these those very also can could
+    should may might more most such than then there they them it's its what when where who how
+    outfit outfits look looks wear wearing would complement best pair paired
+""".split())
+
+
+def retrieval_paths():
+    """Candidate index locations, most specific first"""
+    paths = []
+    if os.environ.get('CATALOG_RETRIEVAL_PATH'):
+        paths.append(os.environ['CATALOG_RETRIEVAL_PATH'])
+    paths.append(os.path.join('/tmp', RETRIEVAL_FILENAME))
+    paths.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), RETRIEVAL_FILENAME))
+    return paths
+
+
+def tokenize(text):
+    """Lowercase content words plus adjacent-word bigrams ("ankle boot", "block heel")"""
+    words = [word.rstrip("'-") for word in TOKEN_PATTERN.findall((text or '').lower())]
+    words = [word[:-1] if word.endswith('s') and not word.endswith('ss') and len(word) > 3 else word
+             for word in words if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def bucket(term):
+    # crc32, not hash(): buckets must be stable across processes for saved indexes
+    return zlib.crc32(term.encode('utf-8')) % HASH_BUCKETS
+
+
+def term_counts(text):
+    counts = {}
+    for term in tokenize(text):
+        b = bucket(term)
+        counts[b] = counts.get(b, 0) + 1
+    return counts
+
+
+class ProductRetrievalIndex:
+    """Inverted TF-IDF index; documents are products, identified by position"""
+
+    def __init__(self, product_ids, categories, prices, postings_start, postings_doc, postings_weight, idf, version):
+        self.product_ids = product_ids
+        self.categories = categories
+        self.prices = prices
+        self.postings_start = postings_start
+        self.postings_doc = postings_doc
+        self.postings_weight = postings_weight
+        self.idf = idf
+        self.version = version
+        self.category_codes = {name: code for code, name in enumerate(sorted(set(categories.tolist())))}
+        self.category_of = np.array([self.category_codes[name] for name in categories.tolist()], dtype=np.int16)
+
+    @classmethod
+    def build(cls, catalog_index, version):
+        """Index every product in a CatalogIndex; name terms count double"""
+        product_ids, categories, prices = [], [], []
+        doc_rows, bucket_rows, tf_rows = [], [], []
+
+        for category, _, items in catalog_index.groups():
+            for item in items:
+                doc = len(product_ids)
+                product_ids.append(item.product_id)
+                categories.append(category or '')
+                prices.append(item.price)
+                counts = term_counts(item.description)
+                for b, count in term_counts(item.name).items():
+                    counts[b] = counts.get(b, 0) + 2 * count
+                for b, count in counts.items():
+                    doc_rows.append(doc)
+                    bucket_rows.append(b)
+                    tf_rows.append(count)
+
+        docs = np.array(doc_rows, dtype=np.int32)
+        buckets = np.array(bucket_rows, dtype=np.int32)
+        tf = 1 + np.log(np.array(tf_rows, dtype=np.float32))
+
+        document_frequency = np.bincount(buckets, minlength=HASH_BUCKETS)
+        idf = np.log((1 + len(product_ids)) / (1 + document_frequency)).astype(np.float32) + 1
+        weights = tf * idf[buckets]
+
+        # L2-normalize each product vector so scores are cosine similarities
+        norms = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=len(product_ids)))
+        weights = (weights / np.maximum(norms[docs], 1e-9)).astype(np.float32)
+
+        order = np.argsort(buckets, kind='stable')
+        postings_start = np.concatenate(([0], np.cumsum(np.bincount(buckets, minlength=HASH_BUCKETS)))).astype(np.int64)
+        return cls(
+            np.array(product_ids, dtype=object),
+            np.array(categories, dtype=object),
+            np.array(prices, dtype=np.float64),
+            postings_start, docs[order], weights[order], idf, version
+        )
+
+    def scores(self, text):
+        """Cosine similarity of `text` to every product"""
+        scores = np.zeros(len(self.product_ids), dtype=np.float32)
+        counts = term_counts(text)
+        if not counts:
+            return scores
+        query = {b: (1 + np.log(count)) * self.idf[b] for b, count in counts.items()}
+        norm = np.sqrt(sum(weight * weight for weight in query.values()))
+        for b, weight in query.items():
+            start, end = self.postings_start[b], self.postings_start[b + 1]
+            if start != end:
+                # A product appears at most once per bucket, so plain fancy indexing is safe
+                scores[self.postings_doc[start:end]] += self.postings_weight[start:end] * (weight / norm)
+        return scores
+
+    def top_k(self, text, category, max_price, k, min_price=None, scores=None):
+        """
+        Ids of up to `k` products in `category` within the price range, most
+        similar first. Products sharing no terms with `text` are never returned.
+        Pass precomputed `scores` to rank several categories for one query.
+        """
+        if category not in self.category_codes:
+            return []
+        if scores is None:
+            scores = self.scores(text)
+        mask = (self.category_of == self.category_codes[category]) & (self.prices <= max_price) & (scores > 0)
+        if min_price is not None:
+            mask &= self.prices >= min_price
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return self.product_ids[candidates].tolist()
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            product_ids=self.product_ids.astype(str),
+            categories=self.categories.astype(str),
+            prices=self.prices,
+            postings_start=self.postings_start,
+            postings_doc=self.postings_doc,
+            postings_weight=self.postings_weight,
+            idf=self.idf,
+            meta=np.array([FORMAT_VERSION, HASH_BUCKETS, str(self.version)], dtype=str)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            format_version, buckets, version = data['meta'].tolist()
+            if int(format_version) != FORMAT_VERSION or int(buckets) != HASH_BUCKETS:
+                raise ValueError(f"{path} was built with different retrieval settings")
+            return cls(
+                data['product_ids'].astype(object),
+                data['categories'].astype(object),
+                data['prices'],
+                data['postings_start'],
+                data['postings_doc'],
+                data['postings_weight'],
+                data['idf'],
+                version
+            )
+
+    def __len__(self):
+        return len(self.product_ids)
+
+
+# Retrieval index for the current catalog version, shared by warm invocations
+_retrieval_index = None
+_retrieval_lock = threading.Lock()
+
+
+def get_retrieval_index(catalog_index, version):
+    """
+    The retrieval index for catalog `version`: a prebuilt file when one matches
+    the version, otherwise built from `catalog_index` once per version.
+    Returns None without NumPy.
+    """
+    global _retrieval_index
+    if np is None:
+        return None
+
+    with _retrieval_lock:
+        if _retrieval_index is not None and _retrieval_index.version == str(version):
+            return _retrieval_index
+
+        for path in retrieval_paths():
+            if not os.path.exists(path):
+                continue
+            try:
+                index = ProductRetrievalIndex.load(path)
+            except Exception as e:
+                print(f"Ignoring unreadable retrieval index {path}: {e}")
+                continue
+            if index.version == str(version):
+                _retrieval_index = index
+                return index
+
+        start = time.time()
+        _retrieval_index = ProductRetrievalIndex.build(catalog_index, str(version))
+        print(f"Built retrieval index over {len(_retrieval_index)} products in {time.time() - start:.2f}s")
+        return _retrieval_index
+
+
+def build_index(output):
+    """Build the retrieval index for the current catalog snapshot and save it"""
+    from catalog_snapshot import get_catalog_snapshot
+
+    start = time.time()
+    snapshot = get_catalog_snapshot()
+    index = ProductRetrievalIndex.build(snapshot.index, snapshot.version)
+    index.save(output)
+    print(f"Indexed {len(index)} products (version {snapshot.version}) to {output} "
+          f"in {time.time() - start:.1f}s ({os.path.getsize(output) / 1024:.0f} KB)")
+
+
+def run_query(text, category, max_price, k):
+    from catalog_snapshot import get_catalog_snapshot
+
+    snapshot = get_catalog_snapshot()
+    index = get_retrieval_index(snapshot.index, snapshot.version)
+    scores = index.scores(text)
+    positions = {product_id: i for i, product_id in enumerate(index.product_ids.tolist())}
+    for product_id in index.top_k(text, category, max_price, k, scores=scores):
+        product = snapshot.index.get(product_id)
+        print(f"  {scores[positions[product_id]]:.3f}  {product.name} (${product.price:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Product retrieval index tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Build the index for the current catalog')
+    build_parser.add_argument('--output', default=RETRIEVAL_FILENAME, help=f'Output path (default: {RETRIEVAL_FILENAME})')
+    query_parser = subparsers.add_parser('query', help='Show the top products for a description')
+    query_parser.add_argument('text')
+    query_parser.add_argument('--category', default='shoes')
+    query_parser.add_argument('--max-price', type=float, default=float('inf'))
+    query_parser.add_argument('-k', type=int, default=10)
+
+    args = parser.parse_args()
+    if np is None:
+        print("NumPy is not installed")
+        return 1
+    if args.command == 'build':
+        build_index(args.output)
+    else:
+        run_query(args.text, args.category, args.max_price, args.k)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Prompt Budget - Fit product candidate lists into a target number of prompt tokens
+"""
+import math
+import os
+
+# Input tokens for the whole bundle prompt: instructions, outfit descriptions and product lines
+PROMPT_TOKEN_BUDGET = int(os.environ.get('BUNDLE_PROMPT_TOKENS', '3500'))
+# Most candidates fetched and offered per category when the budget allows
+MAX_CANDIDATES = int(os.environ.get('BUNDLE_MAX_CANDIDATES', '20'))
+# Descriptions are cut to this before anything else; beyond it they add tokens, not signal
+DESCRIPTION_CHARS = 160
+# Conservative for English product copy (Claude averages a little under 4)
+CHARS_PER_TOKEN = 3.5
+
+
+def estimate_tokens(text):
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def truncate(text, limit):
+    """Cut at a word boundary so the model never sees half a word"""
+    text = ' '.join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0] + '...'
+
+
+def product_line(label, product, description_chars=DESCRIPTION_CHARS):
+    """`S1. Name ($89.99) - description`; with description_chars=0, name and price only"""
+    line = f"{label}. {product.name} (${product.price:.2f})"
+    if description_chars:
+        line += f" - {truncate(product.description or '', description_chars) or 'No description'}"
+    return line
+
+
+def fit_candidates(sections, token_budget, max_candidates=MAX_CANDIDATES, required=('S',)):
+    """
+    Choose product lines for each `(prefix, products, weight)` section, given in
+    priority order, so their estimated tokens stay within `token_budget`.
+
+    Lines are added round-robin, `weight` per section per round and in each
+    section's own order, so every category gets candidates before any gets
+    many. When a full line no longer fits, its description is dropped; when
+    even the name does not fit, the section is closed. Sections in `required`
+    always get their first line. Each section's lines are a prefix of its
+    products, so prompt ids still map to `products[i]`.
+
+    Returns `({prefix: [lines]}, tokens)`.
+    """
+    lines = {prefix: [] for prefix, _, _ in sections}
+    used = 0
+    open_sections = list(sections)
+
+    while open_sections:
+        still_open = []
+        for prefix, products, weight in open_sections:
+            closed = False
+            for _ in range(weight):
+                n = len(lines[prefix])
+                if n >= min(max_candidates, len(products)):
+                    closed = True
+                    break
+
+                label = f"{prefix}{n+1}"
+                line = product_line(label, products[n])
+                cost = estimate_tokens(line) + 1  # newline
+                if used + cost > token_budget:
+                    line = product_line(label, products[n], description_chars=0)
+                    cost = estimate_tokens(line) + 1
+                    if used + cost > token_budget and not (n == 0 and prefix in required):
+                        closed = True
+                        break
+
+                lines[prefix].append(line)
+                used += cost
+            if not closed:
+                still_open.append((prefix, products, weight))
+        open_sections = still_open
+
+    return lines, used
@@ -0,0 +1,238 @@
+"""
+Result Cache - Two-tier cache (in-process LRU + persistent store) for expensive Bedrock results
+"""
+import boto3
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', os.path.join('/tmp', 'result-cache'))
+CACHE_TABLE = os.environ.get('RESULT_CACHE_TABLE')
+CACHE_TTL_SECONDS = int(os.environ.get('RESULT_CACHE_TTL', str(7 * 24 * 3600)))
+
+
+def sha256_hex(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires_at'] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileStore:
+    """One JSON file per key under a directory; survives process restarts"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{sha256_hex(key)}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at', 0) < time.time():
+            return None
+        return entry
+
+    def set(self, key, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class DynamoStore:
+    """DynamoDB table keyed by `cache_key`; enable DynamoDB TTL on `expires_at` to purge old entries"""
+
+    def __init__(self, table_name, namespace):
+        self.table = boto3.resource('dynamodb', region_name='us-east-1').Table(table_name)
+        self.namespace = namespace
+
+    def get(self, key):
+        response = self.table.get_item(Key={'cache_key': f"{self.namespace}:{key}"})
+        item = response.get('Item')
+        if not item or float(item.get('expires_at', 0)) < time.time():
+            return None
+        return json.loads(item['entry'])
+
+    def set(self, key, entry):
+        self.table.put_item(Item={
+            'cache_key': f"{self.namespace}:{key}",
+            'entry': json.dumps(entry),
+            'expires_at': Decimal(int(entry['expires_at']))
+        })
+
+
+def default_store(namespace):
+    """DynamoDB when RESULT_CACHE_TABLE is set, otherwise files under RESULT_CACHE_DIR"""
+    if CACHE_TABLE:
+        return DynamoStore(CACHE_TABLE, namespace)
+    return FileStore(os.path.join(CACHE_DIR, namespace))
+
+
+class TwoTierCache:
+    """
+    LRU in front of a persistent store. Each entry remembers how long the
+    original computation took, so hits report the latency they saved.
+    """
+
+    def __init__(self, namespace, maxsize=256, ttl=CACHE_TTL_SECONDS, store=None, persistent=True):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize)
+        if store is None and persistent:
+            store = default_store(namespace)
+        self.store = store
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def get(self, key):
+        """Return the cached value or None"""
+        entry = self.memory.get(key)
+        tier = 'memory'
+        if entry is None and self.store is not None:
+            try:
+                entry = self.store.get(key)
+            except Exception as e:
+                print(f"Cache store read failed ({self.namespace}): {e}")
+                entry = None
+            if entry is not None:
+                tier = 'store'
+                self.memory.set(key, entry)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if tier == 'memory':
+                self.memory_hits += 1
+            else:
+                self.store_hits += 1
+            self.saved_seconds += entry.get('elapsed', 0)
+        return entry['value']
+
+    def set(self, key, value, elapsed=0.0):
+        """Store a JSON-serializable value and how long it took to compute"""
+        entry = {'value': value, 'elapsed': elapsed, 'expires_at': time.time() + self.ttl}
+        self.memory.set(key, entry)
+        if self.store is not None:
+            try:
+                self.store.set(key, entry)
+            except Exception as e:
+                print(f"Cache store write failed ({self.namespace}): {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.store_hits + self.misses
+            hits = self.memory_hits + self.store_hits
+            return {
+                'memory_hits': self.memory_hits,
+                'store_hits': self.store_hits,
+                'misses': self.misses,
+                'hit_ratio': round(hits / lookups, 3) if lookups else None,
+                'saved_seconds': round(self.saved_seconds, 2)
+            }
+
+
+# Bump to invalidate every cached outfit analysis, e.g. after changing how images are sent
+ANALYSIS_PROMPT_VERSION = 1
+
+# Shared by every agent's analyze_outfit; the prompt is part of the key
+analysis_cache = TwoTierCache('outfit-analysis')
+
+
+def analysis_cache_key(image_bytes, prompt, model_id, image_prep=''):
+    """SHA-256 of the image bytes plus a digest of what was asked about it and how the image was prepared"""
+    request_digest = sha256_hex(f"{ANALYSIS_PROMPT_VERSION}|{model_id}|{prompt}|{image_prep}")[:16]
+    return f"{sha256_hex(image_bytes)}:{request_digest}"
+
+
+def cached_analysis(image_bytes, prompt, model_id, compute, image_prep=''):
+    """
+    Same image + same prompt -> reuse the earlier analysis instead of a ~10s
+    vision call. On a miss `compute()` returns `(analysis, cacheable)`; answers
+    from a fallback model are not cacheable, so the primary model gets the
+    next request. Returns `(analysis, cached)`.
+    """
+    cache_key = analysis_cache_key(image_bytes, prompt, model_id, image_prep)
+    analysis = analysis_cache.get(cache_key)
+    if analysis is not None:
+        return analysis, True
+    start = time.time()
+    analysis, cacheable = compute()
+    if cacheable:
+        analysis_cache.set(cache_key, analysis, time.time() - start)
+    return analysis, False
+
+
+# Bump to invalidate every cached bundle set, e.g. after changing the bundle prompt
+BUNDLE_PROMPT_VERSION = 3
+# Budgets in the same band share cached bundles; prices are re-checked on every hit
+BUNDLE_BUDGET_BAND = int(os.environ.get('BUNDLE_CACHE_BUDGET_BAND', '25'))
+BUNDLE_CACHE_TTL_SECONDS = int(os.environ.get('BUNDLE_CACHE_TTL', str(24 * 3600)))
+
+# In-process LRU; the persistent tier is opt-in because bundles go stale with the catalog
+bundle_cache = TwoTierCache(
+    'outfit-bundles',
+    maxsize=512,
+    ttl=BUNDLE_CACHE_TTL_SECONDS,
+    persistent=os.environ.get('BUNDLE_CACHE_PERSISTENT', '0') == '1'
+)
+
+
+def budget_band(budget):
+    return int(budget // BUNDLE_BUDGET_BAND)
+
+
+def bundle_cache_key(outfit_description, age, gender, occasion, season, budget, catalog_version):
+    """Everything the bundle prompt depends on; a new catalog version yields new keys"""
+    request = json.dumps([
+        BUNDLE_PROMPT_VERSION, outfit_description, age, gender, occasion, season,
+        budget_band(budget), catalog_version
+    ])
+    return sha256_hex(request)
@@ -0,0 +1,311 @@
+"""
+Shoe Descriptors - Offline visual descriptors for catalog shoe images, keyed by S3 key and ETag
+
+Each image in the bucket is described once by a vision call (colors,
+materials, heel type, formality, style tags and a one-line description) and
+stored in a JSON file. Rebuilding only describes objects whose ETag is new or
+changed and drops deleted ones, so a nightly run costs as many vision calls as
+images were uploaded that day. At request time outfits are matched against
+the stored text instead of re-sending every image.
+
+    python shoe_descriptors.py build [--output shoe_descriptors.json] [--workers 8]
+    python shoe_descriptors.py show [key]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from image_prep import prepare_image
+from model_router import get_model_router
+from outfit_scorer import get_outfit_scorer
+from shoe_image_pipeline import TOP_N, list_image_objects
+from structured_output import RATING_TOOL, numbered_ratings, parse_elements, response_text, tool_fields
+
+DESCRIPTORS_FILENAME = 'shoe_descriptors.json'
+DESCRIPTOR_MODEL_ID = 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'
+# Bump when the prompt or fields change; every image is described again
+DESCRIPTOR_VERSION = 1
+DESCRIBE_WORKERS = int(os.environ.get('SHOE_DESCRIBE_WORKERS', '8'))
+# Progress is saved every this many new descriptors, so an interrupted build resumes
+SAVE_EVERY = 50
+# Stored shoes rated by the text-only call after local scoring
+DESCRIPTOR_SHORTLIST = int(os.environ.get('SHOE_DESCRIPTOR_SHORTLIST', '30'))
+# Older descriptors missed new uploads and are skipped for the image pipeline; builds are meant to run nightly
+DESCRIPTOR_MAX_AGE_SECONDS = int(os.environ.get('SHOE_DESCRIPTORS_MAX_AGE', str(3 * 24 * 3600)))
+
+DESCRIBE_PROMPT = """Describe these shoes for a stylist matching them to outfits.
+Respond ONLY with a JSON object in this exact format:
+{"colors": ["<main colors>"], "materials": ["<materials, e.g. leather, suede, canvas>"],
+ "heel_type": "<flat, block heel, stiletto, wedge, platform, kitten heel or none>",
+ "formality": "<formal, smart casual, casual or athletic>",
+ "style_tags": ["<3-6 short tags, e.g. minimalist, western, strappy, chunky, pointed toe>"],
+ "description": "<one sentence>"}"""
+
+
+def descriptor_paths():
+    """Candidate descriptor file locations, most specific first"""
+    paths = []
+    if os.environ.get('SHOE_DESCRIPTORS_PATH'):
+        paths.append(os.environ['SHOE_DESCRIPTORS_PATH'])
+    paths.append(os.path.join('/tmp', DESCRIPTORS_FILENAME))
+    paths.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), DESCRIPTORS_FILENAME))
+    return paths
+
+
+def descriptor_text(descriptor):
+    """One line of text per shoe, for local scoring and text-only prompts"""
+    def joined(value):
+        # The model occasionally answers a list field with a plain string
+        return ', '.join(str(v) for v in value) if isinstance(value, list) else str(value or '')
+
+    fields = ['colors', 'materials', 'heel_type', 'formality', 'style_tags', 'description']
+    return '; '.join(part for part in (joined(descriptor.get(field)) for field in fields) if part)
+
+
+class ShoeDescriptorIndex:
+    """{s3 key: descriptor} for one bucket; each descriptor carries the ETag it was built from"""
+
+    def __init__(self, bucket, descriptors=None, updated_at=None):
+        self.bucket = bucket
+        self.descriptors = descriptors or {}
+        # When the descriptors were last synced with the bucket
+        self.updated_at = updated_at
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != DESCRIPTOR_VERSION:
+            raise ValueError(f"{path} has descriptor version {data.get('version')}, expected {DESCRIPTOR_VERSION}")
+        # Files written before updated_at was stored fall back to their modification time
+        return cls(data['bucket'], data['descriptors'], data.get('updated_at', os.path.getmtime(path)))
+
+    def save(self, path):
+        self.updated_at = time.time()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': DESCRIPTOR_VERSION, 'bucket': self.bucket, 'updated_at': self.updated_at,
+                       'descriptors': self.descriptors}, f)
+        os.replace(tmp_path, path)
+
+    def age(self):
+        """Seconds since the last sync with the bucket, or None if never saved"""
+        return time.time() - self.updated_at if self.updated_at is not None else None
+
+    def is_stale(self, max_age=DESCRIPTOR_MAX_AGE_SECONDS):
+        age = self.age()
+        return age is None or age > max_age
+
+    def describe(self, s3, bedrock, key):
+        """Vision call describing one image"""
+        body = s3.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+        prepared = prepare_image(body)
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 300,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": prepared.media_type,
+                                "data": base64.b64encode(prepared.data).decode('utf-8')
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": DESCRIBE_PROMPT
+                        }
+                    ]
+                }
+            ]
+        }
+        response = bedrock.invoke_model(modelId=DESCRIPTOR_MODEL_ID, body=json.dumps(request_body))
+        text = json.loads(response['body'].read())['content'][0]['text']
+        return json.loads(text[text.find('{'):text.rfind('}') + 1])
+
+    def update(self, s3, bedrock, workers=DESCRIBE_WORKERS, path=None):
+        """
+        Describe new and changed objects and drop deleted ones. With `path`,
+        progress is saved as it goes. Returns counts of what changed.
+        """
+        start = time.time()
+        current = dict(list_image_objects(s3, self.bucket))
+        removed = [key for key in self.descriptors if key not in current]
+        for key in removed:
+            del self.descriptors[key]
+        pending = [key for key, etag in current.items()
+                   if self.descriptors.get(key, {}).get('etag') != etag]
+        print(f"{len(current)} images, {len(pending)} new or changed, {len(removed)} removed")
+
+        counts = {'described': 0, 'failed': 0, 'removed': len(removed), 'unchanged': len(current) - len(pending)}
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as executor:
+            futures = {executor.submit(self.describe, s3, bedrock, key): key for key in pending}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    descriptor = future.result()
+                except Exception as e:
+                    print(f"  Error describing {key}: {e}")
+                    counts['failed'] += 1
+                    continue
+                descriptor['etag'] = current[key]
+                self.descriptors[key] = descriptor
+                counts['described'] += 1
+                if path and counts['described'] % SAVE_EVERY == 0:
+                    self.save(path)
+                print(f"  [{counts['described']}/{len(pending)}] {key}: {descriptor_text(descriptor)[:80]}")
+
+        if path:
+            self.save(path)
+        counts['elapsed_seconds'] = round(time.time() - start, 1)
+        return counts
+
+    def items(self):
+        """`(key, descriptor text)` pairs in a stable order"""
+        return [(key, descriptor_text(self.descriptors[key])) for key in sorted(self.descriptors)]
+
+    def __len__(self):
+        return len(self.descriptors)
+
+
+_descriptor_index = None
+_descriptor_mtime = None
+_descriptor_lock = threading.Lock()
+
+
+def get_shoe_descriptors(bucket):
+    """Descriptors for `bucket` from the first file that has them, reloaded when it changes; None if there are none"""
+    global _descriptor_index, _descriptor_mtime
+    with _descriptor_lock:
+        for path in descriptor_paths():
+            if not os.path.exists(path):
+                continue
+            mtime = (path, os.path.getmtime(path))
+            if _descriptor_index is not None and _descriptor_mtime == mtime:
+                index = _descriptor_index
+            else:
+                try:
+                    index = ShoeDescriptorIndex.load(path)
+                except Exception as e:
+                    print(f"Ignoring unreadable shoe descriptors {path}: {e}")
+                    continue
+            if index.bucket == bucket:
+                _descriptor_index, _descriptor_mtime = index, mtime
+                return index
+        return None
+
+
+def match_outfit(bedrock, outfit_description, index, top_n=TOP_N, shortlist=DESCRIPTOR_SHORTLIST):
+    """
+    Rank stored shoes against an outfit without sending any images: local
+    scoring picks the `shortlist` closest descriptors, then one text-only call
+    rates them. Returns the top_n as `[{'image', 'score', 'reason'}]`, best first.
+    """
+    items = index.items()
+    scorer = get_outfit_scorer()
+    if scorer is not None and len(items) > shortlist:
+        scores = scorer.score_matrix(scorer.features([outfit_description]),
+                                     scorer.features([text for _, text in items]))[0]
+        items = [items[i] for i in sorted(range(len(items)), key=lambda i: -scores[i])[:shortlist]]
+    elif len(items) > shortlist:
+        # Without NumPy there is no local ranking; rate a bounded sample rather than the whole bucket
+        print(f"NumPy unavailable; rating the first {shortlist} of {len(items)} stored shoes")
+        items = items[:shortlist]
+    if not items:
+        return []
+
+    shoes_text = "\n".join(f"{i+1}. {text}" for i, (_, text) in enumerate(items))
+    request_body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 60 * len(items) + 200,
+        **tool_fields(RATING_TOOL),
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"""I need to match shoes with this outfit:
+
+{outfit_description}
+
+Here are the available shoes, described from their photos:
+
+{shoes_text}
+
+Rate each shoe on how well it matches the outfit (1-10 scale). Submit the ratings with the submit_ratings tool, one per shoe:
+- "number": the shoe number (1-{len(items)})
+- "score": match score (1-10)
+- "reason": brief explanation (max 100 chars)"""
+                    }
+                ]
+            }
+        ]
+    }
+    response, route = get_model_router().invoke(bedrock, 'rating', request_body)
+    ratings, _ = parse_elements(bedrock, route['model'], RATING_TOOL, response_text(json.loads(response['body'].read())))
+
+    shoe_scores = [
+        {'image': items[i][0], 'score': score, 'reason': reason}
+        for i, score, reason in numbered_ratings(ratings, len(items))
+    ]
+    shoe_scores.sort(key=lambda x: x['score'], reverse=True)
+    return shoe_scores[:top_n]
+
+
+def build_descriptors(bucket, output, workers):
+    """Create or refresh the descriptor file for `bucket`"""
+    import boto3
+    from bedrock_client import get_bedrock
+
+    index = ShoeDescriptorIndex(bucket)
+    if os.path.exists(output):
+        try:
+            index = ShoeDescriptorIndex.load(output)
+        except Exception as e:
+            print(f"Rebuilding {output} from scratch: {e}")
+    if index.bucket != bucket:
+        index = ShoeDescriptorIndex(bucket)
+
+    s3 = boto3.client('s3', region_name='us-east-1')
+    counts = index.update(s3, get_bedrock(), workers=workers, path=output)
+    print(f"Described {counts['described']} images ({counts['failed']} failed, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed) in {counts['elapsed_seconds']}s; {len(index)} in {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shoe image descriptor tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Describe new and changed images')
+    build_parser.add_argument('--bucket', default='aldo-images')
+    build_parser.add_argument('--output', default=DESCRIPTORS_FILENAME, help=f'Output path (default: {DESCRIPTORS_FILENAME})')
+    build_parser.add_argument('--workers', type=int, default=DESCRIBE_WORKERS)
+    show_parser = subparsers.add_parser('show', help='Print stored descriptors')
+    show_parser.add_argument('key', nargs='?')
+    show_parser.add_argument('--bucket', default='aldo-images')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_descriptors(args.bucket, args.output, args.workers)
+        return 0
+
+    index = get_shoe_descriptors(args.bucket)
+    if index is None:
+        print("No shoe descriptors found; run `python shoe_descriptors.py build` first")
+        return 1
+    for key, text in index.items():
+        if args.key is None or key == args.key:
+            print(f"{key}: {text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Shoe Image Pipeline - Concurrent S3 download and Bedrock scoring of shoe images against an outfit
+
+    list_objects_v2 pages -> download pool -> bounded queue -> scoring pool -> top-N heap
+
+Listing is paginated and streamed, so scoring starts with the first page and
+buckets past 1,000 keys are covered. Downloads (fast, I/O bound) and scoring
+calls (slow, rate limited) get separate pools so neither starves the other,
+and the bounded queue between them keeps at most a few images in memory.
+With a deadline, the best results scored so far are returned on time.
+"""
+import base64
+import heapq
+import json
+import math
+import os
+import queue
+import threading
+import time
+from image_prep import prepare_image
+from model_router import get_model_router
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+DOWNLOAD_WORKERS = int(os.environ.get('SHOE_DOWNLOAD_WORKERS', '8'))
+# Keep at or below the Bedrock governor's BEDROCK_MAX_IN_FLIGHT
+SCORING_WORKERS = int(os.environ.get('SHOE_IMAGE_SCORING_WORKERS', '4'))
+# Seconds before the best results so far are returned (0 = no deadline)
+DEADLINE_SECONDS = float(os.environ.get('SHOE_MATCH_DEADLINE', '0'))
+TOP_N = 5
+
+_DONE = object()
+
+
+def list_image_objects(s3, bucket, prefix=''):
+    """Yield `(key, etag)` for every image in the bucket, one list_objects_v2 page at a time"""
+    kwargs = {'Bucket': bucket}
+    if prefix:
+        kwargs['Prefix'] = prefix
+    while True:
+        response = s3.list_objects_v2(**kwargs)
+        for obj in response.get('Contents', []):
+            if obj['Key'].lower().endswith(IMAGE_EXTENSIONS):
+                yield obj['Key'], obj.get('ETag', '').strip('"')
+        if not response.get('IsTruncated'):
+            return
+        kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+
+def list_image_keys(s3, bucket, prefix=''):
+    for key, _ in list_image_objects(s3, bucket, prefix):
+        yield key
+
+
+def score_request(outfit_description, image_bytes):
+    """Bedrock request body rating one shoe image against the outfit"""
+    # Shoe photos are sent downscaled; a product shot needs nowhere near 12 MP
+    prepared = prepare_image(image_bytes)
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": 500,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": prepared.media_type,
+                            "data": base64.b64encode(prepared.data).decode('utf-8')
+                        }
+                    },
+                    {
+                        "type": "text",
+                        "text": f"""Rate how well these shoes would match with this outfit on a scale of 1-10:
+
+{outfit_description}
+
+Respond ONLY with a JSON object in this exact format:
+{{"score": <number 1-10>, "reason": "<brief explanation>"}}"""
+                    }
+                ]
+            }
+        ]
+    }
+
+
+def parse_score(analysis_text):
+    """`(score, reason)` from the model's JSON object; raises ValueError if there is none or the score is not a number"""
+    start = analysis_text.find('{')
+    end = analysis_text.rfind('}') + 1
+    analysis = json.loads(analysis_text[start:end])
+    # Scores go into the top-N heap, so they must compare: "8/10" or null would raise TypeError there
+    try:
+        score = float(analysis.get('score', 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"score is not a number: {analysis.get('score')!r}")
+    if math.isnan(score):
+        raise ValueError("score is NaN")
+    return score, analysis.get('reason', 'No reason provided')
+
+
+class ShoeImagePipeline:
+    """One pipeline run per outfit; `stats` describes the last run"""
+
+    def __init__(self, s3, bedrock, bucket, prefix='', download_workers=DOWNLOAD_WORKERS,
+                 scoring_workers=SCORING_WORKERS, top_n=TOP_N, deadline=DEADLINE_SECONDS,
+                 router=None):
+        self.s3 = s3
+        self.bedrock = bedrock
+        self.bucket = bucket
+        self.prefix = prefix
+        self.download_workers = download_workers
+        self.scoring_workers = scoring_workers
+        self.top_n = top_n
+        self.deadline = deadline
+        # Image scores go through the 'rating' stage's route
+        self.router = router or get_model_router()
+        self.stats = {}
+
+    def score_image(self, outfit_description, image_bytes):
+        response, _ = self.router.invoke(self.bedrock, 'rating', score_request(outfit_description, image_bytes))
+        response_body = json.loads(response['body'].read())
+        return parse_score(response_body['content'][0]['text'])
+
+    def run(self, outfit_description, on_score=None):
+        """
+        Score every image in the bucket against the outfit and return the
+        top_n as `[{'image', 'score', 'reason'}]`, best first. `on_score(entry)`
+        is called from a scoring worker as each image is scored.
+        """
+        start = time.time()
+        stop = threading.Event()
+        # Bounded so listing and downloads stay only a little ahead of scoring
+        keys = queue.Queue(maxsize=self.download_workers * 4)
+        images = queue.Queue(maxsize=self.scoring_workers * 2)
+        lock = threading.Lock()
+        top = []  # min-heap of (score, -sequence, entry); the worst of the best is evicted first
+        counts = {'listed': 0, 'downloaded': 0, 'scored': 0, 'failed': 0}
+        downloaders_left = [self.download_workers]
+
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def list_keys():
+            try:
+                for key in list_image_keys(self.s3, self.bucket, self.prefix):
+                    counts['listed'] += 1
+                    if not put(keys, key):
+                        return
+            except Exception as e:
+                print(f"Error listing {self.bucket}: {e}")
+            finally:
+                for _ in range(self.download_workers):
+                    put(keys, _DONE)
+
+        def download():
+            try:
+                while True:
+                    key = get(keys)
+                    if key is _DONE:
+                        return
+                    try:
+                        body = self.s3.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+                    except Exception as e:
+                        print(f"  Error downloading {key}: {e}")
+                        with lock:
+                            counts['failed'] += 1
+                        continue
+                    with lock:
+                        counts['downloaded'] += 1
+                    put(images, (key, body))
+            finally:
+                # The last downloader out tells the scorers there is nothing more coming
+                with lock:
+                    downloaders_left[0] -= 1
+                    last = downloaders_left[0] == 0
+                if last:
+                    for _ in range(self.scoring_workers):
+                        put(images, _DONE)
+
+        def score():
+            while True:
+                item = get(images)
+                if item is _DONE:
+                    return
+                key, body = item
+                try:
+                    value, reason = self.score_image(outfit_description, body)
+                except Exception as e:
+                    print(f"  Error scoring {key}: {e}")
+                    with lock:
+                        counts['failed'] += 1
+                    continue
+                entry = {'image': key, 'score': value, 'reason': reason}
+                with lock:
+                    counts['scored'] += 1
+                    ranked = (value, -counts['scored'], entry)
+                    if len(top) < self.top_n:
+                        heapq.heappush(top, ranked)
+                    else:
+                        heapq.heappushpop(top, ranked)
+                print(f"  {key}: {value}/10")
+                if on_score:
+                    on_score(entry)
+
+        threads = [threading.Thread(target=list_keys, name='shoe-list', daemon=True)]
+        threads += [threading.Thread(target=download, name=f'shoe-download-{i}', daemon=True)
+                    for i in range(self.download_workers)]
+        scorers = [threading.Thread(target=score, name=f'shoe-score-{i}', daemon=True)
+                   for i in range(self.scoring_workers)]
+        for thread in threads + scorers:
+            thread.start()
+
+        timed_out = False
+        for thread in scorers:
+            remaining = start + self.deadline - time.time() if self.deadline else None
+            thread.join(timeout=max(remaining, 0) if remaining is not None else None)
+            if thread.is_alive():
+                timed_out = True
+                break
+        # Workers still in a call finish it in the background, then exit; their results are discarded
+        stop.set()
+
+        with lock:
+            results = [entry for _, _, entry in sorted(top, key=lambda ranked: ranked[:2], reverse=True)]
+            self.stats = dict(counts, timed_out=timed_out, elapsed_seconds=round(time.time() - start, 2))
+        if timed_out:
+            print(f"Deadline of {self.deadline}s reached after scoring {counts['scored']} of "
+                  f"{counts['listed']}+ images; returning the best so far")
+        return results
@@ -1,280 +1,312 @@
-"""
-Shoe Matcher Agent with Budget - Finds the best matching shoes within budget from DynamoDB
-"""
-import boto3
-import json
-import base64
-import sys
-import os
-from decimal import Decimal
-
-class ShoeMatcherWithBudget:
-    def __init__(self, budget=200):
-        self.s3 = boto3.client('s3', region_name='us-east-1')
-        self.bedrock = boto3.client('bedrock-runtime', region_name='us-east-1')
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        self.table = self.dynamodb.Table('aldo-product-metadata')
-        self.bucket_name = 'aldo-images'
-        self.budget = budget
-        
-    def analyze_outfit(self, image_path):
-        """Analyze the outfit image and get description"""
-        print(f"Analyzing outfit from: {image_path}")
-        
-        with open(image_path, 'rb') as f:
-            image_bytes = base64.b64encode(f.read()).decode('utf-8')
-        
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": "image/jpeg",
-                                "data": image_bytes
-                            }
-                        },
-                        {
-                            "type": "text",
-                            "text": "Describe this outfit in detail, focusing on colors, style, and formality. What type of shoes would complement this outfit best?"
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        response = self.bedrock.invoke_model(
-            modelId='us.anthropic.claude-3-5-sonnet-20241022-v2:0',
-            body=json.dumps(request_body)
-        )
-        
-        response_body = json.loads(response['body'].read())
-        outfit_description = response_body['content'][0]['text']
-        
-        print(f"\nOutfit Analysis:\n{outfit_description}\n")
-        return outfit_description
-    
-    def get_products_from_dynamodb(self):
-        """Get all products from DynamoDB within budget"""
-        print(f"Fetching products from DynamoDB (Budget: ${self.budget})...")
-        
-        try:
-            response = self.table.scan()
-            items = response.get('Items', [])
-            
-            # Continue scanning if there are more items
-            while 'LastEvaluatedKey' in response:
-                response = self.table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-                items.extend(response.get('Items', []))
-            
-            # Filter by budget
-            affordable_items = []
-            for item in items:
-                price_str = str(item.get('price', '0'))
-                # Remove dollar sign and convert to float
-                price = float(price_str.replace('$', '').replace(',', ''))
-                item['price_float'] = price  # Store cleaned price
-                if price <= self.budget:
-                    affordable_items.append(item)
-            
-            print(f"Found {len(affordable_items)} products within budget (out of {len(items)} total)\n")
-            return affordable_items
-            
-        except Exception as e:
-            print(f"Error fetching from DynamoDB: {e}")
-            return []
-    
-    def match_shoes_with_outfit(self, outfit_description, products):
-        """Match shoes with outfit using Claude and product descriptions"""
-        print(f"Analyzing {len(products)} products for outfit match...\n")
-        
-        # Prepare all product descriptions for batch analysis
-        product_descriptions = []
-        for product in products:
-            product_id = product.get('product_id', 'unknown')
-            name = product.get('product_name', 'Unknown Product')
-            description = product.get('description', 'No description available')
-            price = product.get('price_float', 0)
-            
-            product_descriptions.append({
-                'product_id': product_id,
-                'name': name,
-                'description': description,
-                'price': price,
-                'image_key': product.get('s3_image_key', ''),
-                'url': product.get('product_url', 'N/A')
-            })
-        
-        # Create a single request to analyze all products
-        products_text = "\n\n".join([
-            f"{i+1}. {p['name']} (${p['price']:.2f})\n   Description: {p['description']}"
-            for i, p in enumerate(product_descriptions)
-        ])
-        
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4000,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"""I need to match shoes with this outfit:
-
-{outfit_description}
-
-Here are the available shoes:
-
-{products_text}
-
-Rate each shoe on how well it matches the outfit (1-10 scale). Respond with a JSON array where each object has:
-- "number": the shoe number (1-{len(product_descriptions)})
-- "score": match score (1-10)
-- "reason": brief explanation (max 100 chars)
-
-Format: [{{"number": 1, "score": 8, "reason": "..."}}]"""
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        try:
-            print("Analyzing all products with Claude...")
-            # Call Bedrock
-            bedrock_response = self.bedrock.invoke_model(
-                modelId='us.anthropic.claude-3-5-sonnet-20241022-v2:0',
-                body=json.dumps(request_body)
-            )
-            
-            # Parse response
-            response_body = json.loads(bedrock_response['body'].read())
-            analysis_text = response_body['content'][0]['text']
-            
-            # Extract JSON from response
-            start = analysis_text.find('[')
-            end = analysis_text.rfind(']') + 1
-            json_str = analysis_text[start:end]
-            ratings = json.loads(json_str)
-            
-            # Map ratings back to products
-            shoe_scores = []
-            for rating in ratings:
-                idx = rating.get('number', 0) - 1
-                if 0 <= idx < len(product_descriptions):
-                    product = product_descriptions[idx]
-                    shoe_scores.append({
-                        'product_id': product['product_id'],
-                        'name': product['name'],
-                        'price': product['price'],
-                        'image': product['image_key'],
-                        'score': rating.get('score', 0),
-                        'reason': rating.get('reason', 'No reason provided'),
-                        'url': product['url']
-                    })
-                    print(f"  {product['name']}: {rating.get('score')}/10")
-            
-            # Sort by score (descending), then by price (ascending) for ties
-            shoe_scores.sort(key=lambda x: (-x['score'], x['price']))
-            return shoe_scores
-            
-        except Exception as e:
-            print(f"Error analyzing products: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
-    
-    def display_results(self, shoe_scores, outfit_name):
-        """Display the top 5 results"""
-        print("\n" + "="*80)
-        print(f"TOP 5 MATCHING SHOES FOR: {outfit_name}")
-        print(f"Budget: ${self.budget}")
-        print("="*80)
-        
-        for i, shoe in enumerate(shoe_scores[:5], 1):
-            print(f"\n{i}. {shoe['name']}")
-            print(f"   Product ID: {shoe['product_id']}")
-            print(f"   Price: ${shoe['price']:.2f}")
-            print(f"   Match Score: {shoe['score']}/10")
-            print(f"   Reason: {shoe['reason']}")
-            print(f"   Image: {shoe['image']}")
-            if shoe['url'] != 'N/A':
-                print(f"   URL: {shoe['url']}")
-        
-        if shoe_scores:
-            print("\n" + "="*80)
-            print(f"🏆 BEST MATCH: {shoe_scores[0]['name']}")
-            print(f"   Price: ${shoe_scores[0]['price']:.2f}")
-            print(f"   Score: {shoe_scores[0]['score']}/10")
-            print(f"   {shoe_scores[0]['reason']}")
-            print("="*80)
-    
-    def run(self, outfit_images):
-        """Main agent execution for multiple outfit images"""
-        try:
-            all_results = {}
-            
-            for outfit_image in outfit_images:
-                if not os.path.exists(outfit_image):
-                    print(f"Error: Image file not found: {outfit_image}")
-                    continue
-                
-                print("\n" + "="*80)
-                print(f"PROCESSING: {outfit_image}")
-                print("="*80 + "\n")
-                
-                # Step 1: Analyze the outfit
-                outfit_description = self.analyze_outfit(outfit_image)
-                
-                # Step 2: Get products from DynamoDB
-                products = self.get_products_from_dynamodb()
-                
-                if not products:
-                    print("No products found within budget")
-                    continue
-                
-                # Step 3: Match shoes with outfit
-                shoe_scores = self.match_shoes_with_outfit(outfit_description, products)
-                
-                # Step 4: Display results
-                outfit_name = os.path.basename(outfit_image)
-                self.display_results(shoe_scores, outfit_name)
-                
-                all_results[outfit_image] = shoe_scores[:5]
-            
-            return all_results
-            
-        except Exception as e:
-            print(f"Error running agent: {e}")
-            import traceback
-            traceback.print_exc()
-            return {}
-
-
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python shoe_matcher_with_budget.py <outfit_image1> [outfit_image2] ...")
-        print("Example: python shoe_matcher_with_budget.py img/download.jpg img/outfit2.jpg")
-        sys.exit(1)
-    
-    outfit_images = sys.argv[1:]
-    budget = 200  # Default budget
-    
-    print("="*80)
-    print("SHOE MATCHER AGENT WITH BUDGET")
-    print(f"Finding the best matching shoes within ${budget} budget")
-    print(f"Analyzing {len(outfit_images)} outfit(s)")
-    print("="*80 + "\n")
-    
-    agent = ShoeMatcherWithBudget(budget=budget)
-    agent.run(outfit_images)
-
-
-if __name__ == "__main__":
-    main()
+"""
+Shoe Matcher Agent with Budget - Finds the best matching shoes within budget from DynamoDB
+"""
+import boto3
+import json
+import base64
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bedrock_client import get_bedrock
+from image_prep import prep_signature, prepare_image
+from model_router import get_model_router
+from result_cache import cached_analysis
+from decimal import Decimal
+from catalog_snapshot import get_catalog_snapshot
+from outfit_scorer import get_outfit_scorer
+from shoe_matcher_agent import ANALYSIS_PROMPT
+from structured_output import RATING_TOOL, numbered_ratings, parse_elements, response_text, tool_fields
+
+# Products sent to Claude for rating after local pre-scoring
+SHORTLIST_SIZE = int(os.environ.get('SHOE_SHORTLIST_SIZE', '40'))
+# Products per rating call; chunks are rated concurrently and merged
+CHUNK_SIZE = int(os.environ.get('SHOE_CHUNK_SIZE', '10'))
+SCORING_WORKERS = int(os.environ.get('SHOE_SCORING_WORKERS', '4'))
+# Top candidates re-rated together after the chunk round (0 = no final round)
+FINAL_ROUND_SIZE = int(os.environ.get('SHOE_FINAL_ROUND_SIZE', '0'))
+RATING_TOKENS_PER_PRODUCT = 60
+
+
+class ShoeMatcherWithBudget:
+    def __init__(self, budget=200):
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.bedrock = get_bedrock()
+        self.router = get_model_router()
+        self.dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        self.table = self.dynamodb.Table('aldo-product-metadata')
+        self.bucket_name = 'aldo-images'
+        self.budget = budget
+        
+    def analyze_outfit(self, image_path):
+        """Analyze the outfit image and get description"""
+        print(f"Analyzing outfit from: {image_path}")
+        
+        with open(image_path, 'rb') as f:
+            raw_bytes = f.read()
+        
+        outfit_description, cached = cached_analysis(raw_bytes, ANALYSIS_PROMPT, self.router.primary_model('analysis'),
+                                                      lambda: self.request_analysis(image_path, raw_bytes), prep_signature())
+        print(f"\nOutfit Analysis{' (cached)' if cached else ''}:\n{outfit_description}\n")
+        return outfit_description
+    
+    def request_analysis(self, image_path, raw_bytes):
+        """One vision call for the outfit; returns `(description, cacheable)`"""
+        # Upright, downscaled and recompressed: fewer request bytes, image tokens and latency
+        prepared = prepare_image(raw_bytes)
+        print(f"Prepared {os.path.basename(image_path)}: {prepared.original_bytes} -> {len(prepared.data)} bytes ({prepared.media_type})")
+        image_bytes = base64.b64encode(prepared.data).decode('utf-8')
+        
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": 1000,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": prepared.media_type,
+                                "data": image_bytes
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": ANALYSIS_PROMPT
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        response, route = self.router.invoke(self.bedrock, 'analysis', request_body)
+        
+        response_body = json.loads(response['body'].read())
+        return response_body['content'][0]['text'], not route['fallback']
+    
+    def get_products_from_dynamodb(self):
+        """Get all products from the catalog index within budget"""
+        print(f"Fetching products from DynamoDB (Budget: ${self.budget})...")
+        
+        try:
+            # Prices are parsed once when the catalog index loads; every category, uncategorized included
+            snapshot = get_catalog_snapshot()
+            affordable_items = [
+                product
+                for category, _, _ in snapshot.index.groups()
+                for product in snapshot.index.query(category, self.budget)
+            ]
+            
+            print(f"Found {len(affordable_items)} products within budget (out of {len(snapshot)} total)\n")
+            return affordable_items
+            
+        except Exception as e:
+            print(f"Error fetching from DynamoDB: {e}")
+            return []
+    
+    def rate_products(self, outfit_description, products, final_round=False):
+        """
+        One Claude call rating `products` against the outfit. Returns
+        `[(product, score, reason)]`; numbers in the prompt are local to this call.
+        """
+        products_text = "\n\n".join([
+            f"{i+1}. {p.name or 'Unknown Product'} (${p.price:.2f})\n   Description: {p.description or 'No description available'}"
+            for i, p in enumerate(products)
+        ])
+        instructions = "Rate each shoe on how well it matches the outfit (1-10 scale)."
+        if final_round:
+            # Finalists all scored well against the outfit alone; compare them with each other
+            instructions = ("These are the finalists. Compare them against each other and rate each one "
+                            "on how well it matches the outfit (1-10 scale), using the full range so the best stands out.")
+        
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            # ~40 output tokens per rating; a fixed 4000 truncated large lists
+            "max_tokens": RATING_TOKENS_PER_PRODUCT * len(products) + 200,
+            **tool_fields(RATING_TOOL),
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"""I need to match shoes with this outfit:
+
+{outfit_description}
+
+Here are the available shoes:
+
+{products_text}
+
+{instructions} Submit the ratings with the submit_ratings tool, one per shoe:
+- "number": the shoe number (1-{len(products)})
+- "score": match score (1-10)
+- "reason": brief explanation (max 100 chars)"""
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        bedrock_response, route = self.router.invoke(self.bedrock, 'rating', request_body)
+        
+        # Parse response; a malformed rating costs a short repair call, not the whole chunk
+        response_body = json.loads(bedrock_response['body'].read())
+        ratings, _ = parse_elements(self.bedrock, route['model'], RATING_TOOL, response_text(response_body))
+        
+        # Float scores only, so the merged ranking across chunks always sorts
+        return [(products[idx], score, reason) for idx, score, reason in numbered_ratings(ratings, len(products))]
+    
+    def match_shoes_with_outfit(self, outfit_description, products, chunk_size=CHUNK_SIZE,
+                                max_workers=SCORING_WORKERS, final_round_size=FINAL_ROUND_SIZE):
+        """
+        Match shoes with outfit using Claude and product descriptions.
+        
+        Products are rated in chunks of `chunk_size`, up to `max_workers`
+        chunks at a time, and merged into one ranking, so latency follows the
+        slowest chunk rather than the catalog size. With `final_round_size`,
+        the top candidates are re-rated together in one more call.
+        """
+        # Pre-score every in-budget shoe locally; only the best fits are worth a Claude rating
+        scorer = get_outfit_scorer()
+        if scorer is not None and len(products) > SHORTLIST_SIZE:
+            print(f"Shortlisting {SHORTLIST_SIZE} of {len(products)} products by color/material/formality/season fit")
+            products = scorer.shortlist(outfit_description, products, SHORTLIST_SIZE)
+        
+        if not products:
+            return []
+        
+        chunks = [products[i:i + chunk_size] for i in range(0, len(products), chunk_size)]
+        print(f"Analyzing {len(products)} products for outfit match in {len(chunks)} chunk(s)...\n")
+        
+        start = time.time()
+        rated = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            futures = [executor.submit(self.rate_products, outfit_description, chunk) for chunk in chunks]
+            for i, future in enumerate(futures):
+                try:
+                    rated.extend(future.result())
+                except Exception as e:
+                    # One bad chunk costs its products, not the whole ranking
+                    print(f"Error analyzing chunk {i+1}/{len(chunks)}: {e}")
+        print(f"Rated {len(rated)}/{len(products)} products in {time.time() - start:.1f}s")
+        
+        # Sort by score (descending), then by price (ascending) for ties
+        rated.sort(key=lambda r: (-r[1], r[0].price))
+        
+        if final_round_size and len(chunks) > 1 and len(rated) > 1:
+            finalists = [product for product, _, _ in rated[:final_round_size]]
+            print(f"Final round: re-ranking the top {len(finalists)} together...")
+            try:
+                final = self.rate_products(outfit_description, finalists, final_round=True)
+                final.sort(key=lambda r: (-r[1], r[0].price))
+                # Finalists keep their place above the rest; unrated finalists fall back to round one
+                reranked = {product.product_id for product, _, _ in final}
+                rated = final + [r for r in rated if r[0].product_id not in reranked]
+            except Exception as e:
+                print(f"Final round failed, keeping the chunk ranking: {e}")
+        
+        shoe_scores = []
+        for product, score, reason in rated:
+            shoe_scores.append({
+                'product_id': product.product_id or 'unknown',
+                'name': product.name or 'Unknown Product',
+                'price': product.price,
+                'image': product.image_key or '',
+                'score': score,
+                'reason': reason,
+                'url': product.product_url or 'N/A'
+            })
+            print(f"  {product.name}: {score}/10")
+        return shoe_scores
+    
+    def display_results(self, shoe_scores, outfit_name):
+        """Display the top 5 results"""
+        print("\n" + "="*80)
+        print(f"TOP 5 MATCHING SHOES FOR: {outfit_name}")
+        print(f"Budget: ${self.budget}")
+        print("="*80)
+        
+        for i, shoe in enumerate(shoe_scores[:5], 1):
+            print(f"\n{i}. {shoe['name']}")
+            print(f"   Product ID: {shoe['product_id']}")
+            print(f"   Price: ${shoe['price']:.2f}")
+            print(f"   Match Score: {shoe['score']}/10")
+            print(f"   Reason: {shoe['reason']}")
+            print(f"   Image: {shoe['image']}")
+            if shoe['url'] != 'N/A':
+                print(f"   URL: {shoe['url']}")
+        
+        if shoe_scores:
+            print("\n" + "="*80)
+            print(f"🏆 BEST MATCH: {shoe_scores[0]['name']}")
+            print(f"   Price: ${shoe_scores[0]['price']:.2f}")
+            print(f"   Score: {shoe_scores[0]['score']}/10")
+            print(f"   {shoe_scores[0]['reason']}")
+            print("="*80)
+    
+    def run(self, outfit_images):
+        """Main agent execution for multiple outfit images"""
+        try:
+            all_results = {}
+            
+            for outfit_image in outfit_images:
+                if not os.path.exists(outfit_image):
+                    print(f"Error: Image file not found: {outfit_image}")
+                    continue
+                
+                print("\n" + "="*80)
+                print(f"PROCESSING: {outfit_image}")
+                print("="*80 + "\n")
+                
+                # Step 1: Analyze the outfit
+                outfit_description = self.analyze_outfit(outfit_image)
+                
+                # Step 2: Get products from DynamoDB
+                products = self.get_products_from_dynamodb()
+                
+                if not products:
+                    print("No products found within budget")
+                    continue
+                
+                # Step 3: Match shoes with outfit
+                shoe_scores = self.match_shoes_with_outfit(outfit_description, products)
+                
+                # Step 4: Display results
+                outfit_name = os.path.basename(outfit_image)
+                self.display_results(shoe_scores, outfit_name)
+                
+                all_results[outfit_image] = shoe_scores[:5]
+            
+            return all_results
+            
+        except Exception as e:
+            print(f"Error running agent: {e}")
+            import traceback
+            traceback.print_exc()
+            return {}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python shoe_matcher_with_budget.py <outfit_image1> [outfit_image2] ...")
+        print("Example: python shoe_matcher_with_budget.py img/download.jpg img/outfit2.jpg")
+        sys.exit(1)
+    
+    outfit_images = sys.argv[1:]
+    budget = 200  # Default budget
+    
+    print("="*80)
+    print("SHOE MATCHER AGENT WITH BUDGET")
+    print(f"Finding the best matching shoes within ${budget} budget")
+    print(f"Analyzing {len(outfit_images)} outfit(s)")
+    print("="*80 + "\n")
+    
+    agent = ShoeMatcherWithBudget(budget=budget)
+    agent.run(outfit_images)
+
+
+if __name__ == "__main__":
+    main()
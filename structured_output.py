@@ -0,0 +1,286 @@
+"""
+Structured Output - Tool-use response contracts, tolerant parsing and targeted repair of model JSON
+
+Calls that expect a list of objects force a tool call whose input schema is
+`{"<key>": [<element>, ...]}`. The reply (tool input, or text if the model
+answers in prose) goes through the tolerant JsonArrayStream parser, so every
+element that parses and matches the tool's element schema is kept, with
+values coerced to the schema's types ("8" -> 8.0 for a number). Broken,
+truncated or mistyped elements get one short repair call each, showing the
+model just that fragment, instead of re-running the whole request.
+
+Process-wide counters record how each parse ended:
+    clean     every element parsed
+    repaired  some needed repair and all were recovered
+    salvaged  some were lost, the rest were returned
+    failed    nothing usable
+"""
+import json
+import math
+import os
+import threading
+from json_stream import JsonArrayStream
+
+# Broken elements repaired per response; each costs one short Bedrock call
+MAX_REPAIRS = int(os.environ.get('STRUCTURED_OUTPUT_MAX_REPAIRS', '2'))
+REPAIR_MAX_TOKENS = 600
+# Shorter fragments hold too little of the original answer to repair rather than invent
+MIN_REPAIR_CHARS = 40
+
+BUNDLE_TOOL = {
+    "name": "submit_bundles",
+    "description": "Submit the outfit bundles",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "bundles": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "bundle_name": {"type": "string"},
+                        "bundle_type": {"type": "string", "enum": ["budget", "mid-range", "premium"]},
+                        "match_score": {"type": "number"},
+                        "total_cost": {"type": "number"},
+                        "items": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "id": {"type": "string"},
+                                    "category": {"type": "string"},
+                                    "reason": {"type": "string"}
+                                },
+                                "required": ["id", "category", "reason"]
+                            }
+                        },
+                        "styling_note": {"type": "string"}
+                    },
+                    "required": ["bundle_name", "bundle_type", "match_score", "total_cost", "items", "styling_note"]
+                }
+            }
+        },
+        "required": ["bundles"]
+    }
+}
+
+RATING_TOOL = {
+    "name": "submit_ratings",
+    "description": "Submit a match rating for every numbered shoe",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "ratings": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "number": {"type": "integer"},
+                        "score": {"type": "number"},
+                        "reason": {"type": "string"}
+                    },
+                    "required": ["number", "score", "reason"]
+                }
+            }
+        },
+        "required": ["ratings"]
+    }
+}
+
+_stats_lock = threading.Lock()
+_stats = {'parses': 0, 'clean': 0, 'repaired': 0, 'salvaged': 0, 'failed': 0, 'repair_calls': 0, 'lost_elements': 0}
+
+
+def tool_fields(tool):
+    """Request body fields that make the model answer through `tool`"""
+    return {"tools": [tool], "tool_choice": {"type": "tool", "name": tool['name']}}
+
+
+def element_schema(tool):
+    """Schema of one list element, e.g. a single bundle"""
+    (_, prop), = tool['input_schema']['properties'].items()
+    return prop['items']
+
+
+def response_text(response_body):
+    """The reply as JSON text: the forced tool's input, or the text blocks if the model wrote prose"""
+    parts = []
+    for block in response_body.get('content', []):
+        if block.get('type') == 'tool_use':
+            values = list(block.get('input', {}).values())
+            if len(values) == 1 and isinstance(values[0], str):
+                return values[0]  # The list sent as a JSON string instead of an array
+            return json.dumps(block.get('input', {}))
+        if block.get('type') == 'text':
+            parts.append(block['text'])
+    return ''.join(parts)
+
+
+def coerce_value(value, schema):
+    """
+    `value` converted to the schema's type; raises ValueError or TypeError if
+    it cannot be. Enums are not enforced: bundle_type is matched loosely downstream.
+    """
+    kind = schema.get('type')
+    if kind in ('integer', 'number'):
+        if isinstance(value, bool):
+            raise TypeError(f"expected a {kind}, got {value!r}")
+        number = float(value)
+        if math.isnan(number) or math.isinf(number):
+            raise ValueError(f"expected a finite {kind}, got {value!r}")
+        if kind == 'number':
+            return number
+        if not number.is_integer():
+            raise ValueError(f"expected an integer, got {value!r}")
+        return int(number)
+    if kind == 'string':
+        if value is None or isinstance(value, (bool, dict, list)):
+            raise TypeError(f"expected a string, got {value!r}")
+        return str(value)
+    if kind == 'array':
+        if not isinstance(value, list):
+            raise TypeError(f"expected an array, got {value!r}")
+        return [coerce_value(item, schema['items']) for item in value] if 'items' in schema else value
+    if kind == 'object':
+        if not isinstance(value, dict):
+            raise TypeError(f"expected an object, got {value!r}")
+        required = schema.get('required', [])
+        missing = [field for field in required if field not in value]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        coerced = dict(value)
+        for field, field_schema in schema.get('properties', {}).items():
+            if field not in value:
+                continue
+            if value[field] is None and field not in required:
+                del coerced[field]  # An optional null is the same as leaving it out
+            else:
+                coerced[field] = coerce_value(value[field], field_schema)
+        return coerced
+    return value
+
+
+def coerce_element(element, tool):
+    """One list element with its fields coerced to the tool's schema, or None if it does not fit"""
+    try:
+        return coerce_value(element, element_schema(tool))
+    except (TypeError, ValueError):
+        return None
+
+
+def numbered_ratings(ratings, count):
+    """
+    `(index, score, reason)` for each RATING_TOOL rating of items numbered
+    1..`count`: first rating per item only, score a finite float. Ratings
+    with an unusable number or score are dropped, not raised.
+    """
+    seen = set()
+    rated = []
+    for rating in ratings:
+        try:
+            index = coerce_value(rating.get('number'), {'type': 'integer'}) - 1
+            score = coerce_value(rating.get('score'), {'type': 'number'})
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count and index not in seen:
+            seen.add(index)
+            rated.append((index, score, rating.get('reason') or 'No reason provided'))
+    return rated
+
+
+def leftover_fragments(parser):
+    """Elements that failed to parse, plus one cut off at the end of the reply"""
+    return list(parser.broken) + ([parser.partial] if parser.partial else [])
+
+
+def record_parse(kept, broken, repaired):
+    """Count one parse: `kept` usable elements, `broken` needing repair, `repaired` of those recovered"""
+    with _stats_lock:
+        _stats['parses'] += 1
+        _stats['lost_elements'] += broken - repaired
+        if kept == 0:
+            _stats['failed'] += 1
+        elif broken == 0:
+            _stats['clean'] += 1
+        elif repaired == broken:
+            _stats['repaired'] += 1
+        else:
+            _stats['salvaged'] += 1
+
+
+def structured_output_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['failure_rate'] = round((stats['salvaged'] + stats['failed']) / stats['parses'], 3) if stats['parses'] else None
+    return stats
+
+
+def repair_fragment(bedrock, model_id, tool, fragment):
+    """One short call turning a broken element back into a valid one; None if it cannot"""
+    schema = element_schema(tool)
+    repair_tool = {"name": "submit_item", "description": "Submit the corrected item", "input_schema": schema}
+    request_body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": REPAIR_MAX_TOKENS,
+        **tool_fields(repair_tool),
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"""This item from a JSON answer is truncated or malformed:
+
+{fragment}
+
+Submit it as one complete, valid item. Keep every value that is already there and fill in only what is missing."""
+                    }
+                ]
+            }
+        ]
+    }
+    with _stats_lock:
+        _stats['repair_calls'] += 1
+    try:
+        response = bedrock.invoke_model(modelId=model_id, body=json.dumps(request_body))
+        text = response_text(json.loads(response['body'].read()))
+        element = json.loads(text[text.find('{'):text.rfind('}') + 1])
+    except Exception as e:
+        print(f"Repair call failed: {e}")
+        return None
+    return coerce_element(element, tool)
+
+
+def repair_fragments(bedrock, model_id, tool, fragments, max_repairs=MAX_REPAIRS):
+    """Repaired elements for up to `max_repairs` fragments, in order"""
+    repaired = []
+    fragments = [fragment for fragment in fragments if len(fragment) >= MIN_REPAIR_CHARS]
+    for fragment in fragments[:max_repairs]:
+        element = repair_fragment(bedrock, model_id, tool, fragment)
+        if element is not None:
+            repaired.append(element)
+    return repaired
+
+
+def parse_elements(bedrock, model_id, tool, text, max_repairs=MAX_REPAIRS):
+    """
+    `(elements, lost)`: every valid element of the reply `text`, with broken
+    ones repaired where possible, and how many could not be recovered.
+    Records the outcome; never raises on malformed JSON.
+    """
+    parser = JsonArrayStream()
+    elements = []
+    fragments = []
+    for element in parser.feed(text):
+        coerced = coerce_element(element, tool)
+        if coerced is not None:
+            elements.append(coerced)
+        else:
+            fragments.append(json.dumps(element))
+    fragments += leftover_fragments(parser)
+
+    repaired = repair_fragments(bedrock, model_id, tool, fragments, max_repairs) if fragments else []
+    record_parse(len(elements) + len(repaired), len(fragments), len(repaired))
+    if fragments:
+        print(f"Structured output: {len(elements)} valid, {len(fragments)} broken, {len(repaired)} repaired")
+    return elements + repaired, len(fragments) - len(repaired)
@@ -0,0 +1,134 @@
+"""
+Test the Bedrock governor against a local fake that injects throttles
+
+Runs without AWS access:
+    python test_bedrock_client.py
+"""
+import threading
+import time
+from botocore.exceptions import ClientError
+from bedrock_client import BedrockGovernor, TokenBucket
+
+FAST = {'requests_per_minute': 60000, 'burst': 100}
+
+
+def client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'InvokeModel')
+
+
+class ThrottlingBedrock:
+    """Fails the first `throttles` calls with `code`, then answers; tracks concurrency"""
+
+    def __init__(self, throttles=0, code='ThrottlingException', latency=0.0):
+        self.throttles = throttles
+        self.code = code
+        self.latency = latency
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.latency)
+            if call <= self.throttles:
+                raise client_error(self.code)
+            return {'body': 'ok'}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class RecordingSleep:
+    def __init__(self):
+        self.delays = []
+
+    def __call__(self, seconds):
+        self.delays.append(seconds)
+
+
+def test_throttles_are_retried_with_backoff():
+    fake = ThrottlingBedrock(throttles=2)
+    sleep = RecordingSleep()
+    governor = BedrockGovernor(client=fake, sleep=sleep, **FAST)
+
+    assert governor.invoke_model(modelId='m', body='{}') == {'body': 'ok'}
+
+    stats = governor.stats()
+    assert fake.calls == 3
+    assert stats['throttles'] == 2 and stats['retries'] == 2 and stats['failures'] == 0
+    # Full jitter: each delay is within its exponential cap
+    assert 0 <= sleep.delays[0] <= 0.5 and 0 <= sleep.delays[1] <= 1.0
+    # Two throttles halved the rate twice; one success added back a tenth of it
+    assert stats['requests_per_minute'] == round(60000 * (0.25 + 0.1), 1)
+
+
+def test_gives_up_after_max_attempts():
+    fake = ThrottlingBedrock(throttles=10)
+    governor = BedrockGovernor(client=fake, sleep=RecordingSleep(), max_attempts=3, **FAST)
+
+    try:
+        governor.invoke_model(modelId='m', body='{}')
+        assert False, "expected ThrottlingException"
+    except ClientError as e:
+        assert e.response['Error']['Code'] == 'ThrottlingException'
+
+    stats = governor.stats()
+    assert fake.calls == 3
+    assert stats['retries'] == 2 and stats['failures'] == 1
+
+
+def test_client_errors_are_not_retried():
+    fake = ThrottlingBedrock(throttles=1, code='ValidationException')
+    governor = BedrockGovernor(client=fake, sleep=RecordingSleep(), **FAST)
+
+    try:
+        governor.invoke_model(modelId='m', body='{}')
+        assert False, "expected ValidationException"
+    except ClientError:
+        pass
+
+    assert fake.calls == 1
+    assert governor.stats()['retries'] == 0
+
+
+def test_in_flight_calls_are_capped():
+    fake = ThrottlingBedrock(latency=0.05)
+    governor = BedrockGovernor(client=fake, max_in_flight=3, **FAST)
+
+    threads = [threading.Thread(target=governor.invoke_model, kwargs={'modelId': 'm', 'body': '{}'})
+               for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake.calls == 12
+    assert fake.max_active == 3
+
+
+def test_token_bucket_spaces_calls_at_the_rate():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=lambda: now[0], sleep=sleep)
+    waits = [bucket.acquire() for _ in range(3)]
+
+    assert waits[0] == 0.0
+    assert abs(waits[1] - 0.5) < 1e-9 and abs(waits[2] - 0.5) < 1e-9
+
+
+if __name__ == "__main__":
+    test_throttles_are_retried_with_backoff()
+    test_gives_up_after_max_attempts()
+    test_client_errors_are_not_retried()
+    test_in_flight_calls_are_capped()
+    test_token_bucket_spaces_calls_at_the_rate()
+    print("All Bedrock governor tests passed")
@@ -0,0 +1,40 @@
+"""
+Test that artifact rows and Products are interchangeable as set and dict keys
+
+Runs without AWS access:
+    python test_catalog_artifact.py
+"""
+import os
+import tempfile
+from catalog_artifact import CatalogArtifact, write_artifact
+from catalog_index import CatalogIndex
+
+
+def items():
+    return [
+        {'product_id': 'p1', 'product_name': 'Leather Loafer', 'price': '$89.99', 'product_type': 'FOOTWEAR'},
+        {'product_id': 'p2', 'product_name': 'Canvas Tote', 'price': '45.00', 'product_type': 'HANDBAG'},
+        {'product_id': 'p3', 'product_name': 'Gold Ring', 'price': '120', 'product_type': 'JEWELRY'}
+    ]
+
+
+def test_artifact_rows_and_products_compare_by_id_both_ways():
+    index = CatalogIndex(items())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'catalog.bin')
+        write_artifact(index, 'v1', path)
+        artifact_index = CatalogArtifact(path).to_index()
+
+    for product_id in ('p1', 'p2', 'p3'):
+        product, row = index.get(product_id), artifact_index.get(product_id)
+        assert product == row and row == product and not product != row
+        assert hash(product) == hash(row)
+        assert row in {product} and product in {row}
+    assert index.get('p1') != artifact_index.get('p2') and artifact_index.get('p2') != index.get('p1')
+    # Anything else with a product_id is not a product
+    assert artifact_index.get('p1') != {'product_id': 'p1'} and index.get('p1') != 'p1'
+
+
+if __name__ == "__main__":
+    test_artifact_rows_and_products_compare_by_id_both_ways()
+    print("All catalog artifact tests passed")
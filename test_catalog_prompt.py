@@ -0,0 +1,97 @@
+"""
+Test what the prompt-cached catalog prefix lists with each BUNDLE_PROMPT_CACHE_SOURCE
+
+Runs without AWS access:
+    python test_catalog_prompt.py
+"""
+import random
+import outfit_bundle_agent
+from bundle_optimizer import PREMIUM_MARGIN
+from catalog_index import CATEGORIES, CatalogIndex
+from outfit_bundle_agent import OutfitBundleAgent
+from result_cache import BUNDLE_BUDGET_BAND
+
+PRODUCT_TYPES = ['FOOTWEAR', 'HANDBAG', 'JEWELRY', 'CLOTHING', 'ACCESSORIES']
+OUTFIT = "Navy linen suit with a white shirt, summer wedding"
+CONFIG = (outfit_bundle_agent.PROMPT_CACHING, outfit_bundle_agent.PROMPT_CACHE_SOURCE)
+
+
+def catalog(size=500, seed=5):
+    rng = random.Random(seed)
+    return CatalogIndex([
+        {
+            'product_id': f"p{i}",
+            'product_name': f"Product {i}",
+            'description': f"Product {i} in a colour that goes with most outfits",
+            'price': f"{rng.uniform(10, 400):.2f}",
+            'product_type': PRODUCT_TYPES[i % len(PRODUCT_TYPES)]
+        }
+        for i in range(size)
+    ])
+
+
+def teardown_function():
+    outfit_bundle_agent.PROMPT_CACHING, outfit_bundle_agent.PROMPT_CACHE_SOURCE = CONFIG
+
+
+def make_agent(index, source, version='v1'):
+    outfit_bundle_agent.PROMPT_CACHING = True
+    outfit_bundle_agent.PROMPT_CACHE_SOURCE = source
+    agent = OutfitBundleAgent(budget=200)
+    agent.catalog_index = index
+    agent.catalog_version = version
+    return agent
+
+
+def shortlist(index, budget, offset):
+    """Stands in for the retrieval shortlist: a different slice of the in-budget products per offset"""
+    return tuple(index.query(category, budget + PREMIUM_MARGIN)[offset:offset + 20] for category in CATEGORIES)
+
+
+def test_candidates_prefix_lists_the_shortlist_within_the_token_budget():
+    index = catalog()
+    agent = make_agent(index, 'candidates')
+    products = shortlist(index, agent.budget, 0)
+
+    fragment = agent.catalog_fragment(OUTFIT, products)
+
+    # Only shortlisted products, in shortlist order, and exactly the prompt the inline path sends
+    for listed, candidates in zip(fragment.products, products):
+        assert list(listed) == list(candidates[:len(listed)])
+    outfit_bundle_agent.PROMPT_CACHING = False
+    inline = agent.bundle_request(OUTFIT, *products)['messages'][0]['content'][0]['text']
+    assert inline == fragment.text + "\n\n" + agent.bundle_prompt(OUTFIT)
+
+    # Cached on the listed ids: the same shortlist reuses the prefix, another one gets its own
+    agent = make_agent(index, 'candidates')
+    assert agent.catalog_fragment(OUTFIT, products) is fragment
+    other = agent.catalog_fragment(OUTFIT, shortlist(index, agent.budget, 5))
+    assert other is not fragment and other.products[0][0].product_id != fragment.products[0][0].product_id
+
+
+def test_catalog_prefix_is_shared_across_shortlists_in_a_band():
+    index = catalog()
+    agent = make_agent(index, 'catalog', version='v2')
+
+    fragment = agent.catalog_fragment(OUTFIT, shortlist(index, agent.budget, 0))
+
+    assert agent.catalog_fragment(OUTFIT, shortlist(index, agent.budget, 5)) is fragment
+    max_price = (fragment.band + 1) * BUNDLE_BUDGET_BAND + PREMIUM_MARGIN
+    assert all(product.price <= max_price for listed in fragment.products for product in listed)
+    # The request sends the cached prefix ahead of the per-request suffix
+    content = agent.bundle_request(OUTFIT, *fragment.products, fragment=fragment)['messages'][0]['content']
+    assert content[0] == {"type": "text", "text": fragment.text, "cache_control": {"type": "ephemeral"}}
+
+
+def test_no_prefix_without_prompt_caching():
+    agent = make_agent(catalog(), 'candidates')
+    outfit_bundle_agent.PROMPT_CACHING = False
+
+    assert agent.catalog_fragment(OUTFIT, shortlist(agent.catalog_index, agent.budget, 0)) is None
+
+
+if __name__ == "__main__":
+    test_candidates_prefix_lists_the_shortlist_within_the_token_budget()
+    test_catalog_prefix_is_shared_across_shortlists_in_a_band()
+    test_no_prefix_without_prompt_caching()
+    print("All catalog prompt tests passed")
@@ -0,0 +1,267 @@
+"""
+Test query-mode catalog access: the category/price GSI against a scan
+
+Always runs against an in-process fake table that reports ConsumedCapacity
+the way DynamoDB does. With DynamoDB Local running it also runs there:
+    docker run -p 8000:8000 amazon/dynamodb-local
+    python test_catalog_query.py [--products 5000] [--budget 200]
+"""
+import argparse
+import json
+import math
+import random
+import time
+import zlib
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import ConnectTimeoutError, EndpointConnectionError
+from backfill_category_price_index import backfill, index_attribute_definitions, index_definition
+from bundle_optimizer import PREMIUM_MARGIN
+from catalog_index import CATEGORIES
+from catalog_query import CATEGORY_ATTRIBUTE, CATEGORY_PRICE_INDEX, PRICE_ATTRIBUTE, query_catalog
+from product import parse_price
+from product_classifier import classify_product
+
+ENDPOINT_URL = "http://localhost:8000"
+TABLE_NAME = "aldo-product-metadata-local"
+
+# DynamoDB pages stop at 1 MB; eventually consistent reads cost 0.5 RCU per 4 KB read
+PAGE_BYTES = 1024 * 1024
+READ_UNIT_BYTES = 4096
+
+PRODUCT_TYPES = ['FOOTWEAR', 'FOOTWEAR', 'FOOTWEAR', 'HANDBAGS', 'JEWELRY', 'CLOTHING', 'ACCESSORIES', 'OTHER']
+NAMES = ['Stella', 'Gold Hoop Earrings', 'Crossbody Bag', 'Wide Brim Hat', 'Leather Belt',
+         'Block Heel Pump', 'Chain Necklace', 'Mini Tote', 'Chelsea Boot', 'Silk Scarf']
+
+
+def item_size(item):
+    return len(json.dumps(item, default=str))
+
+
+def read_capacity(items):
+    return math.ceil(sum(item_size(item) for item in items) / READ_UNIT_BYTES) * 0.5
+
+
+def key_conditions(condition):
+    """{attribute: (operator, values)} from a boto3 KeyConditionExpression"""
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        conditions = {}
+        for part in expression['values']:
+            conditions.update(key_conditions(part))
+        return conditions
+    key, *values = expression['values']
+    return {key.name: (expression['operator'], values)}
+
+
+class FakeProductTable:
+    """
+    In-process stand-in for the product table and its category/price GSI:
+    scan (segments, Limit, 1 MB pages), query on the index, the update_item
+    forms the backfill uses, and DynamoDB's read capacity accounting.
+    """
+
+    def __init__(self):
+        self.items = {}
+
+    def batch_writer(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def put_item(self, Item):
+        self.items[Item['product_id']] = dict(Item)
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames, ExpressionAttributeValues):
+        item = self.items[Key['product_id']]
+        set_part, _, remove_part = UpdateExpression.partition(' REMOVE ')
+        for assignment in set_part[len('SET '):].split(','):
+            name, value = (part.strip() for part in assignment.split('='))
+            item[ExpressionAttributeNames[name]] = ExpressionAttributeValues[value]
+        for name in filter(None, (part.strip() for part in remove_part.split(','))):
+            item.pop(ExpressionAttributeNames[name], None)
+
+    def page(self, items, limit, start_key, key_fields, projection=None):
+        """One response page from `items` in key order, with capacity for what was read"""
+        if start_key:
+            position = next(i for i, item in enumerate(items) if all(item[f] == start_key[f] for f in key_fields))
+            items = items[position + 1:]
+        read = []
+        size = 0
+        for item in items:
+            if (limit and len(read) >= limit) or size >= PAGE_BYTES:
+                break
+            read.append(item)
+            size += item_size(item)
+        response = {
+            'Items': [{field: item[field] for field in projection if field in item} if projection else dict(item)
+                      for item in read],
+            'ConsumedCapacity': {'CapacityUnits': read_capacity(read)}
+        }
+        if len(read) < len(items):
+            response['LastEvaluatedKey'] = {field: read[-1][field] for field in key_fields}
+        return response
+
+    def scan(self, Limit=None, ExclusiveStartKey=None, Segment=0, TotalSegments=1,
+             ProjectionExpression=None, ExpressionAttributeNames=None, ReturnConsumedCapacity=None):
+        items = [item for product_id, item in self.items.items()
+                 if zlib.crc32(product_id.encode()) % TotalSegments == Segment]
+        projection = ([ExpressionAttributeNames[name.strip()] for name in ProjectionExpression.split(',')]
+                      if ProjectionExpression else None)
+        return self.page(items, Limit, ExclusiveStartKey, ['product_id'], projection)
+
+    def query(self, IndexName, KeyConditionExpression, Limit=None, ExclusiveStartKey=None, ReturnConsumedCapacity=None):
+        assert IndexName == CATEGORY_PRICE_INDEX
+        conditions = key_conditions(KeyConditionExpression)
+        _, (category,) = conditions[CATEGORY_ATTRIBUTE]
+        _, (low, high) = conditions[PRICE_ATTRIBUTE]
+        # Sparse index: only items carrying the category attribute are in it
+        items = sorted((item for item in self.items.values()
+                        if item.get(CATEGORY_ATTRIBUTE) == category and low <= item[PRICE_ATTRIBUTE] <= high),
+                       key=lambda item: (item[PRICE_ATTRIBUTE], item['product_id']))
+        return self.page(items, Limit, ExclusiveStartKey, ['product_id', CATEGORY_ATTRIBUTE, PRICE_ATTRIBUTE])
+
+
+def create_table(dynamodb):
+    """Recreate the local table with the category/price GSI"""
+    try:
+        dynamodb.Table(TABLE_NAME).delete()
+        dynamodb.Table(TABLE_NAME).wait_until_not_exists()
+    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+        pass
+
+    table = dynamodb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{'AttributeName': 'product_id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'product_id', 'AttributeType': 'S'}] + index_attribute_definitions(),
+        GlobalSecondaryIndexes=[index_definition()],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    table.wait_until_exists()
+    return table
+
+
+def load_products(table, count, seed=11):
+    """Write synthetic products shaped like aldo-product-metadata items"""
+    rng = random.Random(seed)
+    with table.batch_writer() as batch:
+        for i in range(count):
+            batch.put_item(Item={
+                'product_id': f"aldo_local_{i}",
+                'product_name': rng.choice(NAMES),
+                'product_type': rng.choice(PRODUCT_TYPES),
+                'price': f"${rng.uniform(15, 450):.2f}",
+                'description': 'Synthetic product description. ' * rng.randint(5, 30),
+                'product_url': f"https://example.com/p/{i}",
+                'original_image_url': f"https://example.com/i/{i}.jpg"
+            })
+
+
+def measure_scan(table, **kwargs):
+    """Scan the way the agent used to: one page, ConsumedCapacity reported"""
+    start = time.perf_counter()
+    response = table.scan(ReturnConsumedCapacity='TOTAL', **kwargs)
+    elapsed = time.perf_counter() - start
+    return response, response.get('ConsumedCapacity', {}).get('CapacityUnits', 0), elapsed
+
+
+def measure_full_scan(table):
+    """Walk the whole table, as the snapshot loader does"""
+    start = time.perf_counter()
+    consumed = 0
+    items = 0
+    response, capacity, _ = measure_scan(table)
+    consumed += capacity
+    items += len(response.get('Items', []))
+    while 'LastEvaluatedKey' in response:
+        response, capacity, _ = measure_scan(table, ExclusiveStartKey=response['LastEvaluatedKey'])
+        consumed += capacity
+        items += len(response.get('Items', []))
+    return items, consumed, time.perf_counter() - start
+
+
+def compare_scan_and_query(table, products=5000, budget=200, limit=30):
+    """Load `table`, then compare Scan(Limit=300) and a full scan with per-category Query"""
+    premium_budget = budget + PREMIUM_MARGIN
+    print(f"Loading {products} synthetic products...")
+    load_products(table, products)
+    backfill(table)
+
+    response, scan_capacity, scan_time = measure_scan(table, Limit=300)
+    scanned = response.get('Items', [])
+    eligible = [item for item in scanned if parse_price(item.get('price')) <= premium_budget]
+
+    full_items, full_capacity, full_time = measure_full_scan(table)
+
+    start = time.perf_counter()
+    results, query_capacity = query_catalog(table, premium_budget, limit=limit)
+    query_time = time.perf_counter() - start
+    returned = sum(len(items) for items in results.values())
+
+    print("\n" + "="*80)
+    print(f"Budget ${budget} (premium cap ${premium_budget}), limit {limit} per category")
+    print("="*80)
+    print(f"Scan(Limit=300): {scan_capacity:7.1f} RCU  {scan_time * 1000:7.1f} ms  "
+          f"{len(scanned)} read, {len(eligible)} within budget")
+    print(f"Full scan:       {full_capacity:7.1f} RCU  {full_time * 1000:7.1f} ms  {full_items} read")
+    print(f"Query mode:      {query_capacity:7.1f} RCU  {query_time * 1000:7.1f} ms  "
+          f"{returned} read, all within budget")
+    for category in CATEGORIES:
+        prices = [product.price for product in results[category]]
+        print(f"  {category}: {len(prices)} items" + (f", ${min(prices):.2f}-${max(prices):.2f}" if prices else ""))
+
+    assert full_items == products
+    assert all(product.price <= premium_budget for products in results.values() for product in products)
+    assert all(0 < len(items) <= limit for items in results.values())
+    assert query_capacity < scan_capacity, "Query mode should read less than a 300-item scan page"
+    return results
+
+
+def test_catalog_query_in_process():
+    """The GSI returns only in-budget products of the queried category, for less read capacity than a scan"""
+    table = FakeProductTable()
+    results = compare_scan_and_query(table)
+
+    for category, products in results.items():
+        for product in products:
+            item = table.items[product.product_id]
+            assert classify_product(item) == category
+            assert parse_price(item['price']) <= 200 + PREMIUM_MARGIN
+    # Prices are spread over the bands rather than only the cheapest items
+    shoes = [product.price for product in results['shoes']]
+    assert shoes == sorted(shoes) and shoes[-1] > 200
+
+
+def dynamodb_local():
+    """A DynamoDB Local resource, or skip at once if nothing answers at ENDPOINT_URL"""
+    dynamodb = boto3.resource(
+        'dynamodb', region_name='us-east-1', endpoint_url=ENDPOINT_URL,
+        aws_access_key_id='local', aws_secret_access_key='local',
+        config=Config(connect_timeout=1, read_timeout=5, retries={'max_attempts': 1})
+    )
+    try:
+        dynamodb.meta.client.list_tables()
+    except (EndpointConnectionError, ConnectTimeoutError):
+        pytest.skip(f"DynamoDB Local is not running at {ENDPOINT_URL}")
+    return dynamodb
+
+
+def test_catalog_query_dynamodb_local(products=5000, budget=200):
+    compare_scan_and_query(create_table(dynamodb_local()), products, budget)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare scan and query catalog access')
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--budget', type=int, default=200)
+    args = parser.parse_args()
+    test_catalog_query_in_process()
+    try:
+        test_catalog_query_dynamodb_local(args.products, args.budget)
+    except pytest.skip.Exception as e:
+        print(f"Skipping DynamoDB Local: {e}")
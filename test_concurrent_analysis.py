@@ -0,0 +1,104 @@
+"""
+Test concurrent outfit analysis against a stubbed Bedrock that sleeps
+
+Runs without AWS access:
+    python test_concurrent_analysis.py
+"""
+import base64
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import result_cache
+from outfit_bundle_agent import OutfitBundleAgent
+from result_cache import TwoTierCache
+
+BEDROCK_LATENCY = 0.5
+IMAGE_COUNT = 4
+ANALYSIS_CACHE = result_cache.analysis_cache
+
+
+class SleepyBedrock:
+    """Stands in for bedrock-runtime: every vision call takes BEDROCK_LATENCY seconds"""
+
+    def __init__(self, latency=BEDROCK_LATENCY, fail_on=None):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke_model(self, modelId, body):
+        with self._lock:
+            self.calls += 1
+        image = json.loads(body)['messages'][0]['content'][0]['source']['data']
+        label = base64.b64decode(image).split(b'|')[0].decode('utf-8')
+        time.sleep(self.latency)
+        if label == self.fail_on:
+            raise RuntimeError(f"ThrottlingException for {label}")
+        payload = {'content': [{'text': f"Description of {label}"}]}
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+
+def write_images(count):
+    """Unique fake images so the analysis cache never answers for Bedrock"""
+    paths = []
+    for i in range(count):
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as f:
+            f.write(f"outfit{i + 1}|".encode('utf-8') + os.urandom(16))
+            paths.append(f.name)
+    return paths
+
+
+def teardown_function():
+    result_cache.analysis_cache = ANALYSIS_CACHE
+
+
+def make_agent(bedrock):
+    # Memory-only and fresh per agent: nothing is left in /tmp/result-cache and no earlier run can answer
+    result_cache.analysis_cache = TwoTierCache('test-analysis', persistent=False)
+    agent = OutfitBundleAgent(budget=200)
+    agent.bedrock = bedrock
+    return agent
+
+
+def test_concurrent_analysis_is_faster_than_serial():
+    """N images should take about one Bedrock latency, not N"""
+    paths = write_images(IMAGE_COUNT)
+    try:
+        bedrock = SleepyBedrock()
+        agent = make_agent(bedrock)
+
+        start = time.time()
+        descriptions = agent.analyze_outfits(paths)
+        elapsed = time.time() - start
+
+        serial_estimate = IMAGE_COUNT * BEDROCK_LATENCY
+        print(f"{IMAGE_COUNT} images: {elapsed:.2f}s concurrent vs ~{serial_estimate:.2f}s serial")
+
+        assert descriptions == [f"Description of outfit{i + 1}" for i in range(IMAGE_COUNT)]
+        assert bedrock.calls == IMAGE_COUNT
+        assert elapsed < 2 * BEDROCK_LATENCY
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+
+def test_failed_image_does_not_abort_the_others():
+    """A failing analysis yields None in its slot; the rest keep their order"""
+    paths = write_images(3)
+    try:
+        agent = make_agent(SleepyBedrock(latency=0.1, fail_on='outfit2'))
+        descriptions = agent.analyze_outfits(paths)
+
+        assert descriptions == ["Description of outfit1", None, "Description of outfit3"]
+    finally:
+        for path in paths:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    test_concurrent_analysis_is_faster_than_serial()
+    test_failed_image_does_not_abort_the_others()
+    print("All concurrent analysis tests passed")
@@ -0,0 +1,158 @@
+"""
+Test the model router against a fake Bedrock client with per-model latency and throttles
+
+Runs without AWS access:
+    python test_model_router.py
+"""
+import json
+import math
+from botocore.exceptions import ClientError
+from bedrock_client import BedrockGovernor, TokenBucket
+from model_router import ModelRouter, merge_route
+
+TIERS = {'standard': 'big-model', 'fast': 'small-model'}
+REQUEST = {'messages': [{'role': 'user', 'content': [
+    {'type': 'text', 'text': 'catalog', 'cache_control': {'type': 'ephemeral'}},
+    {'type': 'text', 'text': 'outfit'}
+]}]}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBedrock:
+    """Advances `clock` by each model's latency; throttles `throttled` models and the first `throttle_first` calls"""
+
+    def __init__(self, clock, latency, throttled=(), throttle_first=0):
+        self.clock = clock
+        self.latency = latency
+        self.throttled = set(throttled)
+        self.throttle_first = throttle_first
+        self.calls = []
+
+    def invoke_model(self, **kwargs):
+        self.calls.append((kwargs['modelId'], json.loads(kwargs['body'])))
+        self.clock.now += self.latency[kwargs['modelId']]
+        if kwargs['modelId'] in self.throttled or len(self.calls) <= self.throttle_first:
+            raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'InvokeModel')
+        return {'body': kwargs['modelId']}
+
+
+def make_router(clock, slo=5.0):
+    return ModelRouter(routes={'analysis': (['standard', 'fast'], slo)}, tiers=TIERS, window=10, cooldown=60, clock=clock)
+
+
+def test_primary_is_used_within_the_slo():
+    clock = Clock()
+    router = make_router(clock)
+    bedrock = FakeBedrock(clock, {'big-model': 2.0, 'small-model': 0.5})
+
+    for _ in range(5):
+        response, route = router.invoke(bedrock, 'analysis', REQUEST)
+
+    assert response == {'body': 'big-model'}
+    assert route['tier'] == 'standard' and route['reason'] == 'primary' and not route['fallback']
+    # The primary keeps its cache_control marker
+    assert bedrock.calls[0][1] == REQUEST
+    assert router.stats()['analysis']['tiers']['standard']['p90_seconds'] == 2.0
+
+
+def test_slo_breach_moves_to_the_fast_tier_until_the_cooldown_ends():
+    clock = Clock()
+    router = make_router(clock)
+    bedrock = FakeBedrock(clock, {'big-model': 8.0, 'small-model': 0.5})
+
+    routes = [router.invoke(bedrock, 'analysis', REQUEST)[1] for _ in range(5)]
+
+    assert [route['tier'] for route in routes] == ['standard', 'standard', 'standard', 'fast', 'fast']
+    assert routes[3]['reason'] == 'slo'
+    # Fallback tiers are sent the request without prompt caching markers
+    assert 'cache_control' not in bedrock.calls[-1][1]['messages'][0]['content'][0]
+    assert router.stats()['analysis']['slo_breaches'] == 1
+
+    clock.now += 60
+    assert router.invoke(bedrock, 'analysis', REQUEST)[1]['tier'] == 'standard'
+
+
+def test_throttled_primary_falls_back_within_the_call():
+    clock = Clock()
+    router = make_router(clock)
+    bedrock = FakeBedrock(clock, {'big-model': 0.1, 'small-model': 0.1}, throttled={'big-model'})
+
+    response, route = router.invoke(bedrock, 'analysis', REQUEST)
+
+    assert response == {'body': 'small-model'}
+    assert route['tier'] == 'fast' and route['reason'] == 'throttle'
+    # The primary is skipped for the cooldown instead of being throttled again
+    router.invoke(bedrock, 'analysis', REQUEST)
+    assert [model for model, _ in bedrock.calls] == ['big-model', 'small-model', 'small-model']
+    assert router.stats()['analysis']['throttles'] == 1
+
+
+def test_governed_primary_gives_up_early_when_a_fallback_waits():
+    clock = Clock()
+    router = make_router(clock)
+    fake = FakeBedrock(clock, {'big-model': 0.0, 'small-model': 0.0}, throttled={'big-model'})
+    governor = BedrockGovernor(client=fake, requests_per_minute=60000, burst=100, sleep=lambda seconds: None)
+
+    response, route = router.invoke(governor, 'analysis', REQUEST)
+
+    assert route['tier'] == 'fast'
+    assert [model for model, _ in fake.calls] == ['big-model', 'big-model', 'small-model']
+
+
+def test_governor_waits_do_not_count_toward_the_slo():
+    clock = Clock()
+    router = make_router(clock)
+    fake = FakeBedrock(clock, {'big-model': 2.0, 'small-model': 0.5}, throttle_first=1)
+
+    def advance(seconds):
+        clock.now += seconds
+    # One request a minute and 30s backoffs: every call waits far longer than the 5s SLO before it is sent
+    governor = BedrockGovernor(client=fake, requests_per_minute=1, burst=1, sleep=lambda seconds: advance(30), clock=clock)
+    # Whole seconds, so refills never fall a rounding error short of a token
+    governor.bucket = TokenBucket(governor.max_rate, 1, clock=clock, sleep=lambda seconds: advance(math.ceil(seconds)))
+
+    routes = [router.invoke(governor, 'analysis', REQUEST)[1] for _ in range(5)]
+
+    assert clock.now > 5 * 60
+    assert [route['tier'] for route in routes] == ['standard'] * 5
+    assert [route['seconds'] for route in routes] == [2.0] * 5
+    assert router.stats()['analysis']['tiers']['standard']['p90_seconds'] == 2.0
+    assert governor.stats()['retries'] == 1 and governor.stats()['rate_wait_seconds'] > 0
+
+
+def test_last_tier_errors_are_raised():
+    clock = Clock()
+    router = make_router(clock)
+    bedrock = FakeBedrock(clock, {'big-model': 0.0, 'small-model': 0.0}, throttled={'big-model', 'small-model'})
+
+    try:
+        router.invoke(bedrock, 'analysis', REQUEST)
+        assert False, "expected ThrottlingException"
+    except ClientError as e:
+        assert e.response['Error']['Code'] == 'ThrottlingException'
+
+
+def test_routes_are_summarized_per_stage():
+    routes = {}
+    merge_route(routes, {'stage': 'analysis', 'tier': 'standard', 'model': 'big-model', 'fallback': False, 'reason': 'primary'})
+    merge_route(routes, {'stage': 'analysis', 'tier': 'fast', 'model': 'small-model', 'fallback': True, 'reason': 'slo'})
+
+    assert routes == {'analysis': {'calls': 2, 'fallback_calls': 1, 'tier': 'fast', 'model': 'small-model', 'reason': 'slo'}}
+
+
+if __name__ == "__main__":
+    test_primary_is_used_within_the_slo()
+    test_slo_breach_moves_to_the_fast_tier_until_the_cooldown_ends()
+    test_throttled_primary_falls_back_within_the_call()
+    test_governed_primary_gives_up_early_when_a_fallback_waits()
+    test_governor_waits_do_not_count_toward_the_slo()
+    test_last_tier_errors_are_raised()
+    test_routes_are_summarized_per_stage()
+    print("All model router tests passed")
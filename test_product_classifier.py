@@ -0,0 +1,49 @@
+"""
+Test that the product classifier keeps the original chain's category precedence
+
+Runs without AWS access:
+    python test_product_classifier.py
+"""
+from benchmark_classifier import legacy_categorize, synthetic_catalog
+from product_classifier import ProductClassifier, classify_product
+
+
+def product(product_type, name):
+    return {'product_type': product_type, 'product_name': name, 'description': ''}
+
+
+def test_name_keywords_outrank_clothing_types_as_before():
+    assert classify_product(product('CLOTHING', 'Ring Earrings Heel')) == 'jewelry'
+    assert classify_product(product('DRESS', 'Leather Tote')) == 'handbags'
+    assert classify_product(product('TOP', 'Silk Scarf')) == 'clothing'
+
+
+def test_types_and_keywords_follow_chain_order():
+    assert classify_product(product('FOOTWEAR', 'Bag Charm Ring')) == 'shoes'
+    assert classify_product(product('JEWELRY', 'Chain Bag')) == 'handbags'
+    assert classify_product(product('ACCESSORIES', 'Gold Bracelet')) == 'jewelry'
+    assert classify_product(product('ACCESSORIES', 'Mini')) == 'other_accessories'
+    assert classify_product(product('', 'Sandal')) is None
+
+
+def test_keywords_match_whole_words_and_plurals():
+    assert classify_product(product('', 'Spring Boring Chatelaine')) is None
+    assert classify_product(product('', 'Hoop Earrings')) == 'jewelry'
+    assert classify_product(product('', 'Tote-Bags')) == 'handbags'
+
+
+def test_chain_on_whole_words_agrees_everywhere():
+    keywords = ProductClassifier().keywords
+    for item in synthetic_catalog(5000):
+        # Hide words that only contain a keyword, e.g. 'boring' or 'shoulderbag'; the chain then matches whole words
+        words = item['product_name'].lower().split()
+        whole_words = dict(item, product_name=' '.join(word if word in keywords else '-' for word in words))
+        assert classify_product(item) == legacy_categorize(whole_words), item
+
+
+if __name__ == "__main__":
+    test_name_keywords_outrank_clothing_types_as_before()
+    test_types_and_keywords_follow_chain_order()
+    test_keywords_match_whole_words_and_plurals()
+    test_chain_on_whole_words_agrees_everywhere()
+    print("All product classifier tests passed")
@@ -0,0 +1,93 @@
+"""
+Test that parsed tool output is coerced to the tool's schema and mistyped elements are repaired
+
+Runs without AWS access:
+    python test_structured_output.py
+"""
+import io
+import json
+from structured_output import BUNDLE_TOOL, RATING_TOOL, coerce_element, numbered_ratings, parse_elements
+
+
+class RepairBedrock:
+    """Answers every repair call with `element` and records the fragments it was shown"""
+
+    def __init__(self, element):
+        self.element = element
+        self.fragments = []
+
+    def invoke_model(self, modelId, body):
+        self.fragments.append(json.loads(body)['messages'][0]['content'][0]['text'])
+        response = {'content': [{'type': 'tool_use', 'input': self.element}]}
+        return {'body': io.BytesIO(json.dumps(response).encode('utf-8'))}
+
+
+def test_string_numbers_are_coerced_to_the_schema_types():
+    text = json.dumps({'ratings': [
+        {'number': '1', 'score': '8', 'reason': 'Navy suede matches'},
+        {'number': 2.0, 'score': 6.5, 'reason': 'Fine'}
+    ]})
+
+    ratings, lost = parse_elements(None, 'model', RATING_TOOL, text)
+
+    assert lost == 0
+    assert ratings == [
+        {'number': 1, 'score': 8.0, 'reason': 'Navy suede matches'},
+        {'number': 2, 'score': 6.5, 'reason': 'Fine'}
+    ]
+    assert all(type(rating['number']) is int and type(rating['score']) is float for rating in ratings)
+
+
+def test_null_and_non_numeric_fields_go_to_repair():
+    bedrock = RepairBedrock({'number': 2, 'score': 7, 'reason': 'Repaired rating'})
+    text = json.dumps({'ratings': [
+        {'number': 1, 'score': 9, 'reason': 'Good'},
+        {'number': 2, 'score': None, 'reason': 'The score was left out entirely'},
+        {'number': 'three', 'score': 'NaN', 'reason': 'Neither field is a number at all'}
+    ]})
+
+    ratings, lost = parse_elements(bedrock, 'model', RATING_TOOL, text, max_repairs=1)
+
+    assert ratings == [
+        {'number': 1, 'score': 9.0, 'reason': 'Good'},
+        {'number': 2, 'score': 7.0, 'reason': 'Repaired rating'}
+    ]
+    assert lost == 1
+    assert len(bedrock.fragments) == 1 and '"score": null' in bedrock.fragments[0]
+
+
+def test_nested_bundle_items_are_checked():
+    bundle = {'bundle_name': 'Weekend', 'bundle_type': 'budget', 'match_score': '9', 'total_cost': '120.50',
+              'items': [{'id': 'S1', 'category': 'shoes', 'reason': 'Clean lines'}], 'styling_note': 'Roll the cuffs'}
+
+    coerced = coerce_element(bundle, BUNDLE_TOOL)
+
+    assert coerced['match_score'] == 9.0 and coerced['total_cost'] == 120.5
+    assert coerce_element(dict(bundle, items=[{'id': 'S1', 'category': 'shoes', 'reason': None}]), BUNDLE_TOOL) is None
+    assert coerce_element(dict(bundle, items='S1'), BUNDLE_TOOL) is None
+    assert coerce_element(dict(bundle, match_score=True), BUNDLE_TOOL) is None
+
+
+def test_numbered_ratings_keep_usable_ratings_with_float_scores():
+    ratings = [
+        {'number': '2', 'score': '8', 'reason': 'Good'},
+        {'number': 1, 'score': 7},
+        {'number': 2, 'score': 3, 'reason': 'Duplicate'},
+        {'number': 3, 'score': 'high', 'reason': 'Not a number'},
+        {'number': 9, 'score': 9, 'reason': 'Out of range'},
+        {'number': None, 'score': 9, 'reason': 'No number'}
+    ]
+
+    rated = numbered_ratings(ratings, 3)
+
+    assert rated == [(1, 8.0, 'Good'), (0, 7.0, 'No reason provided')]
+    # Mixed input types still sort once rated
+    assert sorted(rated, key=lambda r: -r[1])[0][0] == 1
+
+
+if __name__ == "__main__":
+    test_string_numbers_are_coerced_to_the_schema_types()
+    test_null_and_non_numeric_fields_go_to_repair()
+    test_nested_bundle_items_are_checked()
+    test_numbered_ratings_keep_usable_ratings_with_float_scores()
+    print("All structured output tests passed")